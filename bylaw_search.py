@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Full-text search over the prose in compliance-data.ts.
+
+Indexes each town's bottom line, each provision (title, state law, local
+bylaw, impact and AG decision text) and each narrative city's title,
+summary and body. Results are ranked with BM25 and returned as towns and
+provision ids with a snippet around the first hit.
+
+The index lives in .report-cache/bylaw_search.json with per-town term
+frequencies and a content hash of each town's source text. A rebuild only
+re-tokenizes towns whose text changed and drops towns that disappeared.
+Collection statistics (document frequencies, average length) are derived
+when the index is loaded. A query then scores only the posting lists of
+its terms with one numpy bincount.
+
+Queries are lowercased, stopwords are dropped and terms are lightly stemmed
+(occupancy / occupied -> occup), so "owner occupancy" also finds
+"owner-occupied". A quoted "phrase" must also appear verbatim.
+
+    from bylaw_search import search
+    for hit in search('owner occupancy', k=5):
+        print(hit['slug'], hit['provision_id'], hit['snippet'])
+
+Usage:
+    python3 bylaw_search.py "owner occupancy"
+    python3 bylaw_search.py '"special permit" parking' --town newton -k 20
+    python3 bylaw_search.py --rebuild          # update the index from compliance-data.ts and exit
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from generate_report import DATA_FILE, parse_compliance_data
+
+INDEX_FILE = os.path.join(os.path.dirname(__file__), '.report-cache', 'bylaw_search.json')
+INDEX_VERSION = 1
+K1 = 1.2
+B = 0.75
+SNIPPET_CHARS = 160
+
+STOPWORDS = frozenset(
+    'a an and are as at be but by for from has have in is it its no not of on or that the their this to '
+    'was were which will with'.split())
+SUFFIXES = ('ational', 'ations', 'ation', 'ancy', 'ency', 'ances', 'ance', 'ences', 'ence', 'ies', 'ied',
+            'ing', 'ed', 'es', 's')
+word_pattern = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+phrase_pattern = re.compile(r'"([^"]+)"')
+
+
+# ── Tokenizing ───────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=16384)
+def stem(word):
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text):
+    return [stem(w.replace("'", '')) for w in word_pattern.findall(text.lower()) if w not in STOPWORDS]
+
+
+def town_documents(t):
+    """[(provision_id or None, field, text)] for one compliance profile."""
+    docs = []
+    if t['bottom_line']:
+        docs.append((None, 'bottom_line', t['bottom_line']))
+    for p in t['provisions']:
+        parts = [p['provision'], p['state_law'], p['local_bylaw'], p['impact'], p['ag_decision']]
+        docs.append((p['id'], 'provision', ' '.join(part for part in parts if part)))
+    return docs
+
+
+def narrative_documents(nc):
+    text = ' '.join(part for part in (nc['title'], nc['summary'], nc['body']) if part)
+    return [(None, 'narrative', text)] if text else []
+
+
+def corpus(towns, narrative_cities):
+    """{slug: {'name', 'docs'}} for every town and narrative city."""
+    entries = {}
+    for t in towns:
+        entries[t['slug']] = {'name': t['name'], 'docs': town_documents(t)}
+    for nc in narrative_cities:
+        entry = entries.setdefault(nc['slug'], {'name': nc['name'], 'docs': []})
+        entry['docs'] = entry['docs'] + narrative_documents(nc)
+    return entries
+
+
+def _hash(entry):
+    return hashlib.sha256(json.dumps(entry, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def index_town(entry):
+    docs = []
+    for provision_id, field, text in entry['docs']:
+        terms = tokenize(text)
+        tf = {}
+        for term in terms:
+            tf[term] = tf.get(term, 0) + 1
+        docs.append({'provision_id': provision_id, 'field': field, 'text': text, 'length': len(terms), 'tf': tf})
+    return {'name': entry['name'], 'hash': _hash(entry), 'docs': docs}
+
+
+# ── Index ────────────────────────────────────────────────────────────────
+
+class SearchIndex:
+    """Per-town stored documents plus in-memory BM25 posting lists."""
+
+    def __init__(self, towns=None):
+        self.towns = towns or {}     # slug -> {'name', 'hash', 'docs'}
+        self._build()
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls()
+        return cls(stored['towns'] if stored.get('version') == INDEX_VERSION else {})
+
+    def save(self, path=INDEX_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'towns': self.towns}, f, sort_keys=True, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    def update(self, towns, narrative_cities):
+        """Re-index towns whose text changed; returns (reindexed, unchanged, removed) counts."""
+        entries = corpus(towns, narrative_cities)
+        reindexed = unchanged = 0
+        for slug, entry in entries.items():
+            old = self.towns.get(slug)
+            if old is not None and old['hash'] == _hash(entry):
+                unchanged += 1
+                continue
+            self.towns[slug] = index_town(entry)
+            reindexed += 1
+        removed = self.towns.keys() - entries.keys()
+        for slug in removed:
+            del self.towns[slug]
+        if reindexed or removed:
+            self._build()
+        return reindexed, unchanged, len(removed)
+
+    def _build(self):
+        self.docs = []
+        postings = {}
+        for slug in sorted(self.towns):
+            for doc in self.towns[slug]['docs']:
+                i = len(self.docs)
+                self.docs.append((slug, doc))
+                for term, count in doc['tf'].items():
+                    postings.setdefault(term, ([], []))
+                    postings[term][0].append(i)
+                    postings[term][1].append(count)
+        self.lengths = np.array([doc['length'] for _, doc in self.docs], dtype=np.float64)
+        self.avg_length = float(self.lengths.mean()) if len(self.docs) else 0.0
+        n = len(self.docs)
+        self.postings = {}
+        for term, (rows, counts) in postings.items():
+            idf = math.log(1 + (n - len(rows) + 0.5) / (len(rows) + 0.5))
+            self.postings[term] = (np.array(rows, dtype=np.int32), np.array(counts, dtype=np.float64), idf)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def scores(self, terms):
+        """BM25 score of every document for the query terms."""
+        total = np.zeros(len(self.docs))
+        norm = K1 * (1 - B + B * self.lengths / (self.avg_length or 1.0))
+        for term in set(terms):
+            if term not in self.postings:
+                continue
+            rows, tf, idf = self.postings[term]
+            total += np.bincount(rows, weights=idf * tf * (K1 + 1) / (tf + norm[rows]), minlength=len(self.docs))
+        return total
+
+    def search(self, query, k=10, town=None):
+        """[{'slug', 'town', 'provision_id', 'field', 'score', 'snippet'}] best first."""
+        phrases = [p.lower() for p in phrase_pattern.findall(query)]
+        terms = tokenize(query)
+        if not terms or not self.docs:
+            return []
+        scores = self.scores(terms)
+        candidates = np.flatnonzero(scores > 0)
+        order = candidates[np.lexsort((candidates, -scores[candidates]))]
+        hits = []
+        for i in order:
+            slug, doc = self.docs[i]
+            if town is not None and slug != town:
+                continue
+            if phrases and not all(p in doc['text'].lower() for p in phrases):
+                continue
+            hits.append({'slug': slug, 'town': self.towns[slug]['name'], 'provision_id': doc['provision_id'],
+                         'field': doc['field'], 'score': round(float(scores[i]), 4),
+                         'snippet': snippet(doc['text'], set(terms), phrases)})
+            if len(hits) == k:
+                break
+        return hits
+
+
+def snippet(text, terms, phrases=(), width=SNIPPET_CHARS):
+    """About `width` characters of text around the first phrase or term hit, hits in «»."""
+    lower = text.lower()
+    starts = [lower.find(p) for p in phrases if p in lower]
+    words = list(re.finditer(word_pattern, lower))
+    hits = [m for m in words if stem(m.group().replace("'", '')) in terms]
+    if not starts and hits:
+        starts = [hits[0].start()]
+    start = max(0, min(starts or [0]) - width // 3)
+    if start:
+        start = lower.find(' ', start) + 1 or start
+    end = min(len(text), start + width)
+    if end < len(text):
+        end = text.rfind(' ', start, end) if text.rfind(' ', start, end) > start else end
+    out, pos = [], start
+    for m in hits:
+        if m.start() < start or m.end() > end:
+            continue
+        out.append(text[pos:m.start()])
+        out.append(f"«{text[m.start():m.end()]}»")
+        pos = m.end()
+    out.append(text[pos:end])
+    return ('…' if start else '') + ''.join(out) + ('…' if end < len(text) else '')
+
+
+def refresh_index(data_file=DATA_FILE, path=INDEX_FILE):
+    """Load the saved index, bring it up to date with data_file and save it if anything changed."""
+    index = SearchIndex.load(path)
+    towns, narrative_cities, _ = parse_compliance_data(data_file)
+    counts = index.update(towns, narrative_cities)
+    if counts[0] or counts[2] or not os.path.exists(path):
+        index.save(path)
+    return index, counts
+
+
+@lru_cache(maxsize=1)
+def default_index():
+    return refresh_index()[0]
+
+
+def search(query, k=10, town=None):
+    """Search the default index (refreshed from compliance-data.ts on first use)."""
+    return default_index().search(query, k, town)
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='BM25 search over compliance-data.ts prose')
+    parser.add_argument('query', nargs='?', help='search terms; quote a "phrase" to require it')
+    parser.add_argument('-k', type=int, default=10, help='results to show')
+    parser.add_argument('--town', help='only this town slug')
+    parser.add_argument('--data', default=DATA_FILE, help='path to compliance-data.ts')
+    parser.add_argument('--index', default=INDEX_FILE, help='index file')
+    parser.add_argument('--rebuild', action='store_true', help='update the index and exit')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+    if not args.query and not args.rebuild:
+        parser.error('a query is required (or --rebuild)')
+
+    started = time.perf_counter()
+    index, (reindexed, unchanged, removed) = refresh_index(args.data, args.index)
+    if args.rebuild:
+        print(f"Index: {len(index)} documents in {len(index.towns)} towns ({reindexed} re-indexed, "
+              f"{unchanged} unchanged, {removed} removed) in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return
+
+    started = time.perf_counter()
+    hits = index.search(args.query, args.k, args.town)
+    elapsed = (time.perf_counter() - started) * 1000
+    if args.json:
+        print(json.dumps(hits, indent=1))
+        return
+    for hit in hits:
+        where = hit['slug'] + (f"/{hit['provision_id']}" if hit['provision_id'] else f" ({hit['field']})")
+        print(f"{hit['score']:7.3f}  {where}\n         {hit['snippet']}")
+    print(f"{len(hits)} result{'s' if len(hits) != 1 else ''} in {elapsed:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
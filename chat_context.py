@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Precomputed, budgeted context for the chat assistant.
+
+src/lib/chat-system-prompt.ts used to import town_seo_data.ts,
+building_permits_2024.ts and compliance-data.ts whole and derive its stats
+at module load. This writes everything the chat route needs as small
+files under public/data/chat:
+
+    index.json          version, budgets, system-prompt facts (compliance
+                        slugs, town counts), headline context and the
+                        alias -> slug table used to detect towns
+    towns/<slug>.json   {slug, name, version, text, bytes, tokens}
+
+Each town snippet holds, in priority order, the EOHLC permit line, the
+bylaw analysis (tier counts and bottom line), AG decisions, the provisions
+inconsistent with state law, the narrative summary and the Census
+building-permit line. Snippets are cut to TOWN_BYTES / TOWN_TOKENS, and
+the headline context to HEADLINE_BYTES / HEADLINE_TOKENS: whole parts are
+kept while they fit, then the next part is cut at a sentence or word
+boundary. Tokens are estimated as the larger of bytes / 4 and words x 1.3,
+which runs high for English prose, so the real count stays under budget.
+
+The version is a hash of the content. Files whose bytes are unchanged are
+not rewritten, and snippets for towns that no longer exist are removed.
+
+`next build` does not run Python, so public/data/chat is committed and
+next.config.js traces it into the /api/chat function bundle. Regenerate it
+with the data and run --check before deploying. Without the index the chat
+route falls back to a static prompt with no town data.
+
+Usage:
+    python3 chat_context.py                     # write public/data/chat
+    python3 chat_context.py --show newton       # print one town's snippet
+    python3 chat_context.py --check             # exit 1 if public/data/chat is stale
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+
+from generate_report import DATA_FILE, EXPORT_DIR, parse_compliance_data
+from town_match import ALIASES
+from town_metrics import SEO_DATA_FILE, js_round
+from town_shards import BUILDING_PERMITS_FILE
+from ts_data import iter_module_records
+
+CHAT_DIR = os.path.join(EXPORT_DIR, 'chat')
+TOWN_BYTES = 2400
+TOWN_TOKENS = 600
+HEADLINE_BYTES = 4000
+HEADLINE_TOKENS = 1000
+MIN_SHARE_PERMITS = 10      # building permits needed before an ADU share is quoted
+
+date_pattern = re.compile(
+    r"((?:January|February|March|April|May|June|July|August|September|October|November|December)"
+    r"\s+\d{1,2},?\s+\d{4}|\w+\s+\d{4})")
+
+
+# ── Budgets ──────────────────────────────────────────────────────────────
+
+def estimate_tokens(text):
+    return max(math.ceil(len(text.encode('utf-8')) / 4), math.ceil(len(text.split()) * 1.3))
+
+
+def within(text, max_bytes, max_tokens):
+    return len(text.encode('utf-8')) <= max_bytes and estimate_tokens(text) <= max_tokens
+
+
+def truncate(text, max_bytes, max_tokens):
+    """Longest prefix ending at a sentence (else word) boundary that fits, with '…'."""
+    if within(text, max_bytes, max_tokens):
+        return text
+    cuts = [m.end() for m in re.finditer(r"[.;:](?=\s)", text)]
+    words = [m.start() for m in re.finditer(r"\s", text)]
+    for candidates in (cuts, words):
+        for end in reversed(candidates):
+            clipped = text[:end].rstrip() + ' …'
+            if within(clipped, max_bytes, max_tokens):
+                return clipped
+    return ''
+
+
+def fit(parts, max_bytes, max_tokens, separator='\n'):
+    """Join parts in order while they fit; the first that doesn't is truncated, the rest dropped."""
+    out = []
+    for part in parts:
+        candidate = separator.join(out + [part])
+        if within(candidate, max_bytes, max_tokens):
+            out.append(part)
+            continue
+        prefix = separator.join(out + [''])
+        used_bytes = len(prefix.encode('utf-8'))
+        clipped = truncate(part, max_bytes - used_bytes, max_tokens - estimate_tokens(prefix))
+        if clipped:
+            out.append(clipped)
+        break
+    return separator.join(out)
+
+
+# ── Town snippets ────────────────────────────────────────────────────────
+
+def _share(approved, total_units):
+    """Math.round(approved / total_units * 1000) / 10, as the site computed it."""
+    return float(js_round(approved / total_units * 1000)) / 10
+
+
+def _number(value):
+    return f"{value:,}"
+
+
+def status_counts(provisions):
+    return {status: sum(p['status'] == status for p in provisions)
+            for status in ('inconsistent', 'review', 'compliant')}
+
+
+def permit_line(seo):
+    return (f"Permit data for {seo['name']}: {seo['submitted']} submitted, {seo['approved']} approved, "
+            f"{seo['denied']} denied, {seo['approvalRate']}% approval rate. Population "
+            f"{_number(seo['population'])}, {seo['county']} County. By-right: {'yes' if seo['byRight'] else 'no'}.")
+
+
+def building_permit_line(seo, bp):
+    if not bp or bp['totalUnits'] <= 0:
+        return None
+    share = ''
+    if seo and bp['totalUnits'] >= MIN_SHARE_PERMITS:
+        share = f" ADUs represent {_share(seo['approved'], bp['totalUnits'])}% of total housing production."
+    return (f"Census Building Permit Survey 2024: {bp['totalUnits']} total building permits "
+            f"({bp['singleFamilyUnits']} single-family, {bp['multifamilyUnits']} multifamily).{share}")
+
+
+def town_parts(seo, bp, profile, narrative):
+    """Snippet parts in priority order (None for parts with no data)."""
+    parts = [permit_line(seo) if seo else None]
+    if profile:
+        counts = status_counts(profile['provisions'])
+        summary = (f"Bylaw analysis for {profile['name']}: {counts['inconsistent']} inconsistent with state law, "
+                   f"{counts['review']} under review, {counts['compliant']} consistent with state law.")
+        if profile['bottom_line']:
+            summary += f" {profile['bottom_line']}"
+        parts.append(summary)
+        decisions = [f"{p['provision']}: {p['ag_decision']}" for p in profile['provisions'] if p['ag_decision']]
+        parts.append(f"AG decisions: {' '.join(decisions)}" if profile['ag_disapprovals'] > 0 and decisions else None)
+        issues = [p['provision'] for p in profile['provisions'] if p['status'] == 'inconsistent']
+        parts.append(f"Provisions inconsistent with state law: {', '.join(issues)}." if issues else None)
+    if narrative:
+        parts.append(f"{narrative['name']}: {narrative['summary']} ({narrative['permits']['approved']} approved, "
+                     f"{narrative['permits']['approval_rate']}% rate)")
+    parts.append(building_permit_line(seo, bp))
+    return [p for p in parts if p]
+
+
+# ── Headline context ─────────────────────────────────────────────────────
+
+def headline_stats(seo_records, permits, towns, narrative_cities):
+    provisions = [p for t in towns for p in t['provisions']]
+    inconsistent = [p for p in provisions if p['status'] == 'inconsistent']
+    issue_counts = {}
+    for p in inconsistent:
+        issue_counts[p['provision']] = issue_counts.get(p['provision'], 0) + 1
+    top_issues = sorted(issue_counts.items(), key=lambda kv: (-kv[1], kv[0]))[:3]
+
+    responded = [r for r in seo_records if r['responded']]
+    with_permits = [r for r in responded if r['submitted'] > 0]
+    top10 = []
+    for r in sorted(with_permits, key=lambda r: (-r['approved'], r['name']))[:10]:
+        bp = permits.get(r['slug'])
+        total = bp['totalUnits'] if bp else 0
+        share = (f", ADUs = {_share(r['approved'], total)}% of total building permits"
+                 if total >= MIN_SHARE_PERMITS else '')
+        top10.append(f"{r['name']}: {r['approved']} approved of {r['submitted']} submitted{share}")
+    sufficient = [r for r in with_permits
+                  if r['slug'] in permits and permits[r['slug']]['totalUnits'] >= MIN_SHARE_PERMITS]
+    total_bp = sum(permits[r['slug']]['totalUnits'] for r in sufficient)
+    adu_for_share = sum(r['approved'] for r in sufficient)
+
+    ag_decisions = []
+    for t in towns:
+        struck = [p for p in t['provisions'] if p['ag_decision']]
+        if t['ag_disapprovals'] == 0 or not struck:
+            continue
+        m = date_pattern.search(struck[0]['ag_decision'])
+        ag_decisions.append(
+            f"{t['name']} (/compliance/{t['slug']}) — {m.group(1) if m else ''}: {len(struck)} provision"
+            f"{'s' if len(struck) > 1 else ''} struck down ({'; '.join(p['provision'] for p in struck)})")
+
+    return {
+        'respondedTowns': len(responded),
+        'totalApproved': sum(r['approved'] for r in responded),
+        'totalSubmitted': sum(r['submitted'] for r in responded),
+        'communitiesTracked': len(towns) + len(narrative_cities),
+        'profiledTowns': len(towns),
+        'inconsistentProvisions': len(inconsistent),
+        'reviewProvisions': sum(p['status'] == 'review' for p in provisions),
+        'townsWithInconsistencies': sum(any(p['status'] == 'inconsistent' for p in t['provisions']) for t in towns),
+        'topIssueTypes': [f"{name} ({count} towns)" for name, count in top_issues],
+        'top10ByApproved': top10,
+        'townsWithBothDatasets': len(sufficient),
+        'totalBuildingPermits': total_bp,
+        'overallAduShare': _share(adu_for_share, total_bp) if total_bp else 0,
+        'agDecisions': ag_decisions,
+    }
+
+
+def headline_context(s, max_bytes=HEADLINE_BYTES, max_tokens=HEADLINE_TOKENS):
+    parts = [
+        "Headline stats for your reference (use these for broad questions):\n"
+        f"{s['respondedTowns']} towns responded to the EOHLC survey. {s['totalApproved']} ADU permits approved "
+        f"statewide out of {s['totalSubmitted']} submitted. We've analyzed bylaws for {s['communitiesTracked']} "
+        f"communities in detail. {s['inconsistentProvisions']} provisions are inconsistent with state law across "
+        f"{s['townsWithInconsistencies']} towns. {s['reviewProvisions']} more are in a grey area. The most common "
+        f"inconsistencies are: {', '.join(s['topIssueTypes'])}.",
+        "\nHousing production data (Census Building Permit Survey 2024): Across "
+        f"{s['townsWithBothDatasets']} towns with both ADU and building permit data, ADU approvals account for "
+        f"{s['overallAduShare']}% of all {_number(s['totalBuildingPermits'])} building permits issued. Top 10 towns "
+        f"by ADU approvals: {'; '.join(s['top10ByApproved'])}. For more detail, link users to /housing-production.",
+        "\nAttorney General decisions on ADU bylaws "
+        f"({len(s['agDecisions'])} towns with provisions struck down as inconsistent with state law):",
+    ]
+    closing = "When discussing AG decisions, always link to /compliance/[town] for the full analysis."
+    text = fit(parts, max_bytes, max_tokens)
+    # AG lines are whole or dropped, with a count of the dropped ones
+    shown = 0
+    for line in s['agDecisions']:
+        remaining = len(s['agDecisions']) - shown - 1
+        tail = f"\n… and {remaining} more" if remaining else ''
+        if not within(f"{text}\n{line}{tail}\n{closing}", max_bytes, max_tokens):
+            break
+        text += f"\n{line}"
+        shown += 1
+    if shown < len(s['agDecisions']):
+        text += f"\n… and {len(s['agDecisions']) - shown} more"
+    return f"{text}\n{closing}"
+
+
+# ── Alias index ──────────────────────────────────────────────────────────
+
+def name_variants(name):
+    """Lowercase spellings of a town name people type: Foxboro/Foxborough, Mt/Mount, hyphens as spaces."""
+    base = name.lower()
+    variants = {base, base.replace('-', ' ')}
+    for v in list(variants):
+        if v.endswith('borough') or 'borough ' in v:
+            variants.add(v.replace('borough', 'boro'))
+        elif re.search(r"boro\b", v):
+            variants.add(re.sub(r"boro\b", 'borough', v))
+        if v.startswith('mount '):
+            variants.update({'mt ' + v[6:], 'mt. ' + v[6:]})
+    return variants
+
+
+def alias_index(seo_records):
+    """{lowercase alias: slug}. A real town name always wins over another town's alias."""
+    names = {r['name'].lower(): r['slug'] for r in seo_records}
+    slugs = set(names.values())
+    aliases = {}
+    for r in seo_records:
+        for variant in name_variants(r['name']):
+            aliases.setdefault(variant, r['slug'])
+    for alias, slug in ALIASES.items():
+        if slug in slugs and alias not in names:
+            aliases.setdefault(alias, slug)
+    aliases.update(names)
+    return dict(sorted(aliases.items()))
+
+
+# ── Artifact ─────────────────────────────────────────────────────────────
+
+def build_chat_context(seo_records, permit_records, towns, narrative_cities,
+                       town_bytes=TOWN_BYTES, town_tokens=TOWN_TOKENS):
+    """(index, {slug: snippet}) with the version filled in."""
+    seo = {r['slug']: r for r in seo_records}
+    permits = {r['slug']: r for r in permit_records}
+    profiles = {t['slug']: t for t in towns}
+    narratives = {nc['slug']: nc for nc in narrative_cities}
+
+    snippets = {}
+    for slug in sorted(seo.keys() | profiles.keys() | narratives.keys()):
+        parts = town_parts(seo.get(slug), permits.get(slug), profiles.get(slug), narratives.get(slug))
+        text = fit(parts, town_bytes, town_tokens)
+        name = (seo.get(slug) or profiles.get(slug) or narratives[slug])['name']
+        snippets[slug] = {'slug': slug, 'name': name, 'text': text,
+                          'bytes': len(text.encode('utf-8')), 'tokens': estimate_tokens(text)}
+
+    stats = headline_stats(seo_records, permits, towns, narrative_cities)
+    index = {
+        'budgets': {'townBytes': town_bytes, 'townTokens': town_tokens,
+                    'headlineBytes': HEADLINE_BYTES, 'headlineTokens': HEADLINE_TOKENS},
+        'prompt': {
+            'complianceSlugs': [t['slug'] for t in towns] + [nc['slug'] for nc in narrative_cities],
+            'respondedTowns': stats['respondedTowns'],
+            'profiledTowns': stats['profiledTowns'],
+        },
+        'headline': headline_context(stats),
+        'aliases': alias_index(seo_records),
+        'towns': {slug: {'name': s['name'], 'tokens': s['tokens']} for slug, s in snippets.items()},
+    }
+    digest = hashlib.sha256(json.dumps([index, snippets], sort_keys=True).encode('utf-8'))
+    version = digest.hexdigest()[:12]
+    index['version'] = version
+    for s in snippets.values():
+        s['version'] = version
+    return index, snippets
+
+
+def _encode(payload):
+    return (json.dumps(payload, indent=1, sort_keys=True, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def _write_if_changed(path, payload):
+    content = _encode(payload)
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(content)
+    os.replace(tmp, path)
+    return True
+
+
+def write_chat_context(index, snippets, out_dir=CHAT_DIR):
+    """Write changed files, index last; returns (written, removed)."""
+    written = sum(_write_if_changed(os.path.join(out_dir, 'towns', f"{slug}.json"), s)
+                  for slug, s in snippets.items())
+    removed = 0
+    town_dir = os.path.join(out_dir, 'towns')
+    for name in os.listdir(town_dir):
+        if name.endswith('.json') and name[:-5] not in snippets:
+            os.remove(os.path.join(town_dir, name))
+            removed += 1
+    written += _write_if_changed(os.path.join(out_dir, 'index.json'), index)
+    return written, removed
+
+
+def stale_chat_context(index, snippets, out_dir=CHAT_DIR):
+    """Relative paths that are missing, out of date or left over in out_dir."""
+    expected = {os.path.join('towns', f"{slug}.json"): s for slug, s in snippets.items()}
+    expected['index.json'] = index
+    stale = []
+    for name, payload in sorted(expected.items()):
+        try:
+            with open(os.path.join(out_dir, name), 'rb') as f:
+                if f.read() == _encode(payload):
+                    continue
+        except FileNotFoundError:
+            pass
+        stale.append(name)
+    town_dir = os.path.join(out_dir, 'towns')
+    if os.path.isdir(town_dir):
+        stale += sorted(os.path.join('towns', n) for n in os.listdir(town_dir)
+                        if n.endswith('.json') and os.path.join('towns', n) not in expected)
+    return stale
+
+
+def load_chat_context(data_file=DATA_FILE, seo_file=SEO_DATA_FILE, permits_file=BUILDING_PERMITS_FILE):
+    towns, narrative_cities, _ = parse_compliance_data(data_file)
+    return build_chat_context(list(iter_module_records(seo_file, 'townSEOData')),
+                              list(iter_module_records(permits_file, 'buildingPermits2024')),
+                              towns, narrative_cities)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write budgeted chat context snippets and the alias index')
+    parser.add_argument('--data', default=DATA_FILE, help='path to compliance-data.ts')
+    parser.add_argument('--seo-data', default=SEO_DATA_FILE, help='path to town_seo_data.ts')
+    parser.add_argument('--permits-data', default=BUILDING_PERMITS_FILE, help='path to building_permits_2024.ts')
+    parser.add_argument('--out', default=CHAT_DIR, help='output directory')
+    parser.add_argument('--show', metavar='SLUG', help='print one snippet (or "headline") instead of writing')
+    parser.add_argument('--check', action='store_true', help='report stale files and exit 1 instead of writing')
+    args = parser.parse_args(argv)
+
+    index, snippets = load_chat_context(args.data, args.seo_data, args.permits_data)
+    if args.show:
+        s = {'text': index['headline']} if args.show == 'headline' else snippets[args.show]
+        print(s['text'])
+        print(f"-- {len(s['text'].encode('utf-8'))} bytes, ~{estimate_tokens(s['text'])} tokens")
+        return
+    if args.check:
+        stale = stale_chat_context(index, snippets, args.out)
+        if stale:
+            print(f"{len(stale)} stale in {args.out} (e.g. {', '.join(stale[:5])}); run python3 chat_context.py")
+            sys.exit(1)
+        print(f"{args.out} is up to date (version {index['version']})")
+        return
+    written, removed = write_chat_context(index, snippets, args.out)
+    tokens = sorted(s['tokens'] for s in snippets.values())
+    print(f"Chat context {index['version']}: {len(snippets)} towns, {len(index['aliases'])} aliases; "
+          f"snippet tokens median {tokens[len(tokens) // 2]}, max {tokens[-1]}; "
+          f"headline ~{estimate_tokens(index['headline'])} tokens")
+    print(f"{written} file{'s' if written != 1 else ''} written, {removed} removed in {args.out}")
+
+
+if __name__ == '__main__':
+    main()
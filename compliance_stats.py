@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Does a town's compliance posture go with its permit approval rate?
+
+For every compliance profile with at least one submitted application:
+- Spearman rank correlation between inconsistent provisions and approval
+  rate (approved / submitted)
+- Spearman rank correlation between compliance tier (Consistent < Needs
+  Review < Appears Inconsistent < AG Disapproved) and approval rate
+- the approval-rate gap between towns with and without inconsistent
+  provisions, in percentage points
+
+Each estimate gets a percentile bootstrap 95% interval. All resamples are
+drawn as (resamples x towns) index arrays, BLOCK rows at a time, and
+every statistic, including tie-averaged ranks, is computed along their
+rows: 10,000 resamples of 351 towns take about a second in five array
+passes rather than 10,000 Python-level recomputations. The generator is
+seeded, so the report stays byte-for-byte reproducible.
+
+Usage:
+    python3 compliance_stats.py
+    python3 compliance_stats.py --resamples 20000 --seed 7
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+RESAMPLES = 10000
+SEED = 2026
+CONFIDENCE = 0.95
+BLOCK = 2000        # resamples per array operation; bounds memory at statewide scale
+TIER_ORDER = ('Consistent', 'Needs Review', 'Appears Inconsistent', 'AG Disapproved')
+
+
+# ── Vectorized statistics (along the last axis) ──────────────────────────
+
+def rankdata(a):
+    """Average ranks (1-based, ties share their mean rank) along the last axis of a 2-D array."""
+    a = np.atleast_2d(a)
+    rows, n = a.shape
+    order = np.argsort(a, axis=1, kind='stable')
+    ordered = np.take_along_axis(a, order, axis=1)
+    # Tie groups numbered 0.. within each row, offset so every row's groups are distinct
+    starts = np.ones((rows, n), dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    group = np.cumsum(starts, axis=1) - 1 + (np.arange(rows) * n)[:, None]
+    position = np.broadcast_to(np.arange(1, n + 1, dtype=np.float64), (rows, n))
+    mean_rank = (np.bincount(group.ravel(), weights=position.ravel(), minlength=rows * n)
+                 / np.maximum(np.bincount(group.ravel(), minlength=rows * n), 1))
+    ranks = np.empty((rows, n))
+    np.put_along_axis(ranks, order, mean_rank[group], axis=1)
+    return ranks
+
+
+def pearson(x, y):
+    """Row-wise Pearson correlation; NaN where either row is constant."""
+    x = x - x.mean(axis=-1, keepdims=True)
+    y = y - y.mean(axis=-1, keepdims=True)
+    denom = np.sqrt((x * x).sum(axis=-1) * (y * y).sum(axis=-1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denom > 0, (x * y).sum(axis=-1) / denom, np.nan)
+
+
+def spearman(x, y):
+    return pearson(rankdata(x), rankdata(y))
+
+
+def group_gap(values, in_group):
+    """Row-wise mean(values | in_group) - mean(values | not in_group); NaN if a side is empty."""
+    inside = in_group.sum(axis=-1)
+    outside = in_group.shape[-1] - inside
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return ((values * in_group).sum(axis=-1) / inside
+                - (values * ~in_group).sum(axis=-1) / outside)
+
+
+# ── Bootstrap ────────────────────────────────────────────────────────────
+
+def town_columns(towns, tier_of):
+    """Numeric columns for towns with submitted applications."""
+    rows = [t for t in towns if t['permits']['submitted'] > 0]
+    inconsistent = np.array([sum(p['status'] == 'inconsistent' for p in t['provisions']) for t in rows],
+                            dtype=np.float64)
+    return {
+        'n': len(rows),
+        'approval': np.array([t['permits']['approved'] / t['permits']['submitted'] for t in rows]),
+        'inconsistent': inconsistent,
+        'tier': np.array([TIER_ORDER.index(tier_of(t)) for t in rows], dtype=np.float64),
+        'has_inconsistent': inconsistent > 0,
+    }
+
+
+def statistics(cols):
+    """{name: array over rows} for columns shaped (rows, towns)."""
+    return {
+        'rho_inconsistent': spearman(cols['inconsistent'], cols['approval']),
+        'rho_tier': spearman(cols['tier'], cols['approval']),
+        'approval_gap': 100 * group_gap(cols['approval'], cols['has_inconsistent']),
+    }
+
+
+def correlation_stats(towns, tier_of, resamples=RESAMPLES, seed=SEED, confidence=CONFIDENCE):
+    """{'n', 'resamples', 'with_inconsistent', 'stats': {name: {'estimate', 'low', 'high'}}}."""
+    cols = town_columns(towns, tier_of)
+    n = cols['n']
+    result = {'n': n, 'resamples': resamples, 'with_inconsistent': int(cols['has_inconsistent'].sum()),
+              'stats': {}}
+    if n < 3:
+        return result
+    point = statistics({k: v[None, :] for k, v in cols.items() if k != 'n'})
+    rng = np.random.default_rng(seed)
+    blocks = []
+    for start in range(0, resamples, BLOCK):
+        sample = rng.integers(0, n, size=(min(BLOCK, resamples - start), n))
+        blocks.append(statistics({k: v[sample] for k, v in cols.items() if k != 'n'}))
+    boot = {name: np.concatenate([b[name] for b in blocks]) for name in point}
+    tail = 100 * (1 - confidence) / 2
+    for name, estimate in point.items():
+        draws = boot[name][~np.isnan(boot[name])]
+        low, high = np.percentile(draws, [tail, 100 - tail]) if len(draws) else (np.nan, np.nan)
+        result['stats'][name] = {'estimate': float(estimate[0]), 'low': float(low), 'high': float(high)}
+    return result
+
+
+def main(argv=None):
+    from generate_report import DATA_FILE, parse_compliance_data, town_tier
+
+    parser = argparse.ArgumentParser(description='Compliance vs approval-rate statistics with bootstrap CIs')
+    parser.add_argument('--data', default=DATA_FILE, help='path to compliance-data.ts')
+    parser.add_argument('--resamples', type=int, default=RESAMPLES)
+    parser.add_argument('--seed', type=int, default=SEED)
+    args = parser.parse_args(argv)
+
+    towns, _, _ = parse_compliance_data(args.data)
+    started = time.perf_counter()
+    result = correlation_stats(towns, town_tier, args.resamples, args.seed)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"{result['n']} towns with applications ({result['with_inconsistent']} with inconsistent provisions), "
+          f"{result['resamples']} resamples in {elapsed:.0f} ms")
+    for name, s in result['stats'].items():
+        print(f"  {name:18s} {s['estimate']:+7.3f}  95% CI [{s['low']:+.3f}, {s['high']:+.3f}]")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,12 +4,30 @@ Generate "Massachusetts ADU Compliance Snapshot — Q1 2026" PDF report.
 
 Parses compliance-data.ts and generates a professional policy-research-style
 PDF using reportlab.
+
+Builds are deterministic: fixed document metadata, invariant PDF IDs and
+timestamps, and explicit tie-breaks wherever rows are sorted, so identical
+inputs produce identical bytes. The build is skipped when the inputs hash
+to the value recorded for the existing output.
+
+Usage:
+    python3 generate_report.py
+    python3 generate_report.py --output /tmp/report.pdf
+    python3 generate_report.py --force          # rebuild even if up to date
 """
 
+import argparse
+import copy
+import glob
+import hashlib
+import io
+import math
 import re
 import json
 import os
-from collections import Counter, defaultdict
+import sys
+import datetime
+import reportlab
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -17,11 +35,21 @@ from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
 from reportlab.platypus import (
     SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
-    PageBreak, KeepTogether, HRFlowable
+    PageBreak, KeepTogether, HRFlowable, Flowable
 )
-from reportlab.graphics.shapes import Drawing, Rect, String
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.graphics.shapes import Circle, Drawing, Group, Rect, String
 from reportlab.graphics.charts.barcharts import VerticalBarChart
 
+from compliance_stats import correlation_stats
+from permit_velocity import VelocityStore, ingest_permit_logs
+from provision_index import build_index
+from town_geo import HLC_DATA_FILE, load_town_points, project, regional_peers
+from town_metrics import SEO_DATA_FILE, compute_metrics, parse_town_seo_data, top_by
+from town_scorecard import PERMITS_GLOB, compute_scorecards, load_median_days
+from report_text import add_markup, to_markup
+from ts_data import mapped, text
+
 # ── Colors matching the confidence tiers ─────────────────────────────────
 NAVY = colors.HexColor('#1a2332')
 DARK_NAVY = colors.HexColor('#0f1722')
@@ -38,217 +66,358 @@ BLUE_ACCENT = colors.HexColor('#3b82f6')
 
 # ── Parse compliance-data.ts ─────────────────────────────────────────────
 
-def parse_compliance_data(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    towns = []
-
-    # Find all town blocks: { slug: '...', ... }
-    # We look for each town entry by finding slug patterns
-    slug_pattern = re.compile(r"slug:\s*'([^']+)'")
-    name_pattern = re.compile(r"name:\s*'([^']+)'")
-    county_pattern = re.compile(r"county:\s*'([^']+)'")
-    population_pattern = re.compile(r"population:\s*(\d+)")
-    municipality_pattern = re.compile(r"municipalityType:\s*'([^']+)'")
-    last_reviewed_pattern = re.compile(r"lastReviewed:\s*'([^']+)'")
-    bylaw_updated_pattern = re.compile(r"bylawLastUpdated:\s*'([^']+)'")
-    bylaw_source_pattern = re.compile(r"bylawSource:\s*'([^']+)'")
-    ag_disapprovals_pattern = re.compile(r"agDisapprovals:\s*(\d+)")
-    ag_decision_date_pattern = re.compile(r"agDecisionDate:\s*'([^']+)'")
-    bylaw_source_title_pattern = re.compile(r"bylawSourceTitle:\s*'([^']+)'")
-
-    # Permit data
-    permits_pattern = re.compile(
-        r"permits:\s*\{\s*submitted:\s*(\d+),\s*approved:\s*(\d+),\s*denied:\s*(\d+),\s*pending:\s*(\d+),\s*approvalRate:\s*(\d+)"
-    )
-
-    # Bottom line - handle both regular quotes and smart quotes
-    bottom_line_pattern = re.compile(r"bottomLine:\s*'((?:[^'\\]|\\.)*)'")
-
-    # Provisions
-    provision_block_pattern = re.compile(
-        r"\{\s*id:\s*'([^']+)',\s*provision:\s*'([^']+)',\s*category:\s*'([^']+)',\s*status:\s*'([^']+)'",
-        re.DOTALL
-    )
-
-    # AG decision text on provisions
-    ag_decision_text_pattern = re.compile(r"agDecision:\s*'((?:[^'\\]|\\.)*)'")
-
-    # Find the towns array and narrative cities array
-    # Split into town blocks by looking for the comment pattern
-    town_markers = list(re.finditer(r'//\s*──\s+([A-Z][A-Z\s]+)\s*──', content))
-
-    # Find the start of the towns array
-    towns_start = content.find("export const towns: TownComplianceProfile[] = [")
-    narrative_start = content.find("export const narrativeCities: NarrativeCityProfile[] = [")
-
-    if towns_start == -1:
-        # Fallback: look for first slug
-        towns_start = 0
-
-    # Extract all town entries from the towns array
-    # Each town starts with { slug: and ends with the next town or ]
-    town_section = content[towns_start:narrative_start] if narrative_start > 0 else content[towns_start:]
+# Find all town blocks: { slug: '...', ... }
+# We look for each town entry by finding slug patterns
+slug_pattern = re.compile(rb"slug:\s*'([^']+)'")
+name_pattern = re.compile(rb"name:\s*'([^']+)'")
+county_pattern = re.compile(rb"county:\s*'([^']+)'")
+population_pattern = re.compile(rb"population:\s*(\d+)")
+municipality_pattern = re.compile(rb"municipalityType:\s*'([^']+)'")
+last_reviewed_pattern = re.compile(rb"lastReviewed:\s*'([^']+)'")
+bylaw_updated_pattern = re.compile(rb"bylawLastUpdated:\s*'([^']+)'")
+bylaw_source_pattern = re.compile(rb"bylawSource:\s*'([^']+)'")
+ag_disapprovals_pattern = re.compile(rb"agDisapprovals:\s*(\d+)")
+ag_decision_date_pattern = re.compile(rb"agDecisionDate:\s*'([^']+)'")
+bylaw_source_title_pattern = re.compile(rb"bylawSourceTitle:\s*'([^']+)'")
+
+# Permit data
+permits_pattern = re.compile(
+    rb"permits:\s*\{\s*submitted:\s*(\d+),\s*approved:\s*(\d+),\s*denied:\s*(\d+),\s*pending:\s*(\d+),\s*approvalRate:\s*(\d+)"
+)
 
-    # Find all slug positions in the town section
-    slug_matches = list(slug_pattern.finditer(town_section))
+# Bottom line - handle both regular quotes and smart quotes
+bottom_line_pattern = re.compile(rb"bottomLine:\s*'((?:[^'\\]|\\.)*)'")
 
-    for i, slug_match in enumerate(slug_matches):
-        # Determine the block for this town
-        start = slug_match.start()
-        if i + 1 < len(slug_matches):
-            end = slug_matches[i + 1].start()
-        else:
-            end = len(town_section)
-
-        block = town_section[start:end]
-
-        slug = slug_match.group(1)
-        name_m = name_pattern.search(block)
-        county_m = county_pattern.search(block)
-        pop_m = population_pattern.search(block)
-        mtype_m = municipality_pattern.search(block)
-        reviewed_m = last_reviewed_pattern.search(block)
-        bylaw_upd_m = bylaw_updated_pattern.search(block)
-        bylaw_src_m = bylaw_source_pattern.search(block)
-        ag_dis_m = ag_disapprovals_pattern.search(block)
-        ag_date_m = ag_decision_date_pattern.search(block)
-        permits_m = permits_pattern.search(block)
-        bottom_m = bottom_line_pattern.search(block)
-        bylaw_title_m = bylaw_source_title_pattern.search(block)
-
-        # Extract provisions
-        provisions = []
-        for prov_m in provision_block_pattern.finditer(block):
-            prov_id = prov_m.group(1)
-            prov_name = prov_m.group(2)
-            prov_cat = prov_m.group(3)
-            prov_status = prov_m.group(4)
-
-            # Check if this provision has an AG decision
-            # Look in the block after this provision match for agDecision
-            prov_start = prov_m.end()
-            # Find the next provision or end of provisions array
-            next_prov = provision_block_pattern.search(block[prov_start:])
-            if next_prov:
-                prov_block = block[prov_start:prov_start + next_prov.start()]
-            else:
-                prov_block = block[prov_start:prov_start + 500]
-
-            ag_text_m = ag_decision_text_pattern.search(prov_block)
-            has_ag = ag_text_m is not None
-
-            provisions.append({
-                'id': prov_id,
-                'provision': prov_name,
-                'category': prov_cat,
-                'status': prov_status,
-                'has_ag_decision': has_ag,
-            })
-
-        town = {
-            'slug': slug,
-            'name': name_m.group(1) if name_m else slug,
-            'county': county_m.group(1) if county_m else '',
-            'population': int(pop_m.group(1)) if pop_m else 0,
-            'municipality_type': mtype_m.group(1) if mtype_m else 'town',
-            'last_reviewed': reviewed_m.group(1) if reviewed_m else '',
-            'bylaw_last_updated': bylaw_upd_m.group(1) if bylaw_upd_m else '',
-            'bylaw_source': bylaw_src_m.group(1) if bylaw_src_m else '',
-            'bylaw_source_title': bylaw_title_m.group(1) if bylaw_title_m else '',
-            'ag_disapprovals': int(ag_dis_m.group(1)) if ag_dis_m else 0,
-            'ag_decision_date': ag_date_m.group(1) if ag_date_m else None,
-            'permits': {
-                'submitted': int(permits_m.group(1)) if permits_m else 0,
-                'approved': int(permits_m.group(2)) if permits_m else 0,
-                'denied': int(permits_m.group(3)) if permits_m else 0,
-                'pending': int(permits_m.group(4)) if permits_m else 0,
-                'approval_rate': int(permits_m.group(5)) if permits_m else 0,
-            },
-            'bottom_line': bottom_m.group(1).replace('\\n', '\n') if bottom_m else '',
-            'provisions': provisions,
-        }
+# Provisions
+provision_block_pattern = re.compile(
+    rb"\{\s*id:\s*'([^']+)',\s*provision:\s*'([^']+)',\s*category:\s*'([^']+)',\s*status:\s*'([^']+)'",
+    re.DOTALL
+)
 
-        towns.append(town)
-
-    # Parse narrative cities
-    narrative_cities = []
-    if narrative_start > 0:
-        narr_section = content[narrative_start:]
-        narr_slugs = list(slug_pattern.finditer(narr_section))
-        for i, ns in enumerate(narr_slugs):
-            start = ns.start()
-            end = narr_slugs[i+1].start() if i+1 < len(narr_slugs) else len(narr_section)
-            block = narr_section[start:end]
-
-            slug = ns.group(1)
-            name_m = name_pattern.search(block)
-            permits_m = permits_pattern.search(block)
-            summary_m = re.search(r"summary:\s*'((?:[^'\\]|\\.)*)'", block)
-            tag_m = re.search(r"tag:\s*'([^']+)'", block)
-
-            narrative_cities.append({
-                'slug': slug,
-                'name': name_m.group(1) if name_m else slug,
-                'permits': {
-                    'submitted': int(permits_m.group(1)) if permits_m else 0,
-                    'approved': int(permits_m.group(2)) if permits_m else 0,
-                    'approval_rate': int(permits_m.group(5)) if permits_m else 0,
-                },
-                'summary': summary_m.group(1) if summary_m else '',
-                'tag': tag_m.group(1) if tag_m else '',
-            })
-
-    # Parse SOURCES object for appendix
+# AG decision text on provisions
+ag_decision_text_pattern = re.compile(rb"agDecision:\s*'((?:[^'\\]|\\.)*)'")
+
+# Provision detail (site shards; the PDF doesn't print these)
+state_law_pattern = re.compile(rb"stateLaw:\s*'((?:[^'\\]|\\.)*)'")
+local_bylaw_pattern = re.compile(rb"localBylaw:\s*'((?:[^'\\]|\\.)*)'")
+impact_pattern = re.compile(rb"impact:\s*'((?:[^'\\]|\\.)*)'")
+# URLs are either a SOURCES key or a literal: groups (key, literal)
+URL_REF = rb"(?:SOURCES\.(\w+)|'([^']*)')"
+citation_pattern = re.compile(rb"\{\s*label:\s*'((?:[^'\\]|\\.)*)',\s*url:\s*" + URL_REF + rb"\s*\}")
+
+# Optional town fields (site shards)
+is_open_pattern = re.compile(rb"isOpen:\s*(true|false)")
+is_exempt_pattern = re.compile(rb"isExempt:\s*(true|false)")
+resistance_tag_pattern = re.compile(rb"resistanceTag:\s*'([^']+)'")
+ag_decision_url_pattern = re.compile(rb"agDecisionUrl:\s*" + URL_REF)
+bylaw_retrieved_pattern = re.compile(rb"bylawRetrievedAt:\s*'([^']+)'")
+bylaw_source_url_pattern = re.compile(rb"bylawSourceUrl:\s*" + URL_REF)
+bylaw_version_pattern = re.compile(rb"bylawVersionDate:\s*'([^']+)'")
+
+# Narrative city fields
+summary_pattern = re.compile(rb"summary:\s*'((?:[^'\\]|\\.)*)'")
+tag_pattern = re.compile(rb"tag:\s*'([^']+)'")
+title_pattern = re.compile(rb"\btitle:\s*'((?:[^'\\]|\\.)*)'")
+body_pattern = re.compile(rb"\bbody:\s*'((?:[^'\\]|\\.)*)'")
+
+# Text fields that get a cached Paragraph-safe copy under record['markup']
+TOWN_TEXT_FIELDS = ('name', 'county', 'bylaw_source', 'bylaw_last_updated', 'bylaw_source_title', 'bottom_line')
+TOWN_PROSE_FIELDS = ('bottom_line',)    # body text: em dashes are spaced
+PROVISION_TEXT_FIELDS = ('provision', 'category')
+NARRATIVE_TEXT_FIELDS = ('name', 'summary')
+SOURCE_TEXT_FIELDS = ('label', 'url')
+
+sources_pattern = re.compile(rb'const SOURCES = \{(.*?)\} as const;', re.DOTALL)
+source_entry_pattern = re.compile(rb"/\*\*\s*(.*?)\s*\*/\s*(\w+):\s*'([^']+)'")
+
+
+def split_slug_blocks(buf, start=0, end=None):
+    """Split buf[start:end] into one bytes block per `slug:` entry."""
+    end = len(buf) if end is None else end
+    starts = [m.start() for m in slug_pattern.finditer(buf, start, end)]
+    return [buf[a:b] for a, b in zip(starts, starts[1:] + [end])]
+
+
+def _str(m, group=1, default=''):
+    """A captured field as str (plain UTF-8 decode), or default when absent."""
+    raw = m.group(group) if m else None
+    return raw.decode('utf-8') if raw is not None else default
+
+
+def _js(m, group=1, default=''):
+    """A captured string literal body, escapes decoded, or default when absent."""
+    raw = m.group(group) if m else None
+    return text(raw) if raw is not None else default
+
+
+def _bool(m):
+    return m.group(1) == b'true' if m else False
+
+
+def _url_ref(m, group=1):
+    """{'source': SOURCES key, 'url': literal} for a URL_REF match (one of them None), or None."""
+    if not m:
+        return None
+    return {'source': _str(m, group, None), 'url': _str(m, group + 1, None)}
+
+
+def parse_citations(block, start, end):
+    """[{label, source, url}] for the `{ label, url }` entries in block[start:end]."""
+    return [dict(_url_ref(m, 2), label=_js(m)) for m in citation_pattern.finditer(block, start, end)]
+
+
+def parse_town_block(block):
+    slug = _str(slug_pattern.match(block))
+    name_m = name_pattern.search(block)
+    county_m = county_pattern.search(block)
+    pop_m = population_pattern.search(block)
+    mtype_m = municipality_pattern.search(block)
+    reviewed_m = last_reviewed_pattern.search(block)
+    bylaw_upd_m = bylaw_updated_pattern.search(block)
+    bylaw_src_m = bylaw_source_pattern.search(block)
+    ag_dis_m = ag_disapprovals_pattern.search(block)
+    ag_date_m = ag_decision_date_pattern.search(block)
+    permits_m = permits_pattern.search(block)
+    bottom_m = bottom_line_pattern.search(block)
+    bylaw_title_m = bylaw_source_title_pattern.search(block)
+
+    # Extract provisions
+    provisions = []
+    for prov_m in provision_block_pattern.finditer(block):
+        # Fields between this provision and the next one (or the end of
+        # the town block) belong to it
+        prov_start = prov_m.end()
+        next_prov = provision_block_pattern.search(block, prov_start)
+        prov_end = next_prov.start() if next_prov else len(block)
+        ag_text_m = ag_decision_text_pattern.search(block, prov_start, prov_end)
+
+        provisions.append(add_markup({
+            'id': _str(prov_m, 1),
+            'provision': _js(prov_m, 2),
+            'category': _str(prov_m, 3),
+            'status': _str(prov_m, 4),
+            'has_ag_decision': ag_text_m is not None,
+            'ag_decision': _js(ag_text_m, default=None),
+            'state_law': _js(state_law_pattern.search(block, prov_start, prov_end)),
+            'local_bylaw': _js(local_bylaw_pattern.search(block, prov_start, prov_end)),
+            'impact': _js(impact_pattern.search(block, prov_start, prov_end)),
+            'citations': parse_citations(block, prov_start, prov_end),
+        }, PROVISION_TEXT_FIELDS))
+
+    return add_markup({
+        'slug': slug,
+        'name': _js(name_m, default=slug),
+        'county': _str(county_m),
+        'population': int(pop_m.group(1)) if pop_m else 0,
+        'municipality_type': _str(mtype_m, default='town'),
+        'last_reviewed': _str(reviewed_m),
+        'bylaw_last_updated': _str(bylaw_upd_m),
+        'bylaw_source': _js(bylaw_src_m),
+        'bylaw_source_title': _js(bylaw_title_m),
+        'ag_disapprovals': int(ag_dis_m.group(1)) if ag_dis_m else 0,
+        'ag_decision_date': _str(ag_date_m, default=None),
+        'permits': {
+            'submitted': int(permits_m.group(1)) if permits_m else 0,
+            'approved': int(permits_m.group(2)) if permits_m else 0,
+            'denied': int(permits_m.group(3)) if permits_m else 0,
+            'pending': int(permits_m.group(4)) if permits_m else 0,
+            'approval_rate': int(permits_m.group(5)) if permits_m else 0,
+        },
+        'bottom_line': _js(bottom_m),
+        'is_open': _bool(is_open_pattern.search(block)),
+        'is_exempt': _bool(is_exempt_pattern.search(block)),
+        'resistance_tag': _str(resistance_tag_pattern.search(block), default=None),
+        'ag_decision_url': _url_ref(ag_decision_url_pattern.search(block)),
+        'bylaw_retrieved_at': _str(bylaw_retrieved_pattern.search(block), default=None),
+        'bylaw_source_url': _url_ref(bylaw_source_url_pattern.search(block)),
+        'bylaw_version_date': _str(bylaw_version_pattern.search(block), default=None),
+        'provisions': provisions,
+    }, TOWN_TEXT_FIELDS, TOWN_PROSE_FIELDS)
+
+
+def parse_narrative_block(block):
+    slug = _str(slug_pattern.match(block))
+    name_m = name_pattern.search(block)
+    county_m = county_pattern.search(block)
+    permits_m = permits_pattern.search(block)
+    summary_m = summary_pattern.search(block)
+    tag_m = tag_pattern.search(block)
+    pop_m = population_pattern.search(block)
+
+    return add_markup({
+        'slug': slug,
+        'name': _js(name_m, default=slug),
+        'county': _str(county_m),
+        'population': int(pop_m.group(1)) if pop_m else 0,
+        'municipality_type': _str(municipality_pattern.search(block), default='city'),
+        'last_reviewed': _str(last_reviewed_pattern.search(block)),
+        'permits': {
+            'submitted': int(permits_m.group(1)) if permits_m else 0,
+            'approved': int(permits_m.group(2)) if permits_m else 0,
+            'denied': int(permits_m.group(3)) if permits_m else 0,
+            'pending': int(permits_m.group(4)) if permits_m else 0,
+            'approval_rate': int(permits_m.group(5)) if permits_m else 0,
+        },
+        'summary': _js(summary_m),
+        'tag': _str(tag_m),
+        'title': _js(title_pattern.search(block)),
+        'body': _js(body_pattern.search(block)),
+    }, NARRATIVE_TEXT_FIELDS)
+
+
+def parse_sources(buf):
+    """Parse the SOURCES object for the appendix."""
     sources = {}
-    sources_section = re.search(r'const SOURCES = \{(.*?)\} as const;', content, re.DOTALL)
+    sources_section = sources_pattern.search(buf)
     if sources_section:
-        src_text = sources_section.group(1)
-        for m in re.finditer(r"/\*\*\s*(.*?)\s*\*/\s*(\w+):\s*'([^']+)'", src_text):
-            sources[m.group(2)] = {'label': m.group(1), 'url': m.group(3)}
+        for m in source_entry_pattern.finditer(buf, sources_section.start(1), sources_section.end(1)):
+            sources[_str(m, 2)] = add_markup({'label': _str(m, 1), 'url': _str(m, 3)}, SOURCE_TEXT_FIELDS)
+    return sources
+
+
+def _cached_parse(parser, block, cache):
+    """Parse a block, reusing the previous result when its text is unchanged."""
+    if cache is None:
+        return parser(block)
+    key = (parser.__name__, block)
+    if key not in cache:
+        cache[key] = parser(block)
+    return cache[key]
+
+
+def parse_compliance_data(filepath, cache=None):
+    """
+    Parse towns, narrative cities and sources from compliance-data.ts.
+
+    The file is memory-mapped and scanned as bytes; each town block is copied
+    out and parsed on its own, and only matched field values are decoded.
+
+    `cache` is an optional dict kept by long-running callers (watch mode):
+    blocks whose text is unchanged since the last parse are not re-parsed.
+    """
+    with mapped(filepath) as buf:
+        # Find the start of the towns array and narrative cities array
+        towns_start = buf.find(b"export const towns: TownComplianceProfile[] = [")
+        narrative_start = buf.find(b"export const narrativeCities: NarrativeCityProfile[] = [")
+
+        if towns_start == -1:
+            # Fallback: look for first slug
+            towns_start = 0
+
+        # Each town starts with { slug: and ends with the next town or ]
+        town_end = narrative_start if narrative_start > 0 else len(buf)
+        towns = [_cached_parse(parse_town_block, block, cache)
+                 for block in split_slug_blocks(buf, towns_start, town_end)]
+
+        narrative_cities = []
+        if narrative_start > 0:
+            narrative_cities = [_cached_parse(parse_narrative_block, block, cache)
+                                for block in split_slug_blocks(buf, narrative_start)]
+
+        sources = parse_sources(buf)
+
+    if cache is not None:
+        # Drop entries for blocks that no longer exist
+        live = {id(t) for t in towns} | {id(n) for n in narrative_cities}
+        for key in [k for k, v in cache.items() if id(v) not in live]:
+            del cache[key]
 
     return towns, narrative_cities, sources
 
 
-# ── Parse data ───────────────────────────────────────────────────────────
+# ── Statistics ───────────────────────────────────────────────────────────
 
 DATA_FILE = os.path.join(os.path.dirname(__file__), 'src', 'app', 'compliance', 'compliance-data.ts')
-towns, narrative_cities, sources = parse_compliance_data(DATA_FILE)
 
-# Filter to only allEntries towns (not narrative cities)
-# The narrative cities are separately parsed
+def compute_stats(towns, index):
+    """Headline totals for the report, answered from the provision index."""
+    total_inconsistent = index.count(status='inconsistent')
+    total_ag_disapproved = index.count(ag=True)
+    inconsistent_slugs = set(index.towns(status='inconsistent'))
+    ag_decision_slugs = set(index.towns(ag=True))
+    towns_with_ag = [t for t in towns if t['ag_disapprovals'] > 0]
+
+    return {
+        'total_provisions': index.count(),
+        'total_inconsistent': total_inconsistent,
+        'total_review': index.count(status='review'),
+        'total_consistent': index.count(status='compliant'),
+        'total_ag_disapproved': total_ag_disapproved,
+        'total_statutory_conflict': total_inconsistent - total_ag_disapproved,
+        'towns_with_ag': towns_with_ag,
+        'towns_with_ag_decisions': [t for t in towns_with_ag if t['slug'] in ag_decision_slugs],
+        'towns_with_inconsistencies': [t for t in towns if t['slug'] in inconsistent_slugs],
+        # Provision type / category frequency among inconsistent provisions
+        'provision_type_counts': index.counts_by('provision', status='inconsistent'),
+        'category_counts': index.counts_by('category', status='inconsistent'),
+    }
 
-# ── Compute statistics ───────────────────────────────────────────────────
 
-total_provisions = sum(len(t['provisions']) for t in towns)
-total_inconsistent = sum(1 for t in towns for p in t['provisions'] if p['status'] == 'inconsistent')
-total_review = sum(1 for t in towns for p in t['provisions'] if p['status'] == 'review')
-total_consistent = sum(1 for t in towns for p in t['provisions'] if p['status'] == 'compliant')
-total_ag_disapproved = sum(1 for t in towns for p in t['provisions'] if p['has_ag_decision'])
-total_statutory_conflict = total_inconsistent - total_ag_disapproved
+def tier_counts(t):
+    """Provisions per confidence tier for one town (AG-disapproved ones only in ag_disapproved)."""
+    provisions = t['provisions']
+    return {
+        'ag_disapproved': sum(1 for p in provisions if p['has_ag_decision']),
+        'inconsistent': sum(1 for p in provisions if p['status'] == 'inconsistent' and not p['has_ag_decision']),
+        'review': sum(1 for p in provisions if p['status'] == 'review'),
+        'consistent': sum(1 for p in provisions if p['status'] == 'compliant'),
+        'total': len(provisions),
+    }
 
-towns_with_ag = [t for t in towns if t['ag_disapprovals'] > 0]
-towns_with_inconsistencies = [t for t in towns if any(p['status'] == 'inconsistent' for p in t['provisions'])]
 
-# Provision type frequency
-provision_type_counter = Counter()
-for t in towns:
-    for p in t['provisions']:
-        if p['status'] == 'inconsistent':
-            provision_type_counter[p['provision']] += 1
+def inconsistent_counts(towns):
+    return {t['slug']: sum(p['status'] == 'inconsistent' for p in t['provisions']) for t in towns}
+
+
+def load_report_data(filepath=DATA_FILE, cache=None, seo_file=SEO_DATA_FILE, geo_file=HLC_DATA_FILE,
+                     velocity=None):
+    """Parse the data modules and build the index, statistics and regional peers.
+
+    `velocity` is a permit_velocity.VelocityStore; without one the permit logs
+    are folded into an in-memory store.
+    """
+    towns, narrative_cities, sources = parse_compliance_data(filepath, cache)
+    if velocity is None:
+        velocity = VelocityStore(None)
+        ingest_permit_logs(velocity)
+    index = build_index(towns)
+    seo = parse_town_seo_data(seo_file)
+    points = load_town_points(geo_file)
+    return {
+        'towns': towns,
+        'narrative_cities': narrative_cities,
+        'sources': sources,
+        'index': index,
+        'stats': compute_stats(towns, index),
+        'seo': seo,
+        'seo_metrics': compute_metrics(seo),
+        'scorecards': compute_scorecards(seo, towns, load_median_days(seo)),
+        'points': points,
+        'velocity': velocity,
+        'peers': regional_peers(points, inconsistent_counts(towns)),
+    }
 
-# Category frequency
-category_counter = Counter()
-for t in towns:
-    for p in t['provisions']:
-        if p['status'] == 'inconsistent':
-            category_counter[p['category']] += 1
+
+def filter_report_data(data, predicate):
+    """Report data restricted to towns (and narrative cities) matching `predicate`."""
+    towns = [t for t in data['towns'] if predicate(t)]
+    index = build_index(towns)
+    return dict(
+        data,
+        towns=towns,
+        narrative_cities=[nc for nc in data['narrative_cities'] if predicate(nc)],
+        index=index,
+        stats=compute_stats(towns, index),
+    )
 
 
 # ── PDF Generation ───────────────────────────────────────────────────────
 
 OUTPUT_FILE = os.path.join(os.path.dirname(__file__), 'adu-compliance-snapshot-q1-2026.pdf')
+REPORT_TITLE = 'Massachusetts ADU Compliance Snapshot — Q1 2026'
+REPORT_AUTHOR = 'ADU Pulse'
+# Precomputed JSON artifacts served to the site
+EXPORT_DIR = os.path.join(os.path.dirname(__file__), 'public', 'data')
 
 def format_date(iso_date):
     """Convert ISO date to readable format."""
@@ -272,6 +441,18 @@ def format_date_short(iso_date):
     except:
         return iso_date
 
+NUMBER_WORDS = ('zero', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten')
+
+
+def count_word(n):
+    return NUMBER_WORDS[n] if 0 <= n < len(NUMBER_WORDS) else str(n)
+
+
+def ordinal(n):
+    """1 -> '1st', 22 -> '22nd', 83 -> '83rd', 11 -> '11th'."""
+    suffix = 'th' if 10 <= n % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+    return f"{n}{suffix}"
+
 
 # ── Styles ───────────────────────────────────────────────────────────────
 
@@ -406,462 +587,656 @@ def add_cover_footer(canvas, doc):
     pass
 
 
-# ── Build document ───────────────────────────────────────────────────────
+# ═══════════════════════════════════════════════════════════════════════════
+# COVER PAGE
+# ═══════════════════════════════════════════════════════════════════════════
 
-doc = SimpleDocTemplate(
-    OUTPUT_FILE,
-    pagesize=letter,
-    topMargin=0.75*inch,
-    bottomMargin=0.75*inch,
-    leftMargin=1*inch,
-    rightMargin=1*inch,
-)
+def cover_section(data):
+    story = []
+    story.append(Spacer(1, 2*inch))
 
-story = []
+    # Decorative line
+    story.append(HRFlowable(
+        width="60%", thickness=2, color=NAVY,
+        spaceAfter=20, spaceBefore=0,
+    ))
 
+    story.append(Paragraph(
+        "Massachusetts ADU<br/>Compliance Snapshot",
+        cover_title_style,
+    ))
+    story.append(Paragraph("Q1 2026", ParagraphStyle(
+        'Q1', parent=cover_title_style, fontSize=22, textColor=BLUE_ACCENT,
+        spaceBefore=4, spaceAfter=16,
+    )))
+    edition_title = data.get('edition', {}).get('title')
+    if edition_title:
+        story.append(Paragraph(to_markup(edition_title), ParagraphStyle(
+            'Edition', parent=cover_subtitle_style, textColor=NAVY, spaceAfter=16,
+        )))
+
+    story.append(HRFlowable(
+        width="40%", thickness=1, color=MID_GRAY,
+        spaceAfter=20, spaceBefore=0,
+    ))
 
-# ═══════════════════════════════════════════════════════════════════════════
-# COVER PAGE
-# ═══════════════════════════════════════════════════════════════════════════
+    story.append(Paragraph(
+        "A structured analysis of local ADU bylaw consistency<br/>"
+        "with MGL c.40A §3 and 760 CMR 71.00",
+        cover_subtitle_style,
+    ))
+    story.append(Spacer(1, 30))
+    story.append(Paragraph(
+        "Prepared by ADU Pulse — adupulse.com",
+        cover_meta_style,
+    ))
+    story.append(Spacer(1, 8))
+    story.append(Paragraph("February 2026", cover_meta_style))
 
-story.append(Spacer(1, 2*inch))
-
-# Decorative line
-story.append(HRFlowable(
-    width="60%", thickness=2, color=NAVY,
-    spaceAfter=20, spaceBefore=0,
-))
-
-story.append(Paragraph(
-    "Massachusetts ADU<br/>Compliance Snapshot",
-    cover_title_style,
-))
-story.append(Paragraph("Q1 2026", ParagraphStyle(
-    'Q1', parent=cover_title_style, fontSize=22, textColor=BLUE_ACCENT,
-    spaceBefore=4, spaceAfter=16,
-)))
-
-story.append(HRFlowable(
-    width="40%", thickness=1, color=MID_GRAY,
-    spaceAfter=20, spaceBefore=0,
-))
-
-story.append(Paragraph(
-    "A structured analysis of local ADU bylaw consistency<br/>"
-    "with MGL c.40A §3 and 760 CMR 71.00",
-    cover_subtitle_style,
-))
-story.append(Spacer(1, 30))
-story.append(Paragraph(
-    "Prepared by ADU Pulse — adupulse.com",
-    cover_meta_style,
-))
-story.append(Spacer(1, 8))
-story.append(Paragraph("February 2026", cover_meta_style))
-
-story.append(Spacer(1, 1.5*inch))
-
-# Disclaimer at bottom of cover
-story.append(Paragraph(
-    "<i>This report provides structured statutory comparison and public-record analysis. "
-    "It does not render legal opinions or determine enforceability in specific cases.</i>",
-    ParagraphStyle('CoverDisclaimer', parent=body_italic_style,
-                   fontSize=8, alignment=TA_CENTER, textColor=MID_GRAY),
-))
-
-story.append(PageBreak())
+    story.append(Spacer(1, 1.5*inch))
+
+    # Disclaimer at bottom of cover
+    story.append(Paragraph(
+        "<i>This report provides structured statutory comparison and public-record analysis. "
+        "It does not render legal opinions or determine enforceability in specific cases.</i>",
+        ParagraphStyle('CoverDisclaimer', parent=body_italic_style,
+                       fontSize=8, alignment=TA_CENTER, textColor=MID_GRAY),
+    ))
+
+    story.append(PageBreak())
+
+    return story
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # EXECUTIVE SUMMARY
 # ═══════════════════════════════════════════════════════════════════════════
 
-story.append(Paragraph("Executive Summary", h1_style))
-story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
+def executive_summary_section(data):
+    towns = data['towns']
+    stats = data['stats']
+    story = []
+    story.append(Paragraph("Executive Summary", h1_style))
+    story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
+
+    exec_paras = [
+        "Massachusetts legalized accessory dwelling units (ADUs) statewide effective February 2, 2025, "
+        "through Chapter 150 of the Acts of 2024. The law amended MGL c.40A §3 to establish the right "
+        "to build a first ADU by right on any single-family lot, with implementing regulations at 760 CMR 71.00.",
+
+        "In the first full year of the law, 1,639 ADU applications were filed and 1,224 approved across "
+        "293 Massachusetts municipalities responding to the EOHLC survey. ADUs now represent more than "
+        "25% of new housing permitted statewide, making them a significant contributor to the state's "
+        "housing production.",
+
+        "However, many municipalities have adopted or retained local bylaws and ordinances that appear "
+        "inconsistent with state law. This creates confusion for homeowners, uncertainty for builders, "
+        "and potential legal exposure for municipalities.",
+
+        f"This report analyzes <b>{len(towns)} municipalities</b> and identifies <b>{stats['total_inconsistent']} provisions</b> "
+        f"across <b>{len(stats['category_counts'])} categories</b> that appear inconsistent with Chapter 150 and 760 CMR 71.00.",
+
+        f"The Massachusetts Attorney General has formally disapproved provisions in "
+        f"<b>{len(stats['towns_with_ag'])} towns</b> to date, striking down <b>{stats['total_ag_disapproved']} provisions</b> "
+        f"as inconsistent with state law. An additional <b>{stats['total_statutory_conflict']} provisions</b> across "
+        f"<b>{len(stats['towns_with_inconsistencies']) - len(stats['towns_with_ag_decisions'])} additional communities</b> "
+        f"appear inconsistent based on ADU Pulse's statutory analysis but have not yet been the subject of AG action.",
+
+        f"A further <b>{stats['total_review']} provisions</b> are classified as needing review — they fall in a "
+        f"gray area where the municipality's authority is unclear and further legal evaluation is recommended.",
+    ]
 
-exec_paras = [
-    "Massachusetts legalized accessory dwelling units (ADUs) statewide effective February 2, 2025, "
-    "through Chapter 150 of the Acts of 2024. The law amended MGL c.40A §3 to establish the right "
-    "to build a first ADU by right on any single-family lot, with implementing regulations at 760 CMR 71.00.",
+    for para in exec_paras:
+        story.append(Paragraph(para, body_style))
+
+    # Key stats box
+    story.append(Spacer(1, 12))
+    stats_data = [
+        [Paragraph('<b>Metric</b>', table_header_style),
+         Paragraph('<b>Value</b>', table_header_style)],
+        [Paragraph('Communities analyzed', table_cell_style),
+         Paragraph(f'{len(towns)}', table_cell_bold)],
+        [Paragraph('Total provisions reviewed', table_cell_style),
+         Paragraph(str(stats['total_provisions']), table_cell_bold)],
+        [Paragraph('Provisions inconsistent with state law', table_cell_style),
+         Paragraph(str(stats['total_inconsistent']), table_cell_bold)],
+        [Paragraph('AG-disapproved provisions', table_cell_style),
+         Paragraph(str(stats['total_ag_disapproved']), table_cell_bold)],
+        [Paragraph('Provisions needing review', table_cell_style),
+         Paragraph(str(stats['total_review']), table_cell_bold)],
+        [Paragraph('Provisions consistent with state law', table_cell_style),
+         Paragraph(str(stats['total_consistent']), table_cell_bold)],
+        [Paragraph('Towns with AG disapprovals', table_cell_style),
+         Paragraph(str(len(stats['towns_with_ag'])), table_cell_bold)],
+    ]
 
-    "In the first full year of the law, 1,639 ADU applications were filed and 1,224 approved across "
-    "293 Massachusetts municipalities responding to the EOHLC survey. ADUs now represent more than "
-    "25% of new housing permitted statewide, making them a significant contributor to the state's "
-    "housing production.",
+    stats_table = Table(stats_data, colWidths=[3.5*inch, 2*inch])
+    stats_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+        ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [WHITE, LIGHT_GRAY]),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('LEFTPADDING', (0, 0), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+    ]))
+    story.append(stats_table)
 
-    "However, many municipalities have adopted or retained local bylaws and ordinances that appear "
-    "inconsistent with state law. This creates confusion for homeowners, uncertainty for builders, "
-    "and potential legal exposure for municipalities.",
+    story.append(PageBreak())
 
-    f"This report analyzes <b>{len(towns)} municipalities</b> and identifies <b>{total_inconsistent} provisions</b> "
-    f"across <b>{len(category_counter)} categories</b> that appear inconsistent with Chapter 150 and 760 CMR 71.00.",
+    return story
 
-    f"The Massachusetts Attorney General has formally disapproved provisions in "
-    f"<b>{len(towns_with_ag)} towns</b> to date, striking down <b>{total_ag_disapproved} provisions</b> "
-    f"as inconsistent with state law. An additional <b>{total_statutory_conflict} provisions</b> across "
-    f"<b>{len(towns_with_inconsistencies) - len([t for t in towns_with_ag if any(p['has_ag_decision'] for p in t['provisions'])])} additional communities</b> "
-    f"appear inconsistent based on ADU Pulse's statutory analysis but have not yet been the subject of AG action.",
 
-    f"A further <b>{total_review} provisions</b> are classified as needing review — they fall in a "
-    f"gray area where the municipality's authority is unclear and further legal evaluation is recommended.",
-]
+# ═══════════════════════════════════════════════════════════════════════════
+# METHODOLOGY
+# ═══════════════════════════════════════════════════════════════════════════
 
-for para in exec_paras:
-    story.append(Paragraph(para, body_style))
-
-# Key stats box
-story.append(Spacer(1, 12))
-stats_data = [
-    [Paragraph('<b>Metric</b>', table_header_style),
-     Paragraph('<b>Value</b>', table_header_style)],
-    [Paragraph('Communities analyzed', table_cell_style),
-     Paragraph(f'{len(towns)}', table_cell_bold)],
-    [Paragraph('Total provisions reviewed', table_cell_style),
-     Paragraph(f'{total_provisions}', table_cell_bold)],
-    [Paragraph('Provisions inconsistent with state law', table_cell_style),
-     Paragraph(f'{total_inconsistent}', table_cell_bold)],
-    [Paragraph('AG-disapproved provisions', table_cell_style),
-     Paragraph(f'{total_ag_disapproved}', table_cell_bold)],
-    [Paragraph('Provisions needing review', table_cell_style),
-     Paragraph(f'{total_review}', table_cell_bold)],
-    [Paragraph('Provisions consistent with state law', table_cell_style),
-     Paragraph(f'{total_consistent}', table_cell_bold)],
-    [Paragraph('Towns with AG disapprovals', table_cell_style),
-     Paragraph(f'{len(towns_with_ag)}', table_cell_bold)],
-]
+def methodology_section(data):
+    stats = data['stats']
+    story = []
+    story.append(Paragraph("Methodology", h1_style))
+    story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
 
-stats_table = Table(stats_data, colWidths=[3.5*inch, 2*inch])
-stats_table.setStyle(TableStyle([
-    ('BACKGROUND', (0, 0), (-1, 0), NAVY),
-    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
-    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [WHITE, LIGHT_GRAY]),
-    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ('TOPPADDING', (0, 0), (-1, -1), 6),
-    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ('LEFTPADDING', (0, 0), (-1, -1), 8),
-    ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-]))
-story.append(stats_table)
+    story.append(Paragraph(
+        "Every analysis in this report follows a consistent process:",
+        body_style,
+    ))
 
-story.append(PageBreak())
+    method_steps = [
+        "We read the full local ADU bylaw or ordinance as adopted by the municipality.",
+        "We compare each provision against Massachusetts Chapter 150 (the Affordable Homes Act) "
+        "and the implementing regulations at 760 CMR 71.00.",
+        "For towns, we review all published Attorney General decisions on that town's bylaw, "
+        "including partial disapprovals. City ordinances are not subject to AG review — those "
+        "inconsistencies are identified through independent analysis.",
+        "We classify each provision into one of four confidence tiers based on available evidence.",
+    ]
+    for step in method_steps:
+        story.append(Paragraph(f"• {step}", bullet_style))
 
+    story.append(Spacer(1, 12))
+    story.append(Paragraph(
+        "<i>This platform provides structured statutory comparison and public-record analysis. "
+        "It does not render legal opinions or determine enforceability in specific cases. "
+        "Consult a zoning attorney for project-specific guidance.</i>",
+        body_italic_style,
+    ))
 
-# ═══════════════════════════════════════════════════════════════════════════
-# METHODOLOGY
-# ═══════════════════════════════════════════════════════════════════════════
+    story.append(Spacer(1, 16))
+    story.append(Paragraph("Confidence Tiers", h2_style))
+
+    tier_data = [
+        [Paragraph('<b>Tier</b>', table_header_style),
+         Paragraph('<b>Definition</b>', table_header_style),
+         Paragraph('<b>Count</b>', table_header_style)],
+        [Paragraph('AG Disapproved', ParagraphStyle('', parent=table_cell_bold, textColor=colors.HexColor('#dc2626'))),
+         Paragraph('The Attorney General has formally disapproved this provision as inconsistent with state law.', table_cell_style),
+         Paragraph(str(stats['total_ag_disapproved']), table_cell_bold)],
+        [Paragraph('Appears Inconsistent', ParagraphStyle('', parent=table_cell_bold, textColor=colors.HexColor('#ea580c'))),
+         Paragraph('ADU Pulse analysis identifies this provision as appearing to conflict with G.L. c. 40A §3 or 760 CMR 71.00, but no AG decision exists.', table_cell_style),
+         Paragraph(str(stats['total_statutory_conflict']), table_cell_bold)],
+        [Paragraph('Needs Review', ParagraphStyle('', parent=table_cell_bold, textColor=colors.HexColor('#d97706'))),
+         Paragraph('The provision is in a gray area and may face future challenges. Further legal evaluation recommended.', table_cell_style),
+         Paragraph(str(stats['total_review']), table_cell_bold)],
+        [Paragraph('Consistent', ParagraphStyle('', parent=table_cell_bold, textColor=colors.HexColor('#059669'))),
+         Paragraph('The provision appears consistent with state law. No issues expected.', table_cell_style),
+         Paragraph(str(stats['total_consistent']), table_cell_bold)],
+    ]
 
-story.append(Paragraph("Methodology", h1_style))
-story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
-
-story.append(Paragraph(
-    "Every analysis in this report follows a consistent process:",
-    body_style,
-))
-
-method_steps = [
-    "We read the full local ADU bylaw or ordinance as adopted by the municipality.",
-    "We compare each provision against Massachusetts Chapter 150 (the Affordable Homes Act) "
-    "and the implementing regulations at 760 CMR 71.00.",
-    "For towns, we review all published Attorney General decisions on that town's bylaw, "
-    "including partial disapprovals. City ordinances are not subject to AG review — those "
-    "inconsistencies are identified through independent analysis.",
-    "We classify each provision into one of four confidence tiers based on available evidence.",
-]
-for step in method_steps:
-    story.append(Paragraph(f"• {step}", bullet_style))
-
-story.append(Spacer(1, 12))
-story.append(Paragraph(
-    "<i>This platform provides structured statutory comparison and public-record analysis. "
-    "It does not render legal opinions or determine enforceability in specific cases. "
-    "Consult a zoning attorney for project-specific guidance.</i>",
-    body_italic_style,
-))
-
-story.append(Spacer(1, 16))
-story.append(Paragraph("Confidence Tiers", h2_style))
-
-tier_data = [
-    [Paragraph('<b>Tier</b>', table_header_style),
-     Paragraph('<b>Definition</b>', table_header_style),
-     Paragraph('<b>Count</b>', table_header_style)],
-    [Paragraph('AG Disapproved', ParagraphStyle('', parent=table_cell_bold, textColor=colors.HexColor('#dc2626'))),
-     Paragraph('The Attorney General has formally disapproved this provision as inconsistent with state law.', table_cell_style),
-     Paragraph(str(total_ag_disapproved), table_cell_bold)],
-    [Paragraph('Appears Inconsistent', ParagraphStyle('', parent=table_cell_bold, textColor=colors.HexColor('#ea580c'))),
-     Paragraph('ADU Pulse analysis identifies this provision as appearing to conflict with G.L. c. 40A §3 or 760 CMR 71.00, but no AG decision exists.', table_cell_style),
-     Paragraph(str(total_statutory_conflict), table_cell_bold)],
-    [Paragraph('Needs Review', ParagraphStyle('', parent=table_cell_bold, textColor=colors.HexColor('#d97706'))),
-     Paragraph('The provision is in a gray area and may face future challenges. Further legal evaluation recommended.', table_cell_style),
-     Paragraph(str(total_review), table_cell_bold)],
-    [Paragraph('Consistent', ParagraphStyle('', parent=table_cell_bold, textColor=colors.HexColor('#059669'))),
-     Paragraph('The provision appears consistent with state law. No issues expected.', table_cell_style),
-     Paragraph(str(total_consistent), table_cell_bold)],
-]
+    tier_table = Table(tier_data, colWidths=[1.4*inch, 3.6*inch, 0.7*inch])
+    tier_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+        ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [WHITE, LIGHT_GRAY]),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+    ]))
+    story.append(tier_table)
 
-tier_table = Table(tier_data, colWidths=[1.4*inch, 3.6*inch, 0.7*inch])
-tier_table.setStyle(TableStyle([
-    ('BACKGROUND', (0, 0), (-1, 0), NAVY),
-    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
-    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [WHITE, LIGHT_GRAY]),
-    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ('TOPPADDING', (0, 0), (-1, -1), 6),
-    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ('LEFTPADDING', (0, 0), (-1, -1), 6),
-    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-]))
-story.append(tier_table)
-
-story.append(Spacer(1, 16))
-story.append(Paragraph("Data Sources", h2_style))
-
-data_sources = [
-    "<b>EOHLC ADU Survey (February 2026)</b> — Statewide survey of all 351 municipalities, "
-    "providing aggregate counts of ADU applications submitted, approved, and denied.",
-    "<b>U.S. Census Bureau</b> — American Community Survey population estimates and "
-    "Building Permit Survey data for housing production context.",
-    "<b>Attorney General Municipal Law Unit</b> — Published AG decisions on town bylaw "
-    "articles, including partial and full disapprovals.",
-    "<b>Municipal Bylaws and Ordinances</b> — The full text of each municipality's ADU "
-    "bylaw or ordinance as publicly available on municipal websites or ecode360.",
-]
-for src in data_sources:
-    story.append(Paragraph(f"• {src}", bullet_style))
+    story.append(Spacer(1, 16))
+    story.append(Paragraph("Data Sources", h2_style))
+
+    data_sources = [
+        "<b>EOHLC ADU Survey (February 2026)</b> — Statewide survey of all 351 municipalities, "
+        "providing aggregate counts of ADU applications submitted, approved, and denied.",
+        "<b>U.S. Census Bureau</b> — American Community Survey population estimates and "
+        "Building Permit Survey data for housing production context.",
+        "<b>Attorney General Municipal Law Unit</b> — Published AG decisions on town bylaw "
+        "articles, including partial and full disapprovals.",
+        "<b>Municipal Bylaws and Ordinances</b> — The full text of each municipality's ADU "
+        "bylaw or ordinance as publicly available on municipal websites or ecode360.",
+    ]
+    for src in data_sources:
+        story.append(Paragraph(f"• {src}", bullet_style))
 
-story.append(PageBreak())
+    story.append(PageBreak())
+
+    return story
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # CONFIDENCE TIER SUMMARY
 # ═══════════════════════════════════════════════════════════════════════════
 
-story.append(Paragraph("Confidence Tier Summary", h1_style))
-story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
-
-story.append(Paragraph(
-    f"Across {len(towns)} municipalities analyzed, ADU Pulse reviewed {total_provisions} "
-    f"individual provisions. The distribution across confidence tiers is shown below.",
-    body_style,
-))
-
-# Per-town tier breakdown table
-tier_summary_header = [
-    Paragraph('<b>Municipality</b>', table_header_style),
-    Paragraph('<b>AG Disapproved</b>', table_header_style),
-    Paragraph('<b>Appears Inconsistent</b>', table_header_style),
-    Paragraph('<b>Needs Review</b>', table_header_style),
-    Paragraph('<b>Consistent</b>', table_header_style),
-    Paragraph('<b>Total</b>', table_header_style),
-]
+def tier_summary_section(data):
+    towns = data['towns']
+    stats = data['stats']
+    story = []
+    story.append(Paragraph("Confidence Tier Summary", h1_style))
+    story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
+
+    story.append(Paragraph(
+        f"Across {len(towns)} municipalities analyzed, ADU Pulse reviewed {stats['total_provisions']} "
+        f"individual provisions. The distribution across confidence tiers is shown below.",
+        body_style,
+    ))
+
+    # Per-town tier breakdown table
+    tier_summary_header = [
+        Paragraph('<b>Municipality</b>', table_header_style),
+        Paragraph('<b>AG Disapproved</b>', table_header_style),
+        Paragraph('<b>Appears Inconsistent</b>', table_header_style),
+        Paragraph('<b>Needs Review</b>', table_header_style),
+        Paragraph('<b>Consistent</b>', table_header_style),
+        Paragraph('<b>Total</b>', table_header_style),
+    ]
 
-tier_summary_data = [tier_summary_header]
-for t in sorted(towns, key=lambda x: x['name']):
-    ag_count = sum(1 for p in t['provisions'] if p['has_ag_decision'])
-    incon_no_ag = sum(1 for p in t['provisions'] if p['status'] == 'inconsistent' and not p['has_ag_decision'])
-    review_count = sum(1 for p in t['provisions'] if p['status'] == 'review')
-    consistent_count = sum(1 for p in t['provisions'] if p['status'] == 'compliant')
-    total = len(t['provisions'])
+    tier_summary_data = [tier_summary_header]
+    for t in sorted(towns, key=lambda x: (x['name'], x['slug'])):
+        counts = tier_counts(t)
+        ag_count, incon_no_ag = counts['ag_disapproved'], counts['inconsistent']
+        review_count, consistent_count, total = counts['review'], counts['consistent'], counts['total']
+
+        tier_summary_data.append([
+            Paragraph(t['markup']['name'], table_cell_bold),
+            Paragraph(str(ag_count) if ag_count > 0 else '—', table_cell_style),
+            Paragraph(str(incon_no_ag) if incon_no_ag > 0 else '—', table_cell_style),
+            Paragraph(str(review_count) if review_count > 0 else '—', table_cell_style),
+            Paragraph(str(consistent_count), table_cell_style),
+            Paragraph(str(total), table_cell_bold),
+        ])
 
+    # Totals row
     tier_summary_data.append([
-        Paragraph(t['name'], table_cell_bold),
-        Paragraph(str(ag_count) if ag_count > 0 else '—', table_cell_style),
-        Paragraph(str(incon_no_ag) if incon_no_ag > 0 else '—', table_cell_style),
-        Paragraph(str(review_count) if review_count > 0 else '—', table_cell_style),
-        Paragraph(str(consistent_count), table_cell_style),
-        Paragraph(str(total), table_cell_bold),
+        Paragraph('<b>TOTAL</b>', table_cell_bold),
+        Paragraph(f"<b>{stats['total_ag_disapproved']}</b>", table_cell_bold),
+        Paragraph(f"<b>{stats['total_statutory_conflict']}</b>", table_cell_bold),
+        Paragraph(f"<b>{stats['total_review']}</b>", table_cell_bold),
+        Paragraph(f"<b>{stats['total_consistent']}</b>", table_cell_bold),
+        Paragraph(f"<b>{stats['total_provisions']}</b>", table_cell_bold),
     ])
 
-# Totals row
-tier_summary_data.append([
-    Paragraph('<b>TOTAL</b>', table_cell_bold),
-    Paragraph(f'<b>{total_ag_disapproved}</b>', table_cell_bold),
-    Paragraph(f'<b>{total_statutory_conflict}</b>', table_cell_bold),
-    Paragraph(f'<b>{total_review}</b>', table_cell_bold),
-    Paragraph(f'<b>{total_consistent}</b>', table_cell_bold),
-    Paragraph(f'<b>{total_provisions}</b>', table_cell_bold),
-])
-
-col_widths = [1.5*inch, 0.9*inch, 1.1*inch, 0.8*inch, 0.7*inch, 0.6*inch]
-tier_summary_table = Table(tier_summary_data, colWidths=col_widths, repeatRows=1)
-tier_summary_table.setStyle(TableStyle([
-    ('BACKGROUND', (0, 0), (-1, 0), NAVY),
-    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
-    ('ROWBACKGROUNDS', (0, 1), (-1, -2), [WHITE, LIGHT_GRAY]),
-    ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#e5e7eb')),
-    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ('TOPPADDING', (0, 0), (-1, -1), 4),
-    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ('LEFTPADDING', (0, 0), (-1, -1), 5),
-    ('RIGHTPADDING', (0, 0), (-1, -1), 5),
-    ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
-]))
-story.append(tier_summary_table)
-
-story.append(PageBreak())
+    col_widths = [1.5*inch, 0.9*inch, 1.1*inch, 0.8*inch, 0.7*inch, 0.6*inch]
+    tier_summary_table = Table(tier_summary_data, colWidths=col_widths, repeatRows=1)
+    tier_summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+        ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -2), [WHITE, LIGHT_GRAY]),
+        ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#e5e7eb')),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('LEFTPADDING', (0, 0), (-1, -1), 5),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 5),
+        ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+    ]))
+    story.append(tier_summary_table)
+
+    story.append(PageBreak())
+
+    return story
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # AG ACTION TIMELINE
 # ═══════════════════════════════════════════════════════════════════════════
 
-story.append(Paragraph("Attorney General Action Timeline", h1_style))
-story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
-
-story.append(Paragraph(
-    f"The Massachusetts Attorney General has disapproved ADU bylaw provisions in "
-    f"{len(towns_with_ag)} towns as of February 2026. The following table shows all "
-    f"AG actions in chronological order.",
-    body_style,
-))
-
-ag_header = [
-    Paragraph('<b>Town</b>', table_header_style),
-    Paragraph('<b>AG Decision Date</b>', table_header_style),
-    Paragraph('<b>Provisions Disapproved</b>', table_header_style),
-    Paragraph('<b>Key Issues</b>', table_header_style),
-]
+def ag_timeline_section(data):
+    stats = data['stats']
+    story = []
+    story.append(Paragraph("Attorney General Action Timeline", h1_style))
+    story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
 
-ag_data = [ag_header]
-for t in sorted(towns_with_ag, key=lambda x: x.get('ag_decision_date') or ''):
-    ag_provs = [p for p in t['provisions'] if p['has_ag_decision']]
-    key_issues = ', '.join(p['provision'] for p in ag_provs[:3])
-    if len(ag_provs) > 3:
-        key_issues += f' (+{len(ag_provs) - 3} more)'
-
-    ag_data.append([
-        Paragraph(t['name'], table_cell_bold),
-        Paragraph(format_date_short(t.get('ag_decision_date', '')), table_cell_style),
-        Paragraph(str(len(ag_provs)), table_cell_style),
-        Paragraph(key_issues, table_cell_style),
-    ])
+    story.append(Paragraph(
+        f"The Massachusetts Attorney General has disapproved ADU bylaw provisions in "
+        f"{len(stats['towns_with_ag'])} towns as of February 2026. The following table shows all "
+        f"AG actions in chronological order.",
+        body_style,
+    ))
+
+    ag_header = [
+        Paragraph('<b>Town</b>', table_header_style),
+        Paragraph('<b>AG Decision Date</b>', table_header_style),
+        Paragraph('<b>Provisions Disapproved</b>', table_header_style),
+        Paragraph('<b>Key Issues</b>', table_header_style),
+    ]
 
-ag_table = Table(ag_data, colWidths=[1.2*inch, 1.1*inch, 1.0*inch, 2.4*inch])
-ag_table.setStyle(TableStyle([
-    ('BACKGROUND', (0, 0), (-1, 0), NAVY),
-    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
-    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [WHITE, LIGHT_GRAY]),
-    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ('TOPPADDING', (0, 0), (-1, -1), 6),
-    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ('LEFTPADDING', (0, 0), (-1, -1), 6),
-    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-    ('ALIGN', (2, 0), (2, -1), 'CENTER'),
-]))
-story.append(ag_table)
-
-story.append(Spacer(1, 16))
-story.append(Paragraph(
-    "Note: AG review applies only to town bylaws. City ordinances (Boston, New Bedford, Newton, "
-    "Somerville, Worcester, Quincy, Salem, Revere) are not subject to AG review; inconsistencies "
-    "in city ordinances are identified through ADU Pulse's independent analysis.",
-    body_italic_style,
-))
-
-story.append(PageBreak())
+    ag_data = [ag_header]
+    for t in sorted(stats['towns_with_ag'], key=lambda x: (x.get('ag_decision_date') or '', x['name'])):
+        ag_provs = [p for p in t['provisions'] if p['has_ag_decision']]
+        key_issues = ', '.join(p['markup']['provision'] for p in ag_provs[:3])
+        if len(ag_provs) > 3:
+            key_issues += f' (+{len(ag_provs) - 3} more)'
+
+        ag_data.append([
+            Paragraph(t['markup']['name'], table_cell_bold),
+            Paragraph(format_date_short(t.get('ag_decision_date', '')), table_cell_style),
+            Paragraph(str(len(ag_provs)), table_cell_style),
+            Paragraph(key_issues, table_cell_style),
+        ])
+
+    ag_table = Table(ag_data, colWidths=[1.2*inch, 1.1*inch, 1.0*inch, 2.4*inch])
+    ag_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+        ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [WHITE, LIGHT_GRAY]),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ('ALIGN', (2, 0), (2, -1), 'CENTER'),
+    ]))
+    story.append(ag_table)
+
+    story.append(Spacer(1, 16))
+    story.append(Paragraph(
+        "Note: AG review applies only to town bylaws. City ordinances (Boston, New Bedford, Newton, "
+        "Somerville, Worcester, Quincy, Salem, Revere) are not subject to AG review; inconsistencies "
+        "in city ordinances are identified through ADU Pulse's independent analysis.",
+        body_italic_style,
+    ))
+
+    story.append(PageBreak())
+
+    return story
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # MOST COMMON INCONSISTENCY TYPES
 # ═══════════════════════════════════════════════════════════════════════════
 
-story.append(Paragraph("Most Common Inconsistency Types", h1_style))
-story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
+def inconsistency_types_section(data):
+    towns = data['towns']
+    stats = data['stats']
+    story = []
+    story.append(Paragraph("Most Common Inconsistency Types", h1_style))
+    story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
 
-story.append(Paragraph(
-    "The following table shows the most frequently identified inconsistencies across all "
-    f"{len(towns)} municipalities analyzed, ranked by the number of towns affected.",
-    body_style,
-))
+    story.append(Paragraph(
+        "The following table shows the most frequently identified inconsistencies across all "
+        f"{len(towns)} municipalities analyzed, ranked by the number of towns affected.",
+        body_style,
+    ))
 
-# By provision type
-story.append(Paragraph("By Provision Type", h2_style))
+    # By provision type
+    story.append(Paragraph("By Provision Type", h2_style))
 
-type_header = [
-    Paragraph('<b>Provision Type</b>', table_header_style),
-    Paragraph('<b>Towns Affected</b>', table_header_style),
-]
-type_data = [type_header]
-for prov_name, count in provision_type_counter.most_common(15):
-    type_data.append([
-        Paragraph(prov_name, table_cell_style),
-        Paragraph(str(count), table_cell_bold),
-    ])
+    type_header = [
+        Paragraph('<b>Provision Type</b>', table_header_style),
+        Paragraph('<b>Towns Affected</b>', table_header_style),
+    ]
+    type_data = [type_header]
+    for prov_name, count in stats['provision_type_counts'][:15]:
+        type_data.append([
+            Paragraph(to_markup(prov_name), table_cell_style),
+            Paragraph(str(count), table_cell_bold),
+        ])
 
-type_table = Table(type_data, colWidths=[4.2*inch, 1.2*inch])
-type_table.setStyle(TableStyle([
-    ('BACKGROUND', (0, 0), (-1, 0), NAVY),
-    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
-    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [WHITE, LIGHT_GRAY]),
-    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ('TOPPADDING', (0, 0), (-1, -1), 5),
-    ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ('LEFTPADDING', (0, 0), (-1, -1), 6),
-    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-    ('ALIGN', (1, 0), (1, -1), 'CENTER'),
-]))
-story.append(type_table)
-
-# By category
-story.append(Spacer(1, 16))
-story.append(Paragraph("By Category", h2_style))
-
-cat_header = [
-    Paragraph('<b>Category</b>', table_header_style),
-    Paragraph('<b>Inconsistent Provisions</b>', table_header_style),
-]
-cat_data = [cat_header]
-for cat_name, count in category_counter.most_common():
-    cat_data.append([
-        Paragraph(cat_name, table_cell_style),
-        Paragraph(str(count), table_cell_bold),
-    ])
+    type_table = Table(type_data, colWidths=[4.2*inch, 1.2*inch])
+    type_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+        ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [WHITE, LIGHT_GRAY]),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 5),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ('ALIGN', (1, 0), (1, -1), 'CENTER'),
+    ]))
+    story.append(type_table)
 
-cat_table = Table(cat_data, colWidths=[3.5*inch, 1.8*inch])
-cat_table.setStyle(TableStyle([
-    ('BACKGROUND', (0, 0), (-1, 0), NAVY),
-    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
-    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [WHITE, LIGHT_GRAY]),
-    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ('TOPPADDING', (0, 0), (-1, -1), 6),
-    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ('LEFTPADDING', (0, 0), (-1, -1), 8),
-    ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-    ('ALIGN', (1, 0), (1, -1), 'CENTER'),
-]))
-story.append(cat_table)
+    # By category
+    story.append(Spacer(1, 16))
+    story.append(Paragraph("By Category", h2_style))
 
-story.append(PageBreak())
+    cat_header = [
+        Paragraph('<b>Category</b>', table_header_style),
+        Paragraph('<b>Inconsistent Provisions</b>', table_header_style),
+    ]
+    cat_data = [cat_header]
+    for cat_name, count in stats['category_counts']:
+        cat_data.append([
+            Paragraph(to_markup(cat_name), table_cell_style),
+            Paragraph(str(count), table_cell_bold),
+        ])
+
+    cat_table = Table(cat_data, colWidths=[3.5*inch, 1.8*inch])
+    cat_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+        ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [WHITE, LIGHT_GRAY]),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('LEFTPADDING', (0, 0), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+        ('ALIGN', (1, 0), (1, -1), 'CENTER'),
+    ]))
+    story.append(cat_table)
+
+    story.append(PageBreak())
+
+    return story
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # TOWN-BY-TOWN PROFILES
 # ═══════════════════════════════════════════════════════════════════════════
 
-story.append(Paragraph("Town-by-Town Profiles", h1_style))
-story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
+def town_profiles_section(data):
+    towns = data['towns']
+    story = []
+    story.append(Paragraph("Town-by-Town Profiles", h1_style))
+    story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
+
+    story.append(Paragraph(
+        f"The following pages provide individual profiles for each of the {len(towns)} "
+        f"municipalities analyzed. Each profile includes the municipality's provision-level "
+        f"analysis, permit data, and key findings.",
+        body_style,
+    ))
+
+    story.append(PageBreak())
+
+    for t in sorted(towns, key=lambda x: (x['name'], x['slug'])):
+        story.extend(town_profile_flowables(data, t))
+
+    return story
+
+
+def peer_summary(peers):
+    """One-line regional comparison from town_geo.regional_peers()."""
+    def rate(value):
+        return '—' if value is None else f"{value}%"
+
+    nearest = []
+    for p in peers['nearest']:
+        detail = f"{p['miles']} mi, {rate(p['approval_rate'])}"
+        if p['inconsistent'] is not None:
+            detail += f", {p['inconsistent']} inconsistent"
+        nearest.append(f"{to_markup(p['name'])} ({detail})")
+    text = f"<b>Nearest peers:</b> {'; '.join(nearest)}."
+    if peers['regional_median_rate'] is not None:
+        text += (f" Median approval rate across the {peers['regional_rated']} municipalities within "
+                 f"{peers['radius_miles']:g} miles reporting applications: "
+                 f"{peers['regional_median_rate']}% (HLC survey: {rate(peers['approval_rate'])} here).")
+    return text
+
+
+def town_profile_flowables(data, t):
+    """town_profile() with its statewide context, shared across editions when cached."""
+    return cached_flowables(data, ('town_profile', t['slug']), lambda: town_profile(
+        t, data['peers'].get(t['slug']), profile_scorecard(data, t['slug']),
+        data['velocity'].series(t['slug']),
+    ))
+
+
+def profile_scorecard(data, slug):
+    """Scorecard fields for one town from the statewide batch, or None if it isn't in the SEO data."""
+    i = data['seo'].row.get(slug)
+    if i is None:
+        return None
+    sc = data['scorecards']
+    pct = sc['percentile'][i]
+    return {
+        'grade': str(sc['grade'][i]),
+        'score': int(sc['overall_score'][i]),
+        'rules_friction': str(sc['rules_friction'][i]),
+        'ops_friction': str(sc['ops_friction'][i]),
+        'rank': int(sc['rank'][i]),
+        'ranked': int(sc['ranked'].sum()),
+        'percentile': None if pct != pct else int(round(pct)),
+    }
+
+
+# ── Permit trend charts ──────────────────────────────────────────────────
+
+CHART_WIDTH = 5.4 * inch
+CHART_HEIGHT = 1.35 * inch
+CHART_MONTHS = 24
+CHART_CACHE_SIZE = 1024
+CHART_SERIES = [('applied', 'Applied', BLUE_ACCENT), ('issued', 'Issued', NAVY)]
+
+# sha1 of a town's clipped monthly series -> rendered Drawing. Kept across
+# builds in one process (report_watch, report_editions), so only towns whose
+# series changed are re-rendered.
+_chart_cache = {}
+
+
+def last_event_index(velocity):
+    """Index of the last month with an applied or issued permit in a permit_velocity series."""
+    return max(i for i, counts in enumerate(zip(velocity['applied'], velocity['issued'])) if any(counts))
+
+
+def chart_series(velocity, months=CHART_MONTHS, end=None):
+    """`months` months of applied/issued counts from a permit_velocity series, ending before `end`."""
+    end = len(velocity['months']) if end is None else end
+    return {key: velocity[key][max(0, end - months):end] for key in ('months', 'applied', 'issued')}
+
+
+# Shared chart template: dotted attribute path -> value, applied to each new chart
+PERMIT_CHART_STYLE = {
+    'x': 24, 'y': 14,
+    'width': CHART_WIDTH - 34, 'height': CHART_HEIGHT - 30,
+    'groupSpacing': 2, 'barSpacing': 0, 'barWidth': 4, 'strokeColor': None,
+    'valueAxis.valueMin': 0,
+    'valueAxis.labels.fontName': 'Helvetica', 'valueAxis.labels.fontSize': 6,
+    'valueAxis.labels.fillColor': DARK_GRAY,
+    'valueAxis.strokeColor': MID_GRAY, 'valueAxis.strokeWidth': 0.5,
+    'valueAxis.visibleGrid': True, 'valueAxis.gridStrokeColor': colors.HexColor('#e5e7eb'),
+    'valueAxis.gridStrokeWidth': 0.4,
+    'categoryAxis.labels.fontName': 'Helvetica', 'categoryAxis.labels.fontSize': 6,
+    'categoryAxis.labels.fillColor': DARK_GRAY,
+    'categoryAxis.strokeColor': MID_GRAY, 'categoryAxis.strokeWidth': 0.5, 'categoryAxis.tickDown': 2,
+    'bars.strokeColor': None,
+}
+
+
+def styled_chart(chart_class, style):
+    chart = chart_class()
+    for path, value in style.items():
+        *parents, name = path.split('.')
+        target = chart
+        for parent in parents:
+            target = getattr(target, parent)
+        setattr(target, name, value)
+    return chart
+
+
+def permit_trend_chart(series):
+    """Drawing of monthly applied/issued bars, rendered to plain shapes and cached by series hash."""
+    key = hashlib.sha1(json.dumps(series, sort_keys=True).encode('utf-8')).hexdigest()
+    if key in _chart_cache:
+        return _chart_cache[key]
+
+    chart = styled_chart(VerticalBarChart, PERMIT_CHART_STYLE)
+    chart.data = [series[kind] for kind, _, _ in CHART_SERIES]
+    for i, (_, _, color) in enumerate(CHART_SERIES):
+        chart.bars[i].fillColor = color
+    peak = max(max(values) for values in chart.data)
+    step = max(1, -(-peak // 4))
+    chart.valueAxis.valueMax = step * 4
+    chart.valueAxis.valueStep = step
+    # Label January and every third month, e.g. "Jan 25", "Apr"
+    chart.categoryAxis.categoryNames = [
+        datetime.date(int(m[:4]), int(m[5:]), 1).strftime('%b %y' if m.endswith('-01') or i == 0 else '%b')
+        if i % 3 == 0 or m.endswith('-01') else ''
+        for i, m in enumerate(series['months'])
+    ]
+
+    drawing = Drawing(CHART_WIDTH, CHART_HEIGHT)
+    drawing.add(chart.draw())
+    legend = Group()
+    x = chart.x + chart.width
+    for _, label, color in reversed(CHART_SERIES):
+        x -= stringWidth(label, 'Helvetica', 6.5)
+        legend.add(String(x, CHART_HEIGHT - 9, label, fontName='Helvetica', fontSize=6.5, fillColor=DARK_GRAY))
+        x -= 9
+        legend.add(Rect(x, CHART_HEIGHT - 9, 6, 6, fillColor=color, strokeColor=None))
+        x -= 10
+    drawing.add(legend)
+
+    if len(_chart_cache) >= CHART_CACHE_SIZE:
+        _chart_cache.pop(next(iter(_chart_cache)))
+    _chart_cache[key] = drawing
+    return drawing
+
+
+class PermitTrendChart(Flowable):
+    """Places the cached trend Drawing for a series.
+
+    reportlab Drawings can't be deep-copied, and cached_flowables() copies
+    town profiles per build, so copies are new placeholders sharing the same
+    series and Drawing.
+    """
+
+    def __init__(self, series, drawing=None):
+        super().__init__()
+        self.series = series
+        self.drawing = permit_trend_chart(series) if drawing is None else drawing
+        self.width, self.height = CHART_WIDTH, CHART_HEIGHT
 
-story.append(Paragraph(
-    f"The following pages provide individual profiles for each of the {len(towns)} "
-    f"municipalities analyzed. Each profile includes the municipality's provision-level "
-    f"analysis, permit data, and key findings.",
-    body_style,
-))
+    def __deepcopy__(self, memo):
+        return PermitTrendChart(self.series, self.drawing)
 
-story.append(PageBreak())
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
 
-for t in sorted(towns, key=lambda x: x['name']):
+    def draw(self):
+        self.drawing.drawOn(self.canv, 0, 0)
+
+
+def town_profile(t, peers=None, scorecard=None, velocity=None):
+    """Flowables for one town's profile page."""
+    story = []
     # Town header
-    story.append(Paragraph(t['name'], town_name_style))
+    story.append(Paragraph(t['markup']['name'], town_name_style))
 
     # Meta line
     meta_parts = [
-        f"{t['county']} County",
+        f"{t['markup']['county']} County",
         f"Pop. {t['population']:,}",
         f"{'City' if t['municipality_type'] == 'city' else 'Town'}",
     ]
@@ -871,7 +1246,7 @@ for t in sorted(towns, key=lambda x: x['name']):
 
     # Bylaw source
     story.append(Paragraph(
-        f"<b>Bylaw source:</b> {t['bylaw_source']} · Last updated: {t['bylaw_last_updated']}",
+        f"<b>Bylaw source:</b> {t['markup']['bylaw_source']} · Last updated: {t['markup']['bylaw_last_updated']}",
         ParagraphStyle('', parent=body_small_style, spaceAfter=4),
     ))
 
@@ -893,17 +1268,44 @@ for t in sorted(towns, key=lambda x: x['name']):
     story.append(Paragraph(
         f"<b>Permits:</b> {perm['submitted']} submitted, {perm['approved']} approved, "
         f"{perm['denied']} denied ({perm['approval_rate']}% approval rate)",
-        ParagraphStyle('', parent=body_small_style, spaceAfter=8),
+        ParagraphStyle('', parent=body_small_style, spaceAfter=4 if peers or scorecard else 8),
     ))
 
+    # Scorecard
+    if scorecard:
+        text = (f"<b>Scorecard:</b> {scorecard['grade']} ({scorecard['score']}/100) · "
+                f"rules friction {scorecard['rules_friction']} · "
+                f"operational friction {scorecard['ops_friction']}")
+        if scorecard['rank']:
+            text += (f" · ranked {scorecard['rank']} of {scorecard['ranked']} "
+                     f"({ordinal(scorecard['percentile'])} percentile)")
+        story.append(Paragraph(text, ParagraphStyle('', parent=body_small_style, spaceAfter=4 if peers else 8)))
+
+    # Permit velocity from the local permit log
+    if velocity:
+        # Series run to the statewide latest month; this town's log may end earlier
+        last = last_event_index(velocity)
+        month = datetime.date(int(velocity['months'][last][:4]), int(velocity['months'][last][5:]), 1)
+        story.append(Paragraph(
+            f"<b>Permit velocity:</b> {velocity['issued_3m'][last]:.1f} issued per month over the last "
+            f"3 months, {velocity['issued_12m'][last]:.1f} over the last 12 "
+            f"(permit log through {month.strftime('%B %Y')})",
+            ParagraphStyle('', parent=body_small_style, spaceAfter=2),
+        ))
+        story.append(PermitTrendChart(chart_series(velocity, end=last + 1)))
+        story.append(Spacer(1, 4 if peers else 8))
+
+    # Regional comparison
+    if peers and peers['nearest']:
+        story.append(Paragraph(
+            peer_summary(peers),
+            ParagraphStyle('', parent=body_small_style, textColor=DARK_GRAY, spaceAfter=8),
+        ))
+
     # Bottom line
     if t['bottom_line']:
-        # Clean up unicode for PDF
-        bl = t['bottom_line']
-        bl = bl.replace('\u2019', '\u2019').replace('\u201c', '\u201c').replace('\u201d', '\u201d')
-        bl = bl.replace('\u2014', ' — ').replace('\u00a7', '§')
         story.append(Paragraph(
-            f"<i>{bl}</i>",
+            f"<i>{t['markup']['bottom_line']}</i>",
             town_bottom_line_style,
         ))
 
@@ -930,8 +1332,8 @@ for t in sorted(towns, key=lambda x: x['name']):
             tier_color = colors.HexColor('#059669')
 
         prov_data.append([
-            Paragraph(p['provision'], table_cell_style),
-            Paragraph(p['category'], table_cell_style),
+            Paragraph(p['markup']['provision'], table_cell_style),
+            Paragraph(p['markup']['category'], table_cell_style),
             Paragraph(tier_label, ParagraphStyle('', parent=table_cell_bold, textColor=tier_color)),
         ])
 
@@ -951,165 +1353,644 @@ for t in sorted(towns, key=lambda x: x['name']):
 
     story.append(PageBreak())
 
+    return story
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # PERMIT DATA CORRELATION
 # ═══════════════════════════════════════════════════════════════════════════
 
-story.append(Paragraph("Permit Data Correlation", h1_style))
-story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
-
-story.append(Paragraph(
-    "The following table shows permit application and approval data alongside compliance "
-    "status for all profiled municipalities. This allows comparison of regulatory posture "
-    "with actual permitting outcomes.",
-    body_style,
-))
-
-permit_header = [
-    Paragraph('<b>Municipality</b>', table_header_style),
-    Paragraph('<b>Applications</b>', table_header_style),
-    Paragraph('<b>Approved</b>', table_header_style),
-    Paragraph('<b>Rate</b>', table_header_style),
-    Paragraph('<b>Inconsistent</b>', table_header_style),
-    Paragraph('<b>AG Actions</b>', table_header_style),
+CORRELATION_LABELS = [
+    ('rho_inconsistent', 'Rank correlation: inconsistent provisions vs. approval rate', '{:+.2f}'),
+    ('rho_tier', 'Rank correlation: compliance tier vs. approval rate', '{:+.2f}'),
+    ('approval_gap', 'Approval-rate gap: towns with vs. without inconsistencies', '{:+.1f} pts'),
 ]
 
-permit_data = [permit_header]
-for t in sorted(towns, key=lambda x: -x['permits']['submitted']):
-    incon = sum(1 for p in t['provisions'] if p['status'] == 'inconsistent')
-    permit_data.append([
-        Paragraph(t['name'], table_cell_style),
-        Paragraph(str(t['permits']['submitted']), table_cell_style),
-        Paragraph(str(t['permits']['approved']), table_cell_style),
-        Paragraph(f"{t['permits']['approval_rate']}%", table_cell_style),
-        Paragraph(str(incon), table_cell_bold),
-        Paragraph(str(t['ag_disapprovals']) if t['ag_disapprovals'] > 0 else '—', table_cell_style),
-    ])
 
-permit_col_widths = [1.4*inch, 0.8*inch, 0.7*inch, 0.6*inch, 0.9*inch, 0.8*inch]
-permit_table = Table(permit_data, colWidths=permit_col_widths, repeatRows=1)
-permit_table.setStyle(TableStyle([
-    ('BACKGROUND', (0, 0), (-1, 0), NAVY),
-    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
-    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [WHITE, LIGHT_GRAY]),
-    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ('TOPPADDING', (0, 0), (-1, -1), 4),
-    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ('LEFTPADDING', (0, 0), (-1, -1), 5),
-    ('RIGHTPADDING', (0, 0), (-1, -1), 5),
-    ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
-    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-]))
-story.append(permit_table)
-
-# Special cases note
-if narrative_cities:
-    story.append(Spacer(1, 16))
-    story.append(Paragraph("Special Cases (Narrative Profiles)", h2_style))
+def correlation_flowables(data):
+    """Spearman correlations and the approval-rate gap, with bootstrap 95% intervals.
+
+    A statistic is NaN when a comparison group is empty or a column doesn't
+    vary (common in single-county editions); it is shown as n/a.
+    """
+    result = correlation_stats(data['towns'], town_tier)
+    if not result['stats']:
+        return []
+    s = result['stats']
+    if all(math.isnan(stat['estimate']) for stat in s.values()):
+        return []
+    rows = [[
+        Paragraph('<b>Measure</b>', table_header_style),
+        Paragraph('<b>Estimate</b>', table_header_style),
+        Paragraph('<b>95% interval</b>', table_header_style),
+    ]]
+    for key, label, fmt in CORRELATION_LABELS:
+        estimate = 'n/a' if math.isnan(s[key]['estimate']) else fmt.format(s[key]['estimate'])
+        interval = ('n/a' if estimate == 'n/a' or math.isnan(s[key]['low']) or math.isnan(s[key]['high'])
+                    else f"{fmt.format(s[key]['low'])} to {fmt.format(s[key]['high'])}")
+        rows.append([
+            Paragraph(label, table_cell_style),
+            Paragraph(estimate, table_cell_bold),
+            Paragraph(interval, table_cell_style),
+        ])
+    table = Table(rows, colWidths=[3.6*inch, 0.9*inch, 1.6*inch])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+        ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [WHITE, LIGHT_GRAY]),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('LEFTPADDING', (0, 0), (-1, -1), 5),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 5),
+        ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+    ]))
+
+    undefined = any(math.isnan(stat[k]) for stat in s.values() for k in ('estimate', 'low', 'high'))
+    rho = s['rho_inconsistent']
+    if any(math.isnan(rho[k]) for k in ('estimate', 'low', 'high')):
+        finding = ("the correlation with inconsistent provisions is undefined (n/a) because the counts or "
+                   "approval rates do not vary enough")
+    elif rho['low'] > 0:
+        finding = ("towns with more inconsistent provisions have tended to approve a <i>higher</i> share "
+                   "of applications, and the interval excludes zero")
+    elif rho['high'] < 0:
+        finding = ("towns with more inconsistent provisions have tended to approve a lower share of "
+                   "applications, and the interval excludes zero")
+    else:
+        finding = "the interval includes zero, so the data show no reliable association either way"
+    return [
+        Spacer(1, 4),
+        table,
+        Spacer(1, 6),
+        Paragraph(
+            f"Across the {result['n']} profiled municipalities with at least one application "
+            f"({result['with_inconsistent']} with inconsistent provisions), {finding}. Intervals are "
+            f"percentile bootstrap intervals from {result['resamples']:,} resamples of towns. With this "
+            "few towns and small permit counts they are wide, and a correlation says nothing about "
+            "cause: bylaw posture, housing demand and reporting practices all vary together."
+            + (" n/a marks a measure that is undefined for these towns: one comparison group is empty "
+               "or the values do not vary." if undefined else ''),
+            body_small_style,
+        ),
+        Spacer(1, 10),
+    ]
+
+
+def permit_correlation_section(data):
+    towns = data['towns']
+    narrative_cities = data['narrative_cities']
+    story = []
+    story.append(Paragraph("Permit Data Correlation", h1_style))
+    story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
+
     story.append(Paragraph(
-        "Three additional cities are tracked as narrative special cases — they do not have "
-        "provision-by-provision analysis but exhibit notable ADU policy patterns.",
+        "The following table shows permit application and approval data alongside compliance "
+        "status for all profiled municipalities. This allows comparison of regulatory posture "
+        "with actual permitting outcomes.",
         body_style,
     ))
+    story.extend(correlation_flowables(data))
 
-    narr_header = [
-        Paragraph('<b>City</b>', table_header_style),
-        Paragraph('<b>Status</b>', table_header_style),
+    permit_header = [
+        Paragraph('<b>Municipality</b>', table_header_style),
         Paragraph('<b>Applications</b>', table_header_style),
         Paragraph('<b>Approved</b>', table_header_style),
         Paragraph('<b>Rate</b>', table_header_style),
+        Paragraph('<b>Inconsistent</b>', table_header_style),
+        Paragraph('<b>AG Actions</b>', table_header_style),
     ]
-    narr_data = [narr_header]
-    tag_labels = {
-        'passive-resistance': 'Passive Resistance',
-        'no-ordinance': 'No Local Ordinance',
-        'stalled': 'Stalled',
-    }
-    for nc in narrative_cities:
-        narr_data.append([
-            Paragraph(nc['name'], table_cell_bold),
-            Paragraph(tag_labels.get(nc['tag'], nc['tag']), table_cell_style),
-            Paragraph(str(nc['permits']['submitted']), table_cell_style),
-            Paragraph(str(nc['permits']['approved']), table_cell_style),
-            Paragraph(f"{nc['permits']['approval_rate']}%", table_cell_style),
+
+    permit_data = [permit_header]
+    for t in sorted(towns, key=lambda x: (-x['permits']['submitted'], x['name'])):
+        incon = sum(1 for p in t['provisions'] if p['status'] == 'inconsistent')
+        permit_data.append([
+            Paragraph(t['markup']['name'], table_cell_style),
+            Paragraph(str(t['permits']['submitted']), table_cell_style),
+            Paragraph(str(t['permits']['approved']), table_cell_style),
+            Paragraph(f"{t['permits']['approval_rate']}%", table_cell_style),
+            Paragraph(str(incon), table_cell_bold),
+            Paragraph(str(t['ag_disapprovals']) if t['ag_disapprovals'] > 0 else '—', table_cell_style),
         ])
 
-    narr_table = Table(narr_data, colWidths=[1.2*inch, 1.3*inch, 0.9*inch, 0.8*inch, 0.6*inch])
-    narr_table.setStyle(TableStyle([
+    permit_col_widths = [1.4*inch, 0.8*inch, 0.7*inch, 0.6*inch, 0.9*inch, 0.8*inch]
+    permit_table = Table(permit_data, colWidths=permit_col_widths, repeatRows=1)
+    permit_table.setStyle(TableStyle([
         ('BACKGROUND', (0, 0), (-1, 0), NAVY),
         ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
         ('ROWBACKGROUNDS', (0, 1), (-1, -1), [WHITE, LIGHT_GRAY]),
         ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
         ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-        ('LEFTPADDING', (0, 0), (-1, -1), 6),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-        ('ALIGN', (2, 0), (-1, -1), 'CENTER'),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('LEFTPADDING', (0, 0), (-1, -1), 5),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 5),
+        ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
     ]))
-    story.append(narr_table)
+    story.append(permit_table)
 
-story.append(PageBreak())
+    # Special cases note
+    if narrative_cities:
+        story.append(Spacer(1, 16))
+        story.append(Paragraph("Special Cases (Narrative Profiles)", h2_style))
+        story.append(Paragraph(
+            (f"{count_word(len(narrative_cities)).capitalize()} additional cities are tracked as narrative "
+             f"special cases — they do not have provision-by-provision analysis but exhibit notable "
+             f"ADU policy patterns."
+             if len(narrative_cities) > 1 else
+             "One additional city is tracked as a narrative special case — it does not have "
+             "provision-by-provision analysis but exhibits notable ADU policy patterns."),
+            body_style,
+        ))
+
+        narr_header = [
+            Paragraph('<b>City</b>', table_header_style),
+            Paragraph('<b>Status</b>', table_header_style),
+            Paragraph('<b>Applications</b>', table_header_style),
+            Paragraph('<b>Approved</b>', table_header_style),
+            Paragraph('<b>Rate</b>', table_header_style),
+        ]
+        narr_data = [narr_header]
+        tag_labels = {
+            'passive-resistance': 'Passive Resistance',
+            'no-ordinance': 'No Local Ordinance',
+            'stalled': 'Stalled',
+        }
+        for nc in narrative_cities:
+            narr_data.append([
+                Paragraph(nc['markup']['name'], table_cell_bold),
+                Paragraph(tag_labels.get(nc['tag'], nc['tag']), table_cell_style),
+                Paragraph(str(nc['permits']['submitted']), table_cell_style),
+                Paragraph(str(nc['permits']['approved']), table_cell_style),
+                Paragraph(f"{nc['permits']['approval_rate']}%", table_cell_style),
+            ])
+
+        narr_table = Table(narr_data, colWidths=[1.2*inch, 1.3*inch, 0.9*inch, 0.8*inch, 0.6*inch])
+        narr_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+            ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [WHITE, LIGHT_GRAY]),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 0), (-1, -1), 5),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+            ('LEFTPADDING', (0, 0), (-1, -1), 6),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+            ('ALIGN', (2, 0), (-1, -1), 'CENTER'),
+        ]))
+        story.append(narr_table)
+
+    story.append(PageBreak())
+
+    return story
 
 
 # ═══════════════════════════════════════════════════════════════════════════
-# APPENDIX
+# STATEWIDE MAP
 # ═══════════════════════════════════════════════════════════════════════════
 
-story.append(Paragraph("Appendix: Sources", h1_style))
-story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
+MAP_WIDTH = 6.5 * inch
+MAP_HEIGHT = 4.6 * inch
+MAP_LEGEND_HEIGHT = 0.5 * inch
 
-# Group sources by type
-ag_sources = {k: v for k, v in sources.items() if 'AG' in v['label'] or k.startswith('ag_')}
-law_sources = {k: v for k, v in sources.items() if any(x in k for x in ['ch150', 'mgl', 'cmr', 'eohlc'])}
-town_sources = {k: v for k, v in sources.items() if k not in ag_sources and k not in law_sources}
+# (min approvals, fill, label) — HLC survey approval volume for the base layer
+APPROVAL_BUCKETS = [
+    (0, colors.HexColor('#e5e7eb'), 'No approvals'),
+    (1, colors.HexColor('#bfdbfe'), '1–2 approvals'),
+    (3, colors.HexColor('#60a5fa'), '3–5'),
+    (6, colors.HexColor('#1d4ed8'), '6+'),
+]
+TIER_COLORS = [
+    ('AG Disapproved', RED),
+    ('Appears Inconsistent', ORANGE),
+    ('Needs Review', AMBER),
+    ('Consistent', GREEN),
+]
 
-story.append(Paragraph("State Law and Regulatory Sources", h2_style))
-for key, src in sorted(law_sources.items()):
+# points.digest -> (projected x, projected y, base Group). Holds the latest
+# dataset only; county and town variants share it.
+_map_cache = {}
+
+
+def town_tier(t):
+    """Most severe tier among a town's provisions."""
+    statuses = {p['status'] for p in t['provisions']}
+    if any(p['has_ag_decision'] for p in t['provisions']):
+        return 'AG Disapproved'
+    if 'inconsistent' in statuses:
+        return 'Appears Inconsistent'
+    if 'review' in statuses:
+        return 'Needs Review'
+    return 'Consistent'
+
+
+def map_base(points):
+    """Projected coordinates and the statewide approval-volume layer, cached by data hash."""
+    if points.digest not in _map_cache:
+        x, y = project(points.index.lat, points.index.lng, MAP_WIDTH, MAP_HEIGHT, pad=8)
+        x = x.tolist()
+        y = [v + MAP_LEGEND_HEIGHT for v in y.tolist()]
+        base = Group()
+        for i, approved in enumerate(points.approved.tolist()):
+            fill = [c for floor, c, _ in APPROVAL_BUCKETS if approved >= floor][-1]
+            base.add(Circle(x[i], y[i], 2.2, fillColor=fill, strokeColor=None))
+        _map_cache.clear()
+        _map_cache[points.digest] = (x, y, base)
+    return _map_cache[points.digest]
+
+
+def legend_row(items, y, radius, stroke=None):
+    group = Group()
+    x = 0
+    for label, color in items:
+        group.add(Circle(x + radius, y + 3, radius, fillColor=color, strokeColor=stroke, strokeWidth=0.6))
+        group.add(String(x + 2 * radius + 4, y, label, fontName='Helvetica', fontSize=7, fillColor=DARK_GRAY))
+        x += 2 * radius + 16 + stringWidth(label, 'Helvetica', 7)
+    return group
+
+
+def statewide_map(data):
+    """Drawing of every municipality by approval volume, profiled towns by tier."""
+    points = data['points']
+    x, y, base = map_base(points)
+    drawing = Drawing(MAP_WIDTH, MAP_HEIGHT + MAP_LEGEND_HEIGHT)
+    drawing.add(base)
+
+    overlay = Group()
+    for t in sorted(data['towns'], key=lambda t: t['slug']):
+        row = points.row.get(t['slug'])
+        if row is None:
+            continue
+        color = dict(TIER_COLORS)[town_tier(t)]
+        overlay.add(Circle(x[row], y[row], 4.5, fillColor=color, strokeColor=NAVY, strokeWidth=0.6))
+    drawing.add(overlay)
+
+    drawing.add(legend_row([(label, c) for _, c, label in APPROVAL_BUCKETS], 22, 2.2))
+    drawing.add(legend_row(TIER_COLORS, 4, 4.5, stroke=NAVY))
+    return drawing
+
+
+def statewide_map_section(data):
+    story = []
+    story.append(Paragraph("Statewide Map", h1_style))
+    story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
+    located = sum(1 for t in data['towns'] if t['slug'] in data['points'].row)
     story.append(Paragraph(
-        f"• <b>{src['label']}</b><br/>"
-        f"<font size=7 color='#6b7280'>{src['url']}</font>",
-        ParagraphStyle('', parent=bullet_style, fontSize=8.5, leading=11, spaceAfter=4),
+        f"Each dot is one of the {len(data['points'])} municipalities with coordinates in the HLC "
+        f"ADU survey, shaded by the number of ADUs approved. The {located} profiled "
+        f"municipalities are outlined and colored by their most severe provision tier.",
+        body_style,
     ))
+    story.append(Spacer(1, 8))
+    story.append(statewide_map(data))
+    story.append(PageBreak())
+    return story
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# STATEWIDE PER-CAPITA RANKINGS
+# ═══════════════════════════════════════════════════════════════════════════
 
-story.append(Paragraph("Attorney General Decisions", h2_style))
-for key, src in sorted(ag_sources.items()):
+RANKING_MIN_POPULATION = 5000
+
+
+def statewide_rankings_section(data):
+    towns = data['towns']
+    seo = data['seo']
+    metrics = data['seo_metrics']
+    statewide = metrics['statewide']
+    per_10k = metrics['approvals_per_10k_residents']
+    percentile = metrics['per_10k_percentile']
+    grade = data['scorecards']['grade']
+    score = data['scorecards']['overall_score']
+    story = []
+    story.append(Paragraph("Statewide Per-Capita Rankings", h1_style))
+    story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
+
+    quantiles = statewide['per_10k_percentiles']
     story.append(Paragraph(
-        f"• <b>{src['label']}</b><br/>"
-        f"<font size=7 color='#6b7280'>{src['url']}</font>",
-        ParagraphStyle('', parent=bullet_style, fontSize=8.5, leading=11, spaceAfter=4),
+        f"Across all {statewide['municipalities']} municipalities in the EOHLC survey "
+        f"({statewide['responded']} responding), {statewide['approved']:,} ADUs were approved — "
+        f"<b>{statewide['approvals_per_10k_residents']} approvals per 10,000 residents</b> statewide. "
+        f"Among the {statewide['towns_with_approvals']} municipalities with at least one approval, the "
+        f"median is {quantiles['p50']} per 10,000 residents (25th percentile {quantiles['p25']}, "
+        f"75th percentile {quantiles['p75']}).",
+        body_style,
     ))
 
-story.append(Paragraph("Municipal and News Sources", h2_style))
-for key, src in sorted(town_sources.items()):
+    story.append(Paragraph("Highest Approvals per Capita", h2_style))
     story.append(Paragraph(
-        f"• <b>{src['label']}</b><br/>"
-        f"<font size=7 color='#6b7280'>{src['url']}</font>",
-        ParagraphStyle('', parent=bullet_style, fontSize=8.5, leading=11, spaceAfter=4),
+        f"Municipalities with at least {RANKING_MIN_POPULATION:,} residents, ranked by ADU approvals "
+        f"per 10,000 residents. Smaller towns are excluded because one or two approvals swing "
+        f"their per-capita rate.",
+        body_small_style,
     ))
 
-story.append(Spacer(1, 30))
-story.append(HRFlowable(width="40%", thickness=1, color=MID_GRAY, spaceAfter=12))
-story.append(Paragraph(
-    "Compliance analysis and consistency assessments © 2025–2026 ADU Pulse",
-    ParagraphStyle('', parent=body_style, alignment=TA_CENTER, fontSize=9, textColor=MID_GRAY),
-))
-story.append(Paragraph(
-    "adupulse.com",
-    ParagraphStyle('', parent=body_style, alignment=TA_CENTER, fontSize=9, textColor=BLUE_ACCENT),
-))
+    rank_header = [
+        Paragraph('<b>#</b>', table_header_style),
+        Paragraph('<b>Municipality</b>', table_header_style),
+        Paragraph('<b>County</b>', table_header_style),
+        Paragraph('<b>Approved</b>', table_header_style),
+        Paragraph('<b>Population</b>', table_header_style),
+        Paragraph('<b>Per 10K</b>', table_header_style),
+    ]
+    rank_data = [rank_header]
+    eligible = (seo.approved > 0) & (seo.population >= RANKING_MIN_POPULATION)
+    for rank, i in enumerate(top_by(seo, per_10k, 15, eligible), start=1):
+        rank_data.append([
+            Paragraph(str(rank), table_cell_style),
+            Paragraph(to_markup(seo.name[i]), table_cell_bold),
+            Paragraph(to_markup(seo.county[i]), table_cell_style),
+            Paragraph(str(seo.approved[i]), table_cell_style),
+            Paragraph(f"{seo.population[i]:,}", table_cell_style),
+            Paragraph(f"{per_10k[i]:.1f}", table_cell_bold),
+        ])
+
+    rank_table = Table(rank_data, colWidths=[0.4*inch, 1.5*inch, 1.1*inch, 0.8*inch, 0.9*inch, 0.7*inch],
+                       repeatRows=1)
+    rank_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+        ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [WHITE, LIGHT_GRAY]),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('LEFTPADDING', (0, 0), (-1, -1), 5),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 5),
+        ('ALIGN', (3, 0), (-1, -1), 'CENTER'),
+    ]))
+    story.append(rank_table)
+
+    # Profiled municipalities in statewide context
+    profiled = [(t, seo.row[t['slug']]) for t in towns if t['slug'] in seo.row]
+    if profiled:
+        story.append(Spacer(1, 12))
+        story.append(Paragraph("Profiled Municipalities in Statewide Context", h2_style))
+        ctx_header = [
+            Paragraph('<b>Municipality</b>', table_header_style),
+            Paragraph('<b>Per 10K</b>', table_header_style),
+            Paragraph('<b>Statewide Percentile</b>', table_header_style),
+            Paragraph('<b>Inconsistent</b>', table_header_style),
+            Paragraph('<b>Grade</b>', table_header_style),
+        ]
+        ctx_data = [ctx_header]
+        for t, i in sorted(profiled, key=lambda ti: (-per_10k[ti[1]], ti[0]['name'])):
+            incon = sum(1 for p in t['provisions'] if p['status'] == 'inconsistent')
+            pct = percentile[i]
+            ctx_data.append([
+                Paragraph(t['markup']['name'], table_cell_style),
+                Paragraph(f"{per_10k[i]:.1f}", table_cell_bold),
+                Paragraph('—' if pct != pct else ordinal(int(round(pct))), table_cell_style),
+                Paragraph(str(incon), table_cell_style),
+                Paragraph(f"{grade[i]} ({score[i]})", table_cell_bold),
+            ])
+        ctx_table = Table(ctx_data, colWidths=[1.6*inch, 0.9*inch, 1.4*inch, 1.0*inch, 0.8*inch], repeatRows=1)
+        ctx_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+            ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [WHITE, LIGHT_GRAY]),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+            ('LEFTPADDING', (0, 0), (-1, -1), 5),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 5),
+            ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+        ]))
+        story.append(ctx_table)
+
+    story.append(PageBreak())
+
+    return story
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# APPENDIX
+# ═══════════════════════════════════════════════════════════════════════════
+
+def appendix_section(data):
+    sources = data['sources']
+    story = []
+    story.append(Paragraph("Appendix: Sources", h1_style))
+    story.append(HRFlowable(width="100%", thickness=1, color=NAVY, spaceAfter=16))
+
+    # Group sources by type
+    ag_sources = {k: v for k, v in sources.items() if 'AG' in v['label'] or k.startswith('ag_')}
+    law_sources = {k: v for k, v in sources.items() if any(x in k for x in ['ch150', 'mgl', 'cmr', 'eohlc'])}
+    town_sources = {k: v for k, v in sources.items() if k not in ag_sources and k not in law_sources}
+
+    story.append(Paragraph("State Law and Regulatory Sources", h2_style))
+    for key, src in sorted(law_sources.items(), key=lambda kv: kv[0]):
+        story.append(Paragraph(
+            f"• <b>{src['markup']['label']}</b><br/>"
+            f"<font size=7 color='#6b7280'>{src['markup']['url']}</font>",
+            ParagraphStyle('', parent=bullet_style, fontSize=8.5, leading=11, spaceAfter=4),
+        ))
+
+    story.append(Paragraph("Attorney General Decisions", h2_style))
+    for key, src in sorted(ag_sources.items(), key=lambda kv: kv[0]):
+        story.append(Paragraph(
+            f"• <b>{src['markup']['label']}</b><br/>"
+            f"<font size=7 color='#6b7280'>{src['markup']['url']}</font>",
+            ParagraphStyle('', parent=bullet_style, fontSize=8.5, leading=11, spaceAfter=4),
+        ))
+
+    story.append(Paragraph("Municipal and News Sources", h2_style))
+    for key, src in sorted(town_sources.items(), key=lambda kv: kv[0]):
+        story.append(Paragraph(
+            f"• <b>{src['markup']['label']}</b><br/>"
+            f"<font size=7 color='#6b7280'>{src['markup']['url']}</font>",
+            ParagraphStyle('', parent=bullet_style, fontSize=8.5, leading=11, spaceAfter=4),
+        ))
+
+    story.append(Spacer(1, 30))
+    story.append(HRFlowable(width="40%", thickness=1, color=MID_GRAY, spaceAfter=12))
+    story.append(Paragraph(
+        "Compliance analysis and consistency assessments © 2025–2026 ADU Pulse",
+        ParagraphStyle('', parent=body_style, alignment=TA_CENTER, fontSize=9, textColor=MID_GRAY),
+    ))
+    story.append(Paragraph(
+        "adupulse.com",
+        ParagraphStyle('', parent=body_style, alignment=TA_CENTER, fontSize=9, textColor=BLUE_ACCENT),
+    ))
+
+    return story
 
 
 # ── Build PDF ────────────────────────────────────────────────────────────
 
-doc.build(story, onFirstPage=add_cover_footer, onLaterPages=add_page_footer)
-print(f"Report generated: {OUTPUT_FILE}")
-print(f"Towns parsed: {len(towns)}")
-print(f"Total provisions: {total_provisions}")
-print(f"Inconsistent: {total_inconsistent} (AG: {total_ag_disapproved}, Analysis: {total_statutory_conflict})")
-print(f"Needs Review: {total_review}")
-print(f"Consistent: {total_consistent}")
-print(f"Narrative cities: {len(narrative_cities)}")
-print(f"Sources: {len(sources)}")
+SECTIONS = {
+    'cover': cover_section,
+    'executive_summary': executive_summary_section,
+    'methodology': methodology_section,
+    'tier_summary': tier_summary_section,
+    'ag_timeline': ag_timeline_section,
+    'inconsistency_types': inconsistency_types_section,
+    'town_profiles': town_profiles_section,
+    'permit_correlation': permit_correlation_section,
+    'statewide_map': statewide_map_section,
+    'statewide_rankings': statewide_rankings_section,
+    'appendix': appendix_section,
+}
+
+
+def cached_flowables(data, key, build):
+    """Flowables from data['flowable_cache'] when the caller shares one across builds.
+
+    Layout mutates flowables, so each build gets its own copy of the cached
+    entry. Everything an entry depends on must be in its key or identical for
+    every build that shares the cache (report_editions.py shares one per
+    parse of the data).
+    """
+    cache = data.get('flowable_cache')
+    if cache is None:
+        return build()
+    if key not in cache:
+        cache[key] = build()
+    return copy.deepcopy(cache[key])
+
+
+def build_story(data, sections=None):
+    """Concatenate section flowables; `sections` is a list of SECTIONS keys."""
+    story = []
+    for name in sections or SECTIONS:
+        story.extend(SECTIONS[name](data))
+    return story
+
+
+def build_report(data, output_file=OUTPUT_FILE, sections=None, invariant=True):
+    """Render the report to a path or file object.
+
+    With `invariant` the PDF ID and creation date are fixed (SOURCE_DATE_EPOCH
+    sets the date when given), so the bytes depend only on the data.
+    """
+    edition_title = data.get('edition', {}).get('title')
+    doc = SimpleDocTemplate(
+        output_file,
+        pagesize=letter,
+        topMargin=0.75*inch,
+        bottomMargin=0.75*inch,
+        leftMargin=1*inch,
+        rightMargin=1*inch,
+        title=f"{REPORT_TITLE} — {edition_title}" if edition_title else REPORT_TITLE,
+        author=REPORT_AUTHOR,
+        creator=REPORT_AUTHOR,
+        subject='Local ADU bylaw consistency with MGL c.40A §3 and 760 CMR 71.00',
+        invariant=invariant,
+    )
+    story = build_story(data, sections)
+    doc.build(story, onFirstPage=add_cover_footer, onLaterPages=add_page_footer)
+    return output_file
+
+
+# ── Content-hash build skipping ──────────────────────────────────────────
+
+BUILD_STAMP_FILE = os.path.join(os.path.dirname(__file__), '.report-cache', 'report_builds.json')
+
+
+def input_files(filepath=DATA_FILE):
+    """Data files the report is built from."""
+    return (filepath, SEO_DATA_FILE, HLC_DATA_FILE, *sorted(glob.glob(PERMITS_GLOB)))
+
+
+def report_modules():
+    """Source files of every repository module loaded in this process.
+
+    The modules sit at the repository root, so anything the report imports,
+    directly or not, is covered without keeping a list; call it once the
+    imports have run.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    paths = set()
+    for module in list(sys.modules.values()):
+        path = getattr(module, '__file__', None)
+        if path and path.endswith('.py') and os.path.dirname(os.path.abspath(path)) == here:
+            paths.add(os.path.abspath(path))
+    return sorted(paths)
+
+
+def build_digest(paths, sections=None):
+    """sha256 over the input files, report code, reportlab version and section list."""
+    code = report_modules()
+    digest = hashlib.sha256(f"reportlab {reportlab.Version}\nsections {sections}\n".encode())
+    for path in (*paths, *code):
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest.update(f"{os.path.basename(path)} {len(content)}\n".encode())
+        digest.update(content)
+    return digest.hexdigest()
+
+
+def file_digest(path):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def load_build_stamps(path=BUILD_STAMP_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_build_stamps(stamps, path=BUILD_STAMP_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(stamps, f, indent=1, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate the ADU compliance snapshot PDF')
+    parser.add_argument('--data', default=DATA_FILE, help='path to compliance-data.ts')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='PDF path')
+    parser.add_argument('--force', action='store_true', help='rebuild even if the inputs are unchanged')
+    args = parser.parse_args(argv)
+
+    # Skip when the inputs match the last build of this output and the
+    # output on disk is still the file that build wrote
+    stamp_key = os.path.relpath(os.path.abspath(args.output), os.path.dirname(os.path.abspath(__file__)))
+    stamps = load_build_stamps()
+    inputs = build_digest(input_files(args.data))
+    previous = stamps.get(stamp_key, {})
+    if not args.force and previous.get('inputs') == inputs and previous.get('pdf') == file_digest(args.output):
+        print(f"Report up to date: {args.output} (inputs {inputs[:12]})")
+        return
+
+    data = load_report_data(args.data)
+    buf = io.BytesIO()
+    build_report(data, buf)
+    pdf = buf.getvalue()
+    pdf_digest = hashlib.sha256(pdf).hexdigest()
+    # Leave an identical file untouched so its mtime doesn't churn
+    if pdf_digest != file_digest(args.output):
+        with open(args.output, 'wb') as f:
+            f.write(pdf)
+        print(f"Report generated: {args.output}")
+    else:
+        print(f"Report unchanged: {args.output}")
+    stamps[stamp_key] = {'inputs': inputs, 'pdf': pdf_digest}
+    save_build_stamps(stamps)
+
+    stats = data['stats']
+    print(f"PDF sha256: {pdf_digest}")
+    print(f"Towns parsed: {len(data['towns'])}")
+    print(f"Total provisions: {stats['total_provisions']}")
+    print(f"Inconsistent: {stats['total_inconsistent']} (AG: {stats['total_ag_disapproved']}, Analysis: {stats['total_statutory_conflict']})")
+    print(f"Needs Review: {stats['total_review']}")
+    print(f"Consistent: {stats['total_consistent']}")
+    print(f"Narrative cities: {len(data['narrative_cities'])}")
+    print(f"Sources: {len(data['sources'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,15 @@
 /** @type {import('next').NextConfig} */
 const nextConfig = {
   reactStrictMode: true,
+  experimental: {
+    // These routes read precomputed files from disk at runtime: the chat context
+    // (chat_context.py) and the per-town and per-provision shards (town_shards.py)
+    outputFileTracingIncludes: {
+      '/api/chat': ['./public/data/chat/**/*'],
+      '/towns/[slug]': ['./public/data/shards/manifest.json', './public/data/shards/towns/**/*.json'],
+      '/compliance/[slug]/[provisionId]': ['./public/data/shards/manifest.json', './public/data/shards/provisions/**/*.json'],
+    },
+  },
   async redirects() {
     return [
       { source: '/scores', destination: '/rankings', permanent: true },
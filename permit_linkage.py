@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Record linkage for permits arriving from several sources.
+
+The same permit can come in through FOIA responses, manual entry, the state
+survey and scraping (the `source` values allowed in supabase/schema.sql),
+with addresses written in different shapes ("Freeman Street,25" vs
+"25 Freeman St"). Records are normalized, grouped into blocks that share a
+blocking key (town + permit number, or town + street number + street), and
+compared only within a block. Matching records are merged into one
+canonical permit that lists every source record it came from.
+
+Two records match when their permit numbers agree, or when they share an
+address, at most one of them has a permit number, and their dates are
+compatible. Distinct permit numbers at one address stay separate (Falmouth
+has two permits at 0 Agawan Rd), and a record without a number at such an
+address is left unmerged rather than guessed.
+
+Usage:
+    python3 permit_linkage.py                                  # all src/data permit logs
+    python3 permit_linkage.py --csv permits_export.csv --out merged.json
+"""
+
+import argparse
+import csv
+import datetime
+import glob
+import json
+import os
+import re
+from collections import defaultdict
+
+from town_match import resolve_slug
+from town_scorecard import PERMITS_GLOB, parse_permit_date
+
+# Highest priority first: which source wins when fields disagree
+SOURCE_PRIORITY = ('foia', 'manual', 'scrape', 'state_survey')
+DATE_TOLERANCE_DAYS = 45
+FIELDS = ('permit_number', 'address', 'status', 'applied_date', 'issued_date',
+          'adu_type', 'sqft', 'estimated_value', 'notes')
+
+STREET_SUFFIXES = {
+    'STREET': 'ST', 'STR': 'ST', 'ROAD': 'RD', 'AVENUE': 'AVE', 'AV': 'AVE', 'DRIVE': 'DR',
+    'LANE': 'LN', 'COURT': 'CT', 'PLACE': 'PL', 'TERRACE': 'TER', 'TERR': 'TER',
+    'CIRCLE': 'CIR', 'BOULEVARD': 'BLVD', 'PARKWAY': 'PKWY', 'HIGHWAY': 'HWY',
+    'SQUARE': 'SQ', 'WAY': 'WAY', 'PATH': 'PATH', 'CROSSING': 'XING', 'EXTENSION': 'EXT',
+}
+DIRECTIONS = {'NORTH': 'N', 'SOUTH': 'S', 'EAST': 'E', 'WEST': 'W'}
+WORD_ABBREVIATIONS = {'MOUNT': 'MT', 'SAINT': 'ST'}
+UNIT_PATTERN = re.compile(r'\s*(?:,\s*)?(?:#|\b(?:UNIT|APT|SUITE|STE)\b\.?)\s*[\w-]+\s*$')
+HOUSE_NUMBER = r'\d+[A-Z]?(?:\s*-\s*\d+[A-Z]?)?'
+LEADING_NUMBER = re.compile(rf'^({HOUSE_NUMBER})\s+(.+)$')
+TRAILING_NUMBER = re.compile(rf'^(.+?)\s*,\s*({HOUSE_NUMBER})$')
+
+
+# ── Normalization ────────────────────────────────────────────────────────
+
+def parse_any_date(value):
+    """M/D/YY (permit logs) or YYYY-MM-DD (logs and database exports)."""
+    if not value:
+        return None
+    value = str(value).strip()
+    if '/' in value:
+        return parse_permit_date(value)
+    try:
+        return datetime.date.fromisoformat(value[:10])
+    except ValueError:
+        return None
+
+
+def parse_int(value):
+    """Whole number from '12', '12.0' or 12.0; None when blank or not numeric."""
+    try:
+        return int(float(value)) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def permit_log_slug(path):
+    return os.path.basename(path)[:-len('_permits.json')]
+
+
+def normalize_street(street):
+    words = re.sub(r'[^\w\s]', ' ', street.upper()).split()
+    out = []
+    for i, word in enumerate(words):
+        if i == len(words) - 1 and word in STREET_SUFFIXES:
+            word = STREET_SUFFIXES[word]
+        elif word in DIRECTIONS and i == 0 and len(words) > 2:     # "North Main St", not "North St"
+            word = DIRECTIONS[word]
+        else:
+            word = WORD_ABBREVIATIONS.get(word, word)
+        out.append(word)
+    return ' '.join(out)
+
+
+def normalize_address(raw):
+    """(house number, street) in canonical form; number is '' when none is found.
+
+    Handles "25 Freeman St", "Freeman Street,25" and "Gate House Road, 61",
+    drops trailing unit designators and standardizes street suffixes.
+    """
+    text = ' '.join((raw or '').upper().split())
+    text = UNIT_PATTERN.sub('', text)
+    m = LEADING_NUMBER.match(text) or TRAILING_NUMBER.match(text)
+    if m is None:
+        return '', normalize_street(text)
+    number, street = (m.group(1), m.group(2)) if m.re is LEADING_NUMBER else (m.group(2), m.group(1))
+    return re.sub(r'\s+', '', number), normalize_street(street)
+
+
+def normalize_permit_number(raw):
+    """Upper-case alphanumerics with leading zeros dropped from each numeric run."""
+    if raw is None:
+        return ''
+    parts = re.findall(r'[A-Z]+|\d+', str(raw).upper())
+    return '-'.join(p.lstrip('0') or '0' if p.isdigit() else p for p in parts)
+
+
+def permit_from_log(slug, record, source='scrape'):
+    """Linkage record from an entry in src/data/<slug>_permits.json."""
+    return {
+        'town': slug,
+        'source': source,
+        'permit_number': record.get('permit') or '',
+        'address': record.get('address') or '',
+        'status': record.get('status') or '',
+        'applied_date': record.get('applied') or '',
+        'issued_date': record.get('issued') or '',
+        'adu_type': (record.get('type') or '').lower(),
+        'sqft': record.get('sqft') or None,
+        'estimated_value': record.get('cost') or None,
+        'notes': record.get('notes') or '',
+    }
+
+
+def permit_from_row(row):
+    """Linkage record from a CSV export of the `permits` table (plus a `town` column)."""
+    return {
+        'town': resolve_slug(row.get('town') or '') if row.get('town') else '',
+        'source': row.get('source') or 'manual',
+        'permit_number': row.get('permit_number') or '',
+        'address': row.get('address') or '',
+        'status': row.get('status') or '',
+        'applied_date': row.get('applied_date') or '',
+        'issued_date': row.get('approved_date') or '',
+        'adu_type': row.get('adu_type') or '',
+        'sqft': row.get('sqft') or None,
+        'estimated_value': row.get('estimated_value') or None,
+        'notes': row.get('notes') or '',
+    }
+
+
+def prepare(records):
+    """Attach normalized keys used for blocking and comparison."""
+    for i, r in enumerate(records):
+        r['_id'] = i
+        r['_permit'] = normalize_permit_number(r['permit_number'])
+        r['_number'], r['_street'] = normalize_address(r['address'])
+        r['_applied'] = parse_any_date(r['applied_date'])
+        r['_issued'] = parse_any_date(r['issued_date'])
+    return records
+
+
+# ── Blocking and matching ────────────────────────────────────────────────
+
+def blocking_keys(r):
+    if r['_permit']:
+        yield ('permit', r['town'], r['_permit'])
+    if r['_number'] and r['_street']:
+        yield ('address', r['town'], r['_number'], r['_street'])
+
+
+def dates_compatible(a, b):
+    for field in ('_applied', '_issued'):
+        if a[field] and b[field] and abs((a[field] - b[field]).days) > DATE_TOLERANCE_DAYS:
+            return False
+    return True
+
+
+def is_match(a, b, key_kind):
+    if key_kind == 'permit':
+        return True
+    if a['_permit'] and b['_permit'] and a['_permit'] != b['_permit']:
+        return False
+    return dates_compatible(a, b)
+
+
+class DisjointSet:
+    """Union-find that refuses to join clusters holding different permit numbers."""
+
+    def __init__(self, records):
+        self.parent = list(range(len(records)))
+        self.permits = [{r['_permit']} - {''} for r in records]
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return True
+        if len(self.permits[ra] | self.permits[rb]) > 1:
+            return False
+        root, child = min(ra, rb), max(ra, rb)
+        self.parent[child] = root
+        self.permits[root] |= self.permits[child]
+        return True
+
+
+def link(records):
+    """Cluster prepared records; returns (clusters as lists of ids, comparisons, ambiguous ids)."""
+    blocks = defaultdict(list)
+    for r in records:
+        for key in blocking_keys(r):
+            blocks[key].append(r['_id'])
+
+    sets = DisjointSet(records)
+    comparisons = 0
+    ambiguous = set()
+    # Permit-number blocks first, so address blocks see settled clusters
+    for key in sorted(blocks, key=lambda k: k[0] != 'permit'):
+        ids = blocks[key]
+        if key[0] == 'address' and len({records[i]['_permit'] for i in ids} - {''}) > 1:
+            # Several permits at this address: a number-less record can't be placed
+            unnumbered = [i for i in ids if not records[i]['_permit']]
+            ambiguous.update(unnumbered)
+            ids = [i for i in ids if records[i]['_permit']]
+        for n, i in enumerate(ids):
+            for j in ids[n + 1:]:
+                if sets.find(i) == sets.find(j):
+                    continue
+                comparisons += 1
+                if is_match(records[i], records[j], key[0]):
+                    sets.union(i, j)
+
+    clusters = defaultdict(list)
+    for r in records:
+        clusters[sets.find(r['_id'])].append(r['_id'])
+    return list(clusters.values()), comparisons, sorted(ambiguous)
+
+
+# ── Merge ────────────────────────────────────────────────────────────────
+
+def _priority(r):
+    source = r['source']
+    return (SOURCE_PRIORITY.index(source) if source in SOURCE_PRIORITY else len(SOURCE_PRIORITY), r['_id'])
+
+
+def merge_cluster(records, ids):
+    """Canonical permit for one cluster; each field comes from the highest-priority source that has it."""
+    members = sorted((records[i] for i in ids), key=_priority)
+    canonical = {'town': members[0]['town']}
+    field_sources = {}
+    for field in FIELDS:
+        for r in members:
+            if r[field] not in ('', None):
+                canonical[field] = r[field]
+                field_sources[field] = r['_id']
+                break
+        else:
+            canonical[field] = None
+    number, street = next(((r['_number'], r['_street']) for r in members if r['_street']), ('', ''))
+    canonical['normalized_address'] = f"{number} {street}".strip()
+    canonical['normalized_permit_number'] = next((r['_permit'] for r in members if r['_permit']), '')
+    canonical['provenance'] = [
+        {
+            'source': r['source'],
+            'record': r['_id'],
+            'permit_number': r['permit_number'],
+            'address': r['address'],
+            'fields': sorted(f for f, rid in field_sources.items() if rid == r['_id']),
+        }
+        for r in members
+    ]
+    return canonical
+
+
+def deduplicate(records):
+    """(canonical permits, stats) for raw linkage records from any mix of sources."""
+    records = prepare(records)
+    clusters, comparisons, ambiguous = link(records)
+    merged = [merge_cluster(records, ids) for ids in sorted(clusters, key=min)]
+    n = len(records)
+    return merged, {
+        'records': n,
+        'canonical': len(merged),
+        'duplicates': n - len(merged),
+        'ambiguous': ambiguous,
+        'comparisons': comparisons,
+        'naive_comparisons': n * (n - 1) // 2,
+    }
+
+
+def load_permit_logs(pattern=PERMITS_GLOB, source='scrape'):
+    records = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, 'r', encoding='utf-8') as f:
+            records.extend(permit_from_log(permit_log_slug(path), r, source) for r in json.load(f))
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Deduplicate permits across data sources')
+    parser.add_argument('--logs', default=PERMITS_GLOB, help='glob of <slug>_permits.json files')
+    parser.add_argument('--log-source', default='scrape', choices=SOURCE_PRIORITY,
+                        help='source recorded for permit-log entries')
+    parser.add_argument('--csv', action='append', default=[], help='CSV export of the permits table (repeatable)')
+    parser.add_argument('--out', help='write canonical permits with provenance as JSON')
+    args = parser.parse_args(argv)
+
+    records = load_permit_logs(args.logs, args.log_source)
+    for path in args.csv:
+        with open(path, newline='', encoding='utf-8') as f:
+            records.extend(permit_from_row(row) for row in csv.DictReader(f))
+
+    merged, stats = deduplicate(records)
+    print(f"{stats['records']} records -> {stats['canonical']} permits "
+          f"({stats['duplicates']} duplicates merged, {stats['comparisons']} comparisons "
+          f"vs {stats['naive_comparisons']:,} pairwise)")
+    if stats['ambiguous']:
+        print(f"{len(stats['ambiguous'])} record(s) left unmerged: address shared by several permits")
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, indent=1, default=str)
+            f.write('\n')
+        print(f"Wrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
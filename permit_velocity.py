@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Append-only time series of permit activity per town.
+
+Every permit date becomes an event (town, permit key, kind, month) with kind
+'applied' or 'issued'. Events are appended to a JSONL log and folded into
+per-town monthly counts. A re-ingested permit is recognised by its key:
+the permit number, or the address and application date when there is none,
+so a pending permit keeps its key once it is issued. An unchanged date is
+skipped, so feeding the same batch twice changes nothing, and a corrected
+date supersedes the earlier event, moving the count to the new month. Only
+towns that received new events have their series (monthly counts plus
+rolling 3- and 12-month velocity) recomputed.
+
+Sources are the permit logs in src/data/<slug>_permits.json and CSV exports
+of the Supabase `permits` table (town, permit_number, address, applied_date,
+approved_date).
+
+Tests: tests/test_permit_velocity.py.
+
+Usage:
+    python3 permit_velocity.py ingest src/data/*_permits.json
+    python3 permit_velocity.py ingest --csv permits_export.csv
+    python3 permit_velocity.py show newton
+    python3 permit_velocity.py export --out public/data/permit_velocity.json
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+
+import numpy as np
+
+from permit_linkage import normalize_address, normalize_permit_number, parse_any_date, permit_log_slug
+from town_match import resolve_slug
+from town_scorecard import PERMITS_GLOB
+
+STORE_DIR = os.path.join(os.path.dirname(__file__), '.report-cache', 'permit_velocity')
+KINDS = ('applied', 'issued')
+WINDOWS = (3, 12)
+
+
+# ── Events ───────────────────────────────────────────────────────────────
+
+def month_key(date):
+    return f"{date.year:04d}-{date.month:02d}"
+
+
+def permit_key(permit_number, address, applied):
+    """Stable identity for a permit within a town, robust to formatting differences.
+
+    Permits without a number are keyed by address and application date, not
+    the issue date, so a pending permit keeps its key once it is issued.
+    """
+    number = normalize_permit_number(permit_number)
+    if number:
+        return f"#{number}"
+    house, street = normalize_address(address)
+    return f"@{house} {street}|{parse_any_date(applied) or ''}"
+
+
+def upgrade_key(key):
+    """Drop the issue date from a number-less key logged before permit_key stopped using it."""
+    if key.startswith('@') and key.count('|') == 2:
+        return key.rsplit('|', 1)[0]
+    return key
+
+
+def _events(town, key, applied, issued):
+    for kind, value in (('applied', applied), ('issued', issued)):
+        date = parse_any_date(value)
+        if date:
+            yield (town, key, kind, month_key(date))
+
+
+def events_from_permit_log(slug, permits):
+    for p in permits:
+        key = permit_key(p.get('permit'), p.get('address'), p.get('applied'))
+        yield from _events(slug, key, p.get('applied'), p.get('issued'))
+
+
+def events_from_rows(rows):
+    """Rows exported from the `permits` table; `town` may be a slug or a name."""
+    for r in rows:
+        town = (r.get('town') or r.get('slug') or '').strip()
+        if not town:
+            continue
+        town = resolve_slug(town)
+        key = permit_key(r.get('permit_number'), r.get('address'), r.get('applied_date'))
+        yield from _events(town, key, r.get('applied_date'), r.get('approved_date'))
+
+
+# ── Store ────────────────────────────────────────────────────────────────
+
+def month_range(first, last):
+    """Every 'YYYY-MM' from first to last inclusive."""
+    year, month = int(first[:4]), int(first[5:])
+    end = (int(last[:4]), int(last[5:]))
+    months = []
+    while (year, month) <= end:
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def trailing_mean(counts, window):
+    """Mean of the last `window` months at each month (shorter at the start)."""
+    csum = np.concatenate(([0], np.cumsum(counts)))
+    idx = np.arange(1, len(counts) + 1)
+    start = np.maximum(0, idx - window)
+    return (csum[idx] - csum[start]) / window
+
+
+def extend_series(series, as_of):
+    """Pad a series with empty months through `as_of`; only the tail windows are recomputed."""
+    new_months = month_range(series['months'][-1], as_of)[1:]
+    out = {'months': series['months'] + new_months}
+    tail = max(WINDOWS)
+    for kind in KINDS:
+        counts = series[kind][-tail:] + [0] * len(new_months)
+        out[kind] = series[kind] + [0] * len(new_months)
+        for window in WINDOWS:
+            rolled = np.round(trailing_mean(np.array(counts), window), 2).tolist()
+            out[f'{kind}_{window}m'] = series[f'{kind}_{window}m'] + rolled[len(counts) - len(new_months):]
+    return out
+
+
+class VelocityStore:
+    """Monthly counts per town, backed by an append-only event log.
+
+    `events.jsonl` is the source of truth; `state.json` is a snapshot of the
+    folded counts and the log offset it covers, so opening the store only
+    replays events appended since the last save.
+    """
+
+    def __init__(self, directory=STORE_DIR):
+        self.directory = directory      # None keeps the store in memory only
+        self.counts = {}        # town -> kind -> month -> count
+        self.seen = {}          # (town, key, kind) -> month
+        self.series_cache = {}  # town -> series dict
+        self.as_of = None
+        self.offset = 0
+        self.dirty = set()
+        self._load()
+
+    @property
+    def log_path(self):
+        return os.path.join(self.directory, 'events.jsonl')
+
+    @property
+    def state_path(self):
+        return os.path.join(self.directory, 'state.json')
+
+    def _load(self):
+        if self.directory is None:
+            return
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            # Snapshots from before events carried their month in `seen`, or
+            # from before number-less keys dropped the issue date, are
+            # ignored; the whole log is replayed instead.
+            if all(len(s) == 4 and upgrade_key(s[1]) == s[1] for s in state['seen']):
+                self.counts = state['counts']
+                self.seen = {tuple(s[:3]): s[3] for s in state['seen']}
+                self.series_cache = state['series']
+                self.as_of = state['as_of']
+                self.offset = state['offset']
+        if os.path.exists(self.log_path):
+            with open(self.log_path, 'rb') as f:
+                f.seek(self.offset)
+                for line in f:
+                    if not line.endswith(b'\n'):   # torn final write
+                        break
+                    town, key, kind, month = json.loads(line)
+                    self._fold((town, upgrade_key(key), kind, month))
+                    self.offset += len(line)
+
+    def _fold(self, event):
+        """Count an event; a later event for the same permit and kind replaces the earlier one."""
+        town, key, kind, month = event
+        previous = self.seen.get((town, key, kind))
+        if previous == month:
+            return False
+        self.seen[(town, key, kind)] = month
+        by_month = self.counts.setdefault(town, {k: {} for k in KINDS})[kind]
+        if previous is not None:
+            by_month[previous] -= 1
+            if not by_month[previous]:
+                del by_month[previous]
+                if previous == self.as_of:
+                    self._reset_as_of()
+        by_month[month] = by_month.get(month, 0) + 1
+        if self.as_of is None or month > self.as_of:
+            self.as_of = month
+        self.dirty.add(town)
+        self.series_cache.pop(town, None)
+        return True
+
+    def _reset_as_of(self):
+        """Recompute `as_of` after a correction emptied its month; cached series may now run past it."""
+        months = [m for kinds in self.counts.values() for by_month in kinds.values() for m in by_month]
+        as_of = max(months, default=None)
+        if as_of != self.as_of:
+            self.as_of = as_of
+            self.series_cache.clear()
+
+    def append(self, events):
+        """Fold new events into the counts and the log; returns how many were new."""
+        new = []
+        for event in events:
+            if self._fold(event):
+                new.append(event)
+        if new and self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                for event in new:
+                    line = json.dumps(list(event)) + '\n'
+                    f.write(line)
+                    self.offset += len(line.encode('utf-8'))
+        return len(new)
+
+    def series(self, town):
+        """Monthly counts and rolling velocity for one town, first event through `as_of`."""
+        if town in self.series_cache:
+            cached = self.series_cache[town]
+            if cached['months'][-1] != self.as_of:
+                cached = self.series_cache[town] = extend_series(cached, self.as_of)
+            return cached
+        kinds = self.counts.get(town)
+        if not kinds or not any(kinds.values()):
+            return None
+        first = min(m for by_month in kinds.values() for m in by_month)
+        months = month_range(first, self.as_of)
+        out = {'months': months}
+        for kind in KINDS:
+            counts = np.array([kinds[kind].get(m, 0) for m in months], dtype=np.int64)
+            out[kind] = counts.tolist()
+            for window in WINDOWS:
+                out[f'{kind}_{window}m'] = np.round(trailing_mean(counts, window), 2).tolist()
+        self.series_cache[town] = out
+        return out
+
+    def towns(self):
+        return sorted(self.counts)
+
+    def save(self):
+        """Snapshot counts and series so the next open replays nothing."""
+        for town in self.towns():
+            self.series(town)
+        self.dirty.clear()
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({
+                'as_of': self.as_of,
+                'offset': self.offset,
+                'counts': self.counts,
+                'seen': sorted([*s, month] for s, month in self.seen.items()),
+                'series': self.series_cache,
+            }, f, sort_keys=True)
+        os.replace(tmp, self.state_path)
+
+
+def ingest_permit_logs(store, paths=None):
+    """Append events from <slug>_permits.json files; returns how many were new."""
+    added = 0
+    for path in sorted(glob.glob(PERMITS_GLOB)) if paths is None else paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            added += store.append(events_from_permit_log(permit_log_slug(path), json.load(f)))
+    return added
+
+
+def velocity_artifact(store):
+    return {'as_of': store.as_of, 'towns': {town: store.series(town) for town in store.towns()}}
+
+
+def write_velocity_artifact(store, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(velocity_artifact(store), f, indent=1, sort_keys=True)
+        f.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Permit velocity time-series store')
+    parser.add_argument('--store', default=STORE_DIR, help='store directory')
+    sub = parser.add_subparsers(dest='command', required=True)
+    ingest = sub.add_parser('ingest', help='append permit logs or a permits CSV export')
+    ingest.add_argument('paths', nargs='*', help='<slug>_permits.json files (default: all in src/data)')
+    ingest.add_argument('--csv', help='CSV export of the permits table')
+    show = sub.add_parser('show', help='print one town\'s series')
+    show.add_argument('town')
+    export = sub.add_parser('export', help='write every series as JSON')
+    export.add_argument('--out', required=True)
+    args = parser.parse_args(argv)
+
+    store = VelocityStore(args.store)
+    if args.command == 'ingest':
+        added = 0
+        if args.csv:
+            with open(args.csv, newline='', encoding='utf-8') as f:
+                added += store.append(events_from_rows(csv.DictReader(f)))
+        if args.paths or not args.csv:
+            added += ingest_permit_logs(store, args.paths or None)
+        touched = len(store.dirty)
+        store.save()
+        print(f"{added} new events across {touched} town{'s' if touched != 1 else ''} (as of {store.as_of})")
+    elif args.command == 'show':
+        s = store.series(args.town)
+        if s is None:
+            parser.error(f"no events for {args.town}")
+        print(f"{'month':8s} {'applied':>7s} {'issued':>6s} {'iss/mo 3m':>9s} {'iss/mo 12m':>10s}")
+        for i, month in enumerate(s['months']):
+            print(f"{month:8s} {s['applied'][i]:7d} {s['issued'][i]:6d} "
+                  f"{s['issued_3m'][i]:9.2f} {s['issued_12m'][i]:10.2f}")
+    else:
+        write_velocity_artifact(store, args.out)
+        print(f"Wrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
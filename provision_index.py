@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Inverted index over compliance provisions for cross-town queries.
+
+Built once from the parsed compliance-data.ts towns. Every provision gets an
+integer id; each provision name, category, status and AG flag maps to the set
+of provision ids carrying it, so a question like "which towns have an
+inconsistent parking requirement" is a set intersection instead of a scan.
+
+Usage:
+    python3 provision_index.py --status inconsistent --category "Dimensional & Parking"
+    python3 provision_index.py --provision "Minimum Lot Size Requirement" --ag
+    python3 provision_index.py --list category --status inconsistent
+"""
+
+import argparse
+
+FIELDS = ('provision', 'category', 'status', 'ag')
+
+
+class ProvisionIndex:
+    """Postings from (field, value) to provision ids, projected onto towns."""
+
+    def __init__(self, towns):
+        self.provision_towns = []   # provision id -> town slug
+        self.provisions = []        # provision id -> provision dict
+        self.town_names = {}
+        # field -> {value: set of provision ids}, in first-seen order
+        self.postings = {field: {} for field in FIELDS}
+        self.all_ids = frozenset()
+
+        for t in towns:
+            self.town_names[t['slug']] = t['name']
+            for p in t['provisions']:
+                self.add(t['slug'], p)
+        self.all_ids = frozenset(range(len(self.provisions)))
+
+    def add(self, slug, provision):
+        pid = len(self.provisions)
+        self.provisions.append(provision)
+        self.provision_towns.append(slug)
+        keys = (
+            ('provision', provision['provision']),
+            ('category', provision['category']),
+            ('status', provision['status']),
+            ('ag', provision['has_ag_decision']),
+        )
+        for field, value in keys:
+            self.postings[field].setdefault(value, set()).add(pid)
+        return pid
+
+    def values(self, field):
+        """Distinct values seen for a field, in first-seen order."""
+        return list(self.postings[field])
+
+    def match(self, provision=None, category=None, status=None, ag=None):
+        """Provision ids matching every given filter (None = unfiltered)."""
+        filters = (('provision', provision), ('category', category),
+                   ('status', status), ('ag', ag))
+        sets = [self.postings[f].get(v, set()) for f, v in filters if v is not None]
+        if not sets:
+            return set(self.all_ids)
+        sets.sort(key=len)
+        result = set(sets[0])
+        for s in sets[1:]:
+            result &= s
+            if not result:
+                break
+        return result
+
+    def towns(self, **filters):
+        """Sorted town slugs having at least one provision matching the filters."""
+        return sorted({self.provision_towns[pid] for pid in self.match(**filters)})
+
+    def count(self, **filters):
+        return len(self.match(**filters))
+
+    def counts_by(self, field, **filters):
+        """[(value, provision count)] for a field, most common first (ties by value), zero counts dropped."""
+        base = self.match(**filters)
+        counts = []
+        for value, ids in self.postings[field].items():
+            n = len(ids & base) if filters else len(ids)
+            if n:
+                counts.append((value, n))
+        counts.sort(key=lambda kv: (-kv[1], str(kv[0])))
+        return counts
+
+
+def build_index(towns):
+    return ProvisionIndex(towns)
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    from generate_report import DATA_FILE, parse_compliance_data
+
+    parser = argparse.ArgumentParser(description='Cross-town provision queries over compliance-data.ts')
+    parser.add_argument('--provision', help='exact provision name, e.g. "Owner-Occupancy Requirement"')
+    parser.add_argument('--category', help='e.g. "Dimensional & Parking"')
+    parser.add_argument('--status', choices=['inconsistent', 'review', 'compliant'])
+    parser.add_argument('--ag', dest='ag', action='store_const', const=True,
+                        help='only provisions with an AG decision')
+    parser.add_argument('--no-ag', dest='ag', action='store_const', const=False,
+                        help='only provisions without an AG decision')
+    parser.add_argument('--list', choices=['provision', 'category', 'status'],
+                        help='count matching provisions by this field instead of listing towns')
+    parser.add_argument('--data', default=DATA_FILE, help='path to compliance-data.ts')
+    args = parser.parse_args(argv)
+
+    towns, _, _ = parse_compliance_data(args.data)
+    index = build_index(towns)
+    filters = dict(provision=args.provision, category=args.category,
+                   status=args.status, ag=args.ag)
+
+    if args.list:
+        active = {k: v for k, v in filters.items() if v is not None}
+        for value, count in index.counts_by(args.list, **active):
+            print(f"{count:4d}  {value}")
+        return
+
+    slugs = index.towns(**filters)
+    for slug in slugs:
+        print(f"{slug:20s} {index.town_names[slug]}")
+    print(f"{len(slugs)} town{'s' if len(slugs) != 1 else ''}, "
+          f"{index.count(**filters)} matching provisions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Incremental analyzer for the chat query log in Redis.
+
+src/lib/query-log.ts RPUSHes one JSON entry per chat question onto
+`adupulse:query_log`. This reads the list in fixed-size pages from a cursor
+persisted in .report-cache/query_log/state.json, parses entries one at a
+time and folds them into running aggregates:
+- questions per day
+- how often each town is asked about
+- "unanswered" mentions: towns asked about that have no compliance profile
+  or narrative, which ranks them for the next FOIA requests
+Each run only reads entries pushed since the last one.
+
+Consumed entries beyond the newest --keep are archived to gzipped JSONL
+files (archive/query_log-<first>-<last>.jsonl.gz, numbered by absolute
+position in the log) and trimmed from Redis. The trim and the count of
+trimmed entries (`adupulse:query_log:trimmed`) change in one MULTI, so the
+cursor stays aligned with the list even if a run dies half way. The cursor
+and the pending trim are saved before the MULTI: a run that dies after the
+trim neither loses nor re-reads those entries, and one that dies before it
+rewrites the same archive file next time.
+
+Tests (tests/test_query_log.py) run against fakeredis, or a real server
+with REDIS_TEST_URL=redis://localhost:6379/15 (that db is flushed).
+
+Requires redis-py (pip install redis).
+
+Local run against a throwaway Redis:
+    docker run -d --rm -p 6379:6379 redis:7
+    redis-cli RPUSH adupulse:query_log '{"timestamp":"2026-03-01T12:00:00Z","question":"Can I build in Newton?","towns":["newton"]}'
+    python3 query_log.py --url redis://localhost:6379/0
+
+Usage:
+    python3 query_log.py --url $REDIS_URL                 # consume new entries, print summary
+    python3 query_log.py --url $REDIS_URL --keep 500      # archive and trim all but the newest 500
+    python3 query_log.py --report                         # summary from saved state only
+"""
+
+import argparse
+import gzip
+import json
+import os
+import time
+
+import redis
+
+from generate_report import DATA_FILE, parse_compliance_data
+from town_metrics import SEO_DATA_FILE
+from ts_data import iter_module_records
+
+QUERY_LOG_KEY = 'adupulse:query_log'
+STATE_DIR = os.path.join(os.path.dirname(__file__), '.report-cache', 'query_log')
+PAGE_SIZE = 500
+KEEP_ENTRIES = 1000     # newest entries left in Redis for the admin view
+
+
+class QueryLogAnalyzer:
+    def __init__(self, client, answered, key=QUERY_LOG_KEY, directory=STATE_DIR, page_size=PAGE_SIZE):
+        self.client = client
+        self.answered = answered        # slugs with a compliance profile or narrative
+        self.key = key
+        self.trimmed_key = f"{key}:trimmed"
+        self.directory = directory
+        self.page_size = page_size
+        self.state = {
+            'cursor': 0,            # absolute position of the next unread entry
+            'entries': 0,
+            'malformed': 0,
+            'first': None,
+            'last': None,
+            'per_day': {},
+            'towns': {},
+            'unanswered': {},
+            'archived': 0,
+            'pending_trim': None,   # [first, count] saved before a trim, cleared once settled
+        }
+        self._load()
+
+    @property
+    def state_path(self):
+        return os.path.join(self.directory, 'state.json')
+
+    def _load(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.state.update(json.load(f))
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp, self.state_path)
+
+    def trimmed(self):
+        """Entries trimmed off the head of the list so far (absolute position of index 0)."""
+        return int(self.client.get(self.trimmed_key) or 0)
+
+    def fold(self, raw):
+        s = self.state
+        try:
+            entry = json.loads(raw)
+            day = entry['timestamp'][:10]
+            towns = entry.get('towns') or []
+        except (ValueError, TypeError, KeyError):
+            s['malformed'] += 1
+            return
+        s['entries'] += 1
+        s['per_day'][day] = s['per_day'].get(day, 0) + 1
+        s['first'] = min(s['first'] or entry['timestamp'], entry['timestamp'])
+        s['last'] = max(s['last'] or entry['timestamp'], entry['timestamp'])
+        for slug in set(towns):
+            s['towns'][slug] = s['towns'].get(slug, 0) + 1
+            if slug not in self.answered:
+                s['unanswered'][slug] = s['unanswered'].get(slug, 0) + 1
+
+    def settle_trim(self, offset):
+        """Count the pending trim once `offset` shows it happened; a run may have died in between."""
+        pending = self.state['pending_trim']
+        if pending is None:
+            return
+        first, count = pending
+        if offset >= first + count:
+            self.state['archived'] += count
+        self.state['pending_trim'] = None
+
+    def consume(self):
+        """Fold every entry past the cursor, one LRANGE page at a time; returns how many were read."""
+        offset = self.trimmed()
+        self.settle_trim(offset)
+        if self.state['cursor'] < offset:
+            # Trimmed by someone else before we read them: count the gap as lost
+            self.state['cursor'] = offset
+        read = 0
+        while True:
+            start = self.state['cursor'] - offset
+            page = self.client.lrange(self.key, start, start + self.page_size - 1)
+            for raw in page:
+                self.fold(raw)
+            self.state['cursor'] += len(page)
+            read += len(page)
+            if len(page) < self.page_size:
+                return read
+
+    def archive(self, keep=KEEP_ENTRIES):
+        """Archive and trim consumed entries older than the newest `keep`; returns how many."""
+        offset = self.trimmed()
+        self.settle_trim(offset)
+        length = self.client.llen(self.key)
+        count = min(self.state['cursor'] - offset, length - keep)
+        if count <= 0:
+            return 0
+        first = offset
+        path = os.path.join(self.directory, 'archive', f"query_log-{first:09d}-{first + count - 1:09d}.jsonl.gz")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp'
+        with gzip.open(tmp, 'wb') as f:
+            for start in range(0, count, self.page_size):
+                for raw in self.client.lrange(self.key, start, min(start + self.page_size, count) - 1):
+                    f.write(raw if isinstance(raw, bytes) else raw.encode('utf-8'))
+                    f.write(b'\n')
+        os.replace(tmp, path)
+
+        # Persist the cursor first, so entries folded this run are not skipped as lost after the trim
+        self.state['pending_trim'] = [first, count]
+        self.save()
+        with self.client.pipeline() as pipe:
+            pipe.multi()
+            pipe.ltrim(self.key, count, -1)
+            pipe.incrby(self.trimmed_key, count)
+            pipe.execute()
+        self.settle_trim(first + count)
+        return count
+
+
+def answered_slugs(data_file=DATA_FILE):
+    towns, narrative_cities, _ = parse_compliance_data(data_file)
+    return {t['slug'] for t in towns} | {nc['slug'] for nc in narrative_cities}
+
+
+def town_names(seo_file=SEO_DATA_FILE):
+    return {r['slug']: r['name'] for r in iter_module_records(seo_file, 'townSEOData')}
+
+
+def top(counts, n):
+    return sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:n]
+
+
+def print_summary(state, names, n=15, days=14):
+    print(f"{state['entries']} questions ({state['malformed']} malformed), "
+          f"{state['first'] or '—'} to {state['last'] or '—'}; {state['archived']} archived")
+    print(f"Questions per day (last {days}):")
+    for day in sorted(state['per_day'])[-days:]:
+        print(f"  {day}  {state['per_day'][day]:5d}")
+    print("Most-asked towns:")
+    for slug, count in top(state['towns'], n):
+        print(f"  {names.get(slug, slug):24s} {count:5d}")
+    print("Unanswered towns (no compliance profile) — FOIA priority:")
+    for slug, count in top(state['unanswered'], n):
+        print(f"  {names.get(slug, slug):24s} {count:5d}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Aggregate the chat query log incrementally')
+    parser.add_argument('--url', default=os.environ.get('REDIS_URL') or os.environ.get('KV_URL'),
+                        help='Redis URL (default $REDIS_URL or $KV_URL)')
+    parser.add_argument('--state-dir', default=STATE_DIR, help='cursor, aggregates and archives')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help='entries per LRANGE')
+    parser.add_argument('--keep', type=int, help='archive and trim consumed entries beyond the newest N')
+    parser.add_argument('--top', type=int, default=15, help='towns to list')
+    parser.add_argument('--report', action='store_true', help='print the saved aggregates without reading Redis')
+    parser.add_argument('--out', help='also write the aggregates as JSON')
+    args = parser.parse_args(argv)
+
+    names = town_names()
+    if args.report:
+        analyzer = QueryLogAnalyzer(None, set(), directory=args.state_dir)
+    else:
+        if not args.url:
+            parser.error('--url, REDIS_URL or KV_URL is required (or --report)')
+        analyzer = QueryLogAnalyzer(redis.Redis.from_url(args.url), answered_slugs(),
+                                    directory=args.state_dir, page_size=args.page_size)
+        started = time.perf_counter()
+        read = analyzer.consume()
+        archived = analyzer.archive(args.keep) if args.keep is not None else 0
+        analyzer.save()
+        print(f"Read {read} new entr{'ies' if read != 1 else 'y'}, archived {archived} "
+              f"in {(time.perf_counter() - started) * 1000:.0f} ms (cursor {analyzer.state['cursor']})")
+    print_summary(analyzer.state, names, args.top)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(analyzer.state, f, indent=1, sort_keys=True)
+            f.write('\n')
+        print(f"Wrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Render every report edition in one run.
+
+Editions are defined in report_editions.json: a section list (null for all
+sections) and a town filter, optionally expanded once per value of a field
+("per": "county" gives one edition per county). The data modules are parsed
+once, statistics are recomputed per edition from the shared parse, and
+town profile flowables are built once and reused by every edition that
+includes the town. Editions render in parallel worker processes forked
+after the shared work is done.
+
+Filters match a record when every listed field equals (or is one of) the
+given values. A record without the field is not excluded, so narrative
+cities, which carry no municipality type, appear in the cities edition.
+
+Usage:
+    python3 report_editions.py                      # all editions
+    python3 report_editions.py --only full cities --workers 2
+    python3 report_editions.py --list
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from generate_report import (
+    EXPORT_DIR, OUTPUT_FILE, SECTIONS, build_report, filter_report_data, load_report_data,
+    town_profile_flowables,
+)
+
+EDITIONS_FILE = os.path.join(os.path.dirname(__file__), 'report_editions.json')
+OUTPUT_DIR = os.path.join(EXPORT_DIR, 'reports')
+
+# Parsed data and flowable cache, inherited by forked workers
+_shared = {}
+
+
+def slugify(value):
+    return re.sub(r'[^a-z0-9]+', '-', value.lower()).strip('-')
+
+
+def matches(record, filters):
+    for field, wanted in filters.items():
+        value = record.get(field)
+        if value is None:
+            continue
+        if value not in (wanted if isinstance(wanted, list) else [wanted]):
+            return False
+    return True
+
+
+def expand_editions(config, data):
+    """One concrete edition per entry, with "per" entries expanded over the data."""
+    editions = []
+    for name, spec in config.items():
+        sections = spec.get('sections')
+        unknown = set(sections or ()) - set(SECTIONS)
+        if unknown:
+            raise ValueError(f"edition {name}: unknown sections {', '.join(sorted(unknown))}")
+        base_filter = spec.get('filter', {})
+        per = spec.get('per')
+        if per is None:
+            editions.append({'name': name, 'title': spec.get('title'), 'sections': sections, 'filter': base_filter})
+            continue
+        records = data['towns'] + data['narrative_cities']
+        for value in sorted({r[per] for r in records if r.get(per) and matches(r, base_filter)}):
+            editions.append({
+                'name': f"{name}-{slugify(value)}",
+                'title': spec.get('title', '').format(**{per: value}) or None,
+                'sections': sections,
+                'filter': dict(base_filter, **{per: value}),
+            })
+    return editions
+
+
+def output_path(edition, out_dir):
+    stem = os.path.splitext(os.path.basename(OUTPUT_FILE))[0]
+    suffix = '' if edition['name'] == 'full' else f"-{edition['name']}"
+    return os.path.join(out_dir, f"{stem}{suffix}.pdf")
+
+
+def edition_data(data, edition):
+    filtered = filter_report_data(data, lambda r: matches(r, edition['filter'])) if edition['filter'] else dict(data)
+    if edition['title']:
+        filtered['edition'] = {'name': edition['name'], 'title': edition['title']}
+    return filtered
+
+
+def render_edition(edition, out_dir):
+    started = time.perf_counter()
+    path = output_path(edition, out_dir)
+    build_report(edition_data(_shared['data'], edition), path, edition['sections'])
+    return edition['name'], path, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render all report editions')
+    parser.add_argument('--config', default=EDITIONS_FILE, help='edition definitions (JSON)')
+    parser.add_argument('--out-dir', default=OUTPUT_DIR, help='directory for edition PDFs')
+    parser.add_argument('--only', nargs='+', help='edition names (or prefixes, e.g. county)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='parallel render processes')
+    parser.add_argument('--list', action='store_true', help='list editions and exit')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    data = load_report_data()
+    data['flowable_cache'] = {}
+    with open(args.config, 'r', encoding='utf-8') as f:
+        editions = expand_editions(json.load(f), data)
+    if args.only:
+        editions = [e for e in editions if any(e['name'] == o or e['name'].startswith(o + '-') for o in args.only)]
+    if args.list:
+        for e in editions:
+            print(f"{e['name']:24s} {len(edition_data(data, e)['towns']):3d} towns  "
+                  f"{os.path.relpath(output_path(e, args.out_dir))}")
+        return
+
+    # Shared work before forking: every town profile any edition will use
+    for t in data['towns']:
+        town_profile_flowables(data, t)
+    _shared['data'] = data
+    os.makedirs(args.out_dir, exist_ok=True)
+    prepared = time.perf_counter() - started
+    print(f"Parsed data and built {len(data['towns'])} town profiles in {prepared * 1000:.0f} ms")
+
+    workers = max(1, min(args.workers, len(editions)))
+    if workers == 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        results = [render_edition(e, args.out_dir) for e in editions]
+    else:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as pool:
+            results = list(pool.map(render_edition, editions, [args.out_dir] * len(editions)))
+
+    for name, path, seconds in results:
+        print(f"  {name:24s} {seconds * 1000:6.0f} ms  {os.path.relpath(path)}")
+    print(f"{len(results)} edition{'s' if len(results) != 1 else ''} in "
+          f"{time.perf_counter() - started:.1f} s ({workers} worker{'s' if workers != 1 else ''})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Local asyncio HTTP service for on-demand report downloads.
+
+Routes:
+    GET /report.pdf                     full compliance snapshot
+    GET /report/town/<slug>.pdf         single-town report
+    GET /report/county/<county>.pdf     county report (e.g. /report/county/plymouth.pdf)
+    GET /healthz                        cache and pool status
+
+Rendering runs in a bounded process pool. Finished PDFs sit in an LRU cache
+keyed by (data hash, variant), concurrent requests for the same variant share
+one render, and ETags are derived from the same key so conditional GETs are
+answered with 304 without rendering. A render is cached when it finishes even
+if every request waiting for it has gone away. When the data files change
+they are re-parsed in a thread, so open connections keep being served.
+
+Usage:
+    python3 report_server.py --port 8080 --workers 2
+    curl -o snapshot.pdf http://127.0.0.1:8080/report.pdf
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote, urlsplit
+
+from generate_report import DATA_FILE, build_report, filter_report_data, input_files, load_report_data
+
+STATUS_TEXT = {
+    200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 500: 'Internal Server Error',
+}
+
+
+# ── Rendering (runs in pool workers) ─────────────────────────────────────
+
+_worker_data = {}
+
+
+def variant_data(data, variant):
+    """Filter report data for a variant: ('full', ''), ('town', slug) or ('county', slug)."""
+    kind, key = variant
+    if kind == 'full':
+        return data
+    if kind == 'town':
+        return filter_report_data(data, lambda t: t['slug'] == key)
+    if kind == 'county':
+        return filter_report_data(data, lambda t: county_slug(t['county']) == key)
+    raise ValueError(kind)
+
+
+def county_slug(county):
+    return county.lower().replace(' ', '-')
+
+
+def render_variant(data_file, data_hash, variant):
+    """Render one variant to PDF bytes. Parsed data is reused per worker process."""
+    if data_hash not in _worker_data:
+        _worker_data.clear()
+        _worker_data[data_hash] = load_report_data(data_file)
+    buf = io.BytesIO()
+    build_report(variant_data(_worker_data[data_hash], variant), buf)
+    return buf.getvalue()
+
+
+# ── Service ──────────────────────────────────────────────────────────────
+
+class ReportService:
+    def __init__(self, data_file=DATA_FILE, workers=2, cache_size=64):
+        self.data_file = data_file
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.workers = workers
+        self.cache_size = cache_size
+        self.cache = OrderedDict()      # (data_hash, variant) -> pdf bytes
+        self.inflight = {}              # (data_hash, variant) -> Future
+        self._stamp = None
+        self._data_hash = None
+        self._data = None
+        self._reload = None             # (stamp, Future) while the data files are re-read
+        self.renders = 0
+
+    def read_data(self, paths):
+        """(hash, parsed data); blocking, so it runs off the event loop."""
+        digest = hashlib.sha256()
+        for path in paths:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest(), load_report_data(self.data_file)
+
+    async def current_data(self):
+        """(hash, parsed data) for the data files, re-read only when they change on disk."""
+        paths = input_files(self.data_file)
+        stamp = [(st.st_mtime_ns, st.st_size) for st in map(os.stat, paths)]
+        if stamp == self._stamp:
+            return self._data_hash, self._data
+        if self._reload is None or self._reload[0] != stamp:
+            future = asyncio.get_running_loop().run_in_executor(None, self.read_data, paths)
+            future.add_done_callback(lambda f: self._loaded(stamp, f))
+            self._reload = (stamp, future)
+        return await asyncio.shield(self._reload[1])
+
+    def _loaded(self, stamp, future):
+        if self._reload is not None and self._reload[1] is future:
+            self._reload = None
+        if not future.cancelled() and future.exception() is None:
+            self._data_hash, self._data = future.result()
+            self._stamp = stamp
+
+    def exists(self, data, variant):
+        d = variant_data(data, variant)
+        return bool(d['towns'] or d['narrative_cities'])
+
+    @staticmethod
+    def etag(data_hash, variant):
+        digest = hashlib.sha256(f"{data_hash}:{variant[0]}:{variant[1]}".encode()).hexdigest()
+        return f'W/"{digest[:20]}"'
+
+    async def get_pdf(self, data_hash, variant):
+        key = (data_hash, variant)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        if key in self.inflight:
+            return await asyncio.shield(self.inflight[key])
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.pool, render_variant, self.data_file, data_hash, variant)
+        self.inflight[key] = future
+        # Cache from the future itself, so the render is kept even if every waiter is cancelled
+        future.add_done_callback(lambda f: self._rendered(key, f))
+        return await asyncio.shield(future)
+
+    def _rendered(self, key, future):
+        del self.inflight[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.renders += 1
+        self.cache[key] = future.result()
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def route(self, path):
+        """Map a URL path to a variant, or None."""
+        if path == '/report.pdf':
+            return ('full', '')
+        parts = path.strip('/').split('/')
+        if len(parts) == 3 and parts[0] == 'report' and parts[1] in ('town', 'county') \
+                and parts[2].endswith('.pdf'):
+            return (parts[1], unquote(parts[2][:-len('.pdf')]).lower())
+        return None
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            try:
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+            except ValueError:
+                return await self.respond(writer, 400, b'bad request\n')
+            if method not in ('GET', 'HEAD'):
+                return await self.respond(writer, 405, b'method not allowed\n')
+
+            path = urlsplit(target).path
+            if path == '/healthz':
+                body = json.dumps({
+                    'cached': len(self.cache), 'inflight': len(self.inflight),
+                    'renders': self.renders, 'workers': self.workers,
+                }).encode()
+                return await self.respond(writer, 200, body, {'Content-Type': 'application/json'},
+                                          head=method == 'HEAD')
+
+            variant = self.route(path)
+            if variant is None:
+                return await self.respond(writer, 404, b'not found\n')
+
+            data_hash, data = await self.current_data()
+            if not self.exists(data, variant):
+                return await self.respond(writer, 404, b'no such town or county\n')
+
+            etag = self.etag(data_hash, variant)
+            common = {'ETag': etag, 'Cache-Control': 'public, max-age=300'}
+            if etag in [t.strip() for t in headers.get('if-none-match', '').split(',')]:
+                return await self.respond(writer, 304, b'', common)
+
+            pdf = await self.get_pdf(data_hash, variant)
+            filename = 'adu-compliance-snapshot' + ('' if variant[0] == 'full' else f'-{variant[1]}') + '.pdf'
+            return await self.respond(writer, 200, pdf, dict(
+                common,
+                **{'Content-Type': 'application/pdf',
+                   'Content-Disposition': f'inline; filename="{filename}"'},
+            ), head=method == 'HEAD')
+        except Exception as exc:
+            await self.respond(writer, 500, f'{type(exc).__name__}: {exc}\n'.encode())
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, body, headers=None, head=False):
+        lines = [f'HTTP/1.1 {status} {STATUS_TEXT[status]}']
+        headers = dict(headers or {})
+        headers.setdefault('Content-Type', 'text/plain; charset=utf-8')
+        headers['Content-Length'] = str(len(body))
+        headers['Connection'] = 'close'
+        lines += [f'{k}: {v}' for k, v in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if not head and status != 304:
+            writer.write(body)
+        await writer.drain()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving reports on http://{host}:{port}/report.pdf "
+              f"({self.workers} render worker{'s' if self.workers != 1 else ''})", flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve on-demand ADU compliance report PDFs')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=2, help='max concurrent renders')
+    parser.add_argument('--cache-size', type=int, default=64, help='max cached PDFs')
+    parser.add_argument('--data', default=DATA_FILE, help='path to compliance-data.ts')
+    args = parser.parse_args(argv)
+
+    service = ReportService(args.data, workers=args.workers, cache_size=args.cache_size)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.pool.shutdown(cancel_futures=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Text normalization for report output.
+
+Strings captured from compliance-data.ts are raw TypeScript literal bodies
+(`\\u2019`, `\\'`, `\\n` escapes included). They are decoded once at parse
+time, and a reportlab Paragraph-safe copy is cached on each record under
+`markup`, so render loops interpolate ready-made markup instead of
+re-cleaning and re-escaping text on every build.
+"""
+
+import re
+from functools import lru_cache
+
+_JS_ESCAPE = re.compile(r"\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.)", re.DOTALL)
+_JS_SIMPLE_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0'}
+
+# One table for both typographic cleanup and XML escaping, applied in a
+# single str.translate() pass. Prose fields also get spaced em dashes.
+_MARKUP_CHARS = {
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '\u200b': None,         # zero-width space
+    '\ufeff': None,         # stray BOM
+    '\r': None,
+}
+_MARKUP_TABLE = str.maketrans(_MARKUP_CHARS)
+_PROSE_TABLE = str.maketrans({**_MARKUP_CHARS, '\u2014': ' \u2014 '})
+_NEEDS_MARKUP = re.compile('[&<>\u200b\ufeff\r]')
+_NEEDS_PROSE_MARKUP = re.compile('[&<>\u2014\u200b\ufeff\r]')
+
+
+def _decode_escape(m):
+    esc = m.group(1)
+    if esc[0] == 'u' and len(esc) > 1:
+        return chr(int(esc[2:-1] if esc[1] == '{' else esc[1:], 16))
+    if esc[0] == 'x' and len(esc) == 3:
+        return chr(int(esc[1:], 16))
+    return _JS_SIMPLE_ESCAPES.get(esc, esc)
+
+
+def decode_js_string(raw):
+    """Decode escape sequences in the body of a single-quoted TS string literal."""
+    if '\\' not in raw:
+        return raw
+    return _JS_ESCAPE.sub(_decode_escape, raw)
+
+
+@lru_cache(maxsize=4096)
+def to_markup(text, prose=False):
+    """Paragraph-safe markup for plain text; prose also gets spaced em dashes."""
+    needs, table = (_NEEDS_PROSE_MARKUP, _PROSE_TABLE) if prose else (_NEEDS_MARKUP, _MARKUP_TABLE)
+    if not text or needs.search(text) is None:
+        return text
+    return text.translate(table)
+
+
+def add_markup(record, fields, prose=()):
+    """Cache markup for `fields` on the record and return it; fields in `prose` are body text."""
+    record['markup'] = {field: to_markup(record[field], field in prose) for field in fields}
+    return record
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Watch the report's data modules and rebuild outputs on change.
+
+Keeps the interpreter, reportlab and the parse cache warm between edits:
+only town blocks whose text changed are re-parsed, and each output is
+rebuilt only when the slice of parsed data it depends on has changed.
+Bursts of saves are debounced into a single rebuild.
+
+Usage:
+    python3 report_watch.py                 # build once, then watch
+    python3 report_watch.py --once          # single timed build, no watching
+    python3 report_watch.py --output /tmp/preview.pdf --exports /tmp/data --sitemaps /tmp/sitemaps
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+import traceback
+
+from generate_report import DATA_FILE, EXPORT_DIR, OUTPUT_FILE, build_report, load_report_data
+from permit_velocity import (
+    STORE_DIR, VelocityStore, ingest_permit_logs, velocity_artifact, write_velocity_artifact,
+)
+from sitemap_shards import SITEMAP_DIR, build_sitemaps, sitemap_families, write_sitemaps
+from town_geo import HLC_DATA_FILE, write_peers_artifact
+from town_metrics import SEO_DATA_FILE, metrics_artifact, write_metrics_artifact
+from town_scorecard import PERMITS_GLOB, scorecard_artifact, write_scorecard_artifact
+
+
+def pdf_inputs(data):
+    return (data['towns'], data['narrative_cities'], data['sources'],
+            metrics_artifact(data['seo'], data['seo_metrics']), data['peers'], data['points'].digest,
+            scorecard_inputs(data), velocity_artifact(data['velocity']))
+
+
+def town_metrics_inputs(data):
+    return metrics_artifact(data['seo'], data['seo_metrics'])
+
+
+def build_town_metrics(data, args):
+    write_metrics_artifact(data['seo'], data['seo_metrics'],
+                           os.path.join(args.exports, 'town_metrics.json'))
+
+
+def scorecard_inputs(data):
+    return scorecard_artifact(data['seo'], data['scorecards'])
+
+
+def build_town_scorecards(data, args):
+    write_scorecard_artifact(data['seo'], data['scorecards'],
+                             os.path.join(args.exports, 'town_scorecards.json'))
+
+
+def build_permit_velocity(data, args):
+    write_velocity_artifact(data['velocity'], os.path.join(args.exports, 'permit_velocity.json'))
+
+
+def build_town_peers(data, args):
+    write_peers_artifact(data['peers'], os.path.join(args.exports, 'town_peers.json'))
+
+
+def build_sitemap_shards(data, args):
+    write_sitemaps(build_sitemaps(sitemap_families(data)), args.sitemaps)
+
+
+# name -> (inputs(data) -> JSON-serializable slice, build(data, args))
+OUTPUTS = {
+    'pdf': (pdf_inputs, lambda data, args: build_report(data, args.output)),
+    'town_metrics': (town_metrics_inputs, build_town_metrics),
+    'town_peers': (lambda data: data['peers'], build_town_peers),
+    'town_scorecards': (scorecard_inputs, build_town_scorecards),
+    'permit_velocity': (lambda data: velocity_artifact(data['velocity']), build_permit_velocity),
+    'sitemaps': (sitemap_families, build_sitemap_shards),
+}
+
+
+def fingerprint(value):
+    payload = json.dumps(value, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(payload).hexdigest()
+
+
+def snapshot(paths):
+    """(mtime_ns, size) per watched path; None while a file is missing mid-save."""
+    stamps = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stamps.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stamps.append(None)
+    return stamps
+
+
+class ReportWatcher:
+    def __init__(self, args, outputs=OUTPUTS):
+        self.args = args
+        self.outputs = outputs
+        self.parse_cache = {}
+        self.velocity = VelocityStore(args.velocity_store)
+        self.fingerprints = {}
+
+    def rebuild(self):
+        started = time.perf_counter()
+        cached_before = set(self.parse_cache)
+        if ingest_permit_logs(self.velocity):
+            self.velocity.save()
+        data = load_report_data(self.args.data, cache=self.parse_cache,
+                                 seo_file=self.args.seo_data, geo_file=self.args.geo_data,
+                                 velocity=self.velocity)
+        reparsed = len(set(self.parse_cache) - cached_before)
+        parse_ms = (time.perf_counter() - started) * 1000
+
+        timings = []
+        for name, (inputs, build) in self.outputs.items():
+            fp = fingerprint(inputs(data))
+            if fp == self.fingerprints.get(name):
+                timings.append(f"{name} unchanged")
+                continue
+            t0 = time.perf_counter()
+            build(data, self.args)
+            self.fingerprints[name] = fp
+            timings.append(f"{name} {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+        total_ms = (time.perf_counter() - started) * 1000
+        print(f"[{time.strftime('%H:%M:%S')}] parse {parse_ms:.0f} ms "
+              f"({reparsed} block{'s' if reparsed != 1 else ''} re-parsed) · "
+              f"{' · '.join(timings)} · total {total_ms:.0f} ms", flush=True)
+
+    def safe_rebuild(self):
+        # A half-saved file must not take the daemon down.
+        try:
+            self.rebuild()
+        except Exception:
+            traceback.print_exc()
+
+    def watch(self, paths):
+        last = snapshot(paths)
+        print(f"Watching {', '.join(os.path.relpath(p) for p in paths)} (Ctrl-C to stop)", flush=True)
+        while True:
+            time.sleep(self.args.interval)
+            current = snapshot(paths)
+            if current == last:
+                continue
+            # Debounce: wait until the files stop changing
+            while True:
+                time.sleep(self.args.debounce)
+                settled = snapshot(paths)
+                if settled == current:
+                    break
+                current = settled
+            last = current
+            if None not in current:
+                self.safe_rebuild()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rebuild report outputs when the data modules change')
+    parser.add_argument('--data', default=DATA_FILE, help='path to compliance-data.ts')
+    parser.add_argument('--seo-data', default=SEO_DATA_FILE, help='path to town_seo_data.ts')
+    parser.add_argument('--geo-data', default=HLC_DATA_FILE, help='path to hlc_adu_data.json')
+    parser.add_argument('--velocity-store', default=STORE_DIR, help='permit velocity store directory')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='PDF output path')
+    parser.add_argument('--exports', default=EXPORT_DIR, help='directory for JSON exports')
+    parser.add_argument('--sitemaps', default=SITEMAP_DIR, help='directory for sitemap shards')
+    parser.add_argument('--interval', type=float, default=0.2, help='poll interval in seconds')
+    parser.add_argument('--debounce', type=float, default=0.3, help='quiet period before rebuilding')
+    parser.add_argument('--once', action='store_true', help='build once and exit')
+    args = parser.parse_args(argv)
+
+    watcher = ReportWatcher(args)
+    watcher.safe_rebuild()
+    if args.once:
+        return
+    try:
+        watcher.watch([args.data, args.seo_data, args.geo_data] + sorted(glob.glob(PERMITS_GLOB)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Gzipped sitemap shards for the town, compliance and provision pages.
+
+Writes public/sitemaps/index.xml, a sitemap index that lists
+/sitemap.xml (static pages and blog posts, from src/app/sitemap.ts) and
+one gzipped urlset per page family:
+- towns-N.xml.gz        /towns/<slug> for every town_seo_data.ts municipality
+- compliance-N.xml.gz   /compliance/<slug> for every profile and narrative city
+- provisions-N.xml.gz   /compliance/<slug>/<provisionId>
+
+<lastmod> is the latest of the page's lastReviewed, bylawLastUpdated (a
+month and year such as "June 2025 (AG partial disapproval)" counts as the
+1st of that month) and bylawVersionDate. Town pages without a compliance
+profile have no review date, so they carry no <lastmod> rather than the
+build date. Shards are split at 50,000 URLs. A shard is rewritten only
+when its XML changes (gzip mtime is 0, so unchanged XML is unchanged
+bytes), and the index only when a shard or its lastmod does.
+
+`next build` does not run Python, so public/sitemaps is committed:
+regenerate it (or let report_watch.py do so) with the data, and run
+--check before deploying. /sitemap.xml still lists every town and
+compliance page without dates as a fallback.
+
+Usage:
+    python3 sitemap_shards.py                        # write public/sitemaps
+    python3 sitemap_shards.py --out /tmp/sitemaps
+    python3 sitemap_shards.py --check                # exit 1 if public/sitemaps is stale
+"""
+
+import argparse
+import datetime
+import gzip
+import os
+import re
+import sys
+from xml.sax.saxutils import escape
+
+from generate_report import DATA_FILE, parse_compliance_data
+from town_metrics import SEO_DATA_FILE
+from ts_data import iter_module_records
+
+BASE_URL = 'https://www.adupulse.com'
+SITEMAP_DIR = os.path.join(os.path.dirname(__file__), 'public', 'sitemaps')
+INDEX_FILE = 'index.xml'
+STATIC_SITEMAP = '/sitemap.xml'
+MAX_URLS = 50000
+
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+MONTHS = {m: i for i, m in enumerate(
+    ('january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october',
+     'november', 'december'), 1)}
+month_year_pattern = re.compile(r"\b(" + '|'.join(MONTHS) + r")\s+(\d{4})\b", re.IGNORECASE)
+iso_date_pattern = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+
+
+# ── lastmod ──────────────────────────────────────────────────────────────
+
+def parse_lastmod(value):
+    """ISO date from '2026-02-15' or 'October 2024 (...)'; None for anything vaguer."""
+    if not value:
+        return None
+    m = iso_date_pattern.search(value)
+    if m:
+        return m.group(1)
+    m = month_year_pattern.search(value)
+    if m:
+        return datetime.date(int(m.group(2)), MONTHS[m.group(1).lower()], 1).isoformat()
+    return None
+
+
+def profile_lastmod(profile):
+    dates = [parse_lastmod(profile.get(field))
+             for field in ('last_reviewed', 'bylaw_last_updated', 'bylaw_version_date')]
+    return max((d for d in dates if d), default=None)
+
+
+# ── Shards ───────────────────────────────────────────────────────────────
+
+def page_urls(towns, narrative_cities, town_slugs):
+    """{family: [(path, lastmod or None)]} in a stable order."""
+    lastmods = {nc['slug']: profile_lastmod(nc) for nc in narrative_cities}
+    lastmods.update((t['slug'], profile_lastmod(t)) for t in towns)
+    compliance = sorted({t['slug'] for t in towns} | {nc['slug'] for nc in narrative_cities})
+    return {
+        'towns': [(f"/towns/{slug}", lastmods.get(slug)) for slug in sorted(town_slugs)],
+        'compliance': [(f"/compliance/{slug}", lastmods[slug]) for slug in compliance],
+        'provisions': [(f"/compliance/{t['slug']}/{p['id']}", lastmods[t['slug']])
+                       for t in sorted(towns, key=lambda t: t['slug']) for p in t['provisions']],
+    }
+
+
+def urlset(urls, base_url=BASE_URL):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', f'<urlset xmlns="{XMLNS}">']
+    for path, lastmod in urls:
+        entry = f"<url><loc>{escape(base_url + path)}</loc>"
+        if lastmod:
+            entry += f"<lastmod>{lastmod}</lastmod>"
+        lines.append(entry + '</url>')
+    lines.append('</urlset>')
+    return '\n'.join(lines) + '\n'
+
+
+def sitemap_index(entries, base_url=BASE_URL):
+    """entries: [(path, lastmod or None)]."""
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', f'<sitemapindex xmlns="{XMLNS}">']
+    for path, lastmod in entries:
+        entry = f"<sitemap><loc>{escape(base_url + path)}</loc>"
+        if lastmod:
+            entry += f"<lastmod>{lastmod}</lastmod>"
+        lines.append(entry + '</sitemap>')
+    lines.append('</sitemapindex>')
+    return '\n'.join(lines) + '\n'
+
+
+def build_sitemaps(families, base_url=BASE_URL, max_urls=MAX_URLS):
+    """{file name: bytes} for every shard plus the index (gzipped shards, plain index)."""
+    files = {}
+    index = [(STATIC_SITEMAP, None)]
+    for family, urls in families.items():
+        for n, start in enumerate(range(0, len(urls), max_urls), 1):
+            chunk = urls[start:start + max_urls]
+            name = f"{family}-{n}.xml.gz"
+            files[name] = gzip.compress(urlset(chunk, base_url).encode('utf-8'), compresslevel=9, mtime=0)
+            index.append((f"/sitemaps/{name}", max((d for _, d in chunk if d), default=None)))
+    files[INDEX_FILE] = sitemap_index(index, base_url).encode('utf-8')
+    return files
+
+
+def write_sitemaps(files, out_dir=SITEMAP_DIR):
+    """Write files whose bytes changed and remove stale shards; returns (written, unchanged, removed)."""
+    os.makedirs(out_dir, exist_ok=True)
+    written = unchanged = 0
+    for name, content in sorted(files.items()):
+        path = os.path.join(out_dir, name)
+        try:
+            with open(path, 'rb') as f:
+                if f.read() == content:
+                    unchanged += 1
+                    continue
+        except FileNotFoundError:
+            pass
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(content)
+        os.replace(tmp, path)
+        written += 1
+    removed = 0
+    for name in os.listdir(out_dir):
+        if name.endswith('.xml.gz') and name not in files:
+            os.remove(os.path.join(out_dir, name))
+            removed += 1
+    return written, unchanged, removed
+
+
+def stale_sitemaps(files, out_dir=SITEMAP_DIR):
+    """Names of files that are missing or out of date in out_dir, plus shards that should be gone."""
+    stale = []
+    for name, content in sorted(files.items()):
+        try:
+            with open(os.path.join(out_dir, name), 'rb') as f:
+                if f.read() == content:
+                    continue
+        except FileNotFoundError:
+            pass
+        stale.append(name)
+    if os.path.isdir(out_dir):
+        stale += sorted(n for n in os.listdir(out_dir) if n.endswith('.xml.gz') and n not in files)
+    return stale
+
+
+def sitemap_families(data):
+    """page_urls() for load_report_data() output."""
+    return page_urls(data['towns'], data['narrative_cities'], data['seo'].slug)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write gzipped sitemap shards and a sitemap index')
+    parser.add_argument('--data', default=DATA_FILE, help='path to compliance-data.ts')
+    parser.add_argument('--seo-data', default=SEO_DATA_FILE, help='path to town_seo_data.ts')
+    parser.add_argument('--out', default=SITEMAP_DIR, help='sitemap directory')
+    parser.add_argument('--base-url', default=BASE_URL, help='site origin')
+    parser.add_argument('--check', action='store_true', help='report stale files and exit 1 instead of writing')
+    args = parser.parse_args(argv)
+
+    towns, narrative_cities, _ = parse_compliance_data(args.data)
+    slugs = [r['slug'] for r in iter_module_records(args.seo_data, 'townSEOData')]
+    families = page_urls(towns, narrative_cities, slugs)
+    files = build_sitemaps(families, args.base_url)
+    if args.check:
+        stale = stale_sitemaps(files, args.out)
+        if stale:
+            print(f"Stale in {args.out}: {', '.join(stale)}; run python3 sitemap_shards.py")
+            sys.exit(1)
+        print(f"{args.out} is up to date ({len(files)} files)")
+        return
+    written, unchanged, removed = write_sitemaps(files, args.out)
+    print('Sitemaps: ' + ', '.join(f"{len(urls)} {family}" for family, urls in families.items())
+          + f" ({written} written, {unchanged} unchanged, {removed} removed)")
+    print(f"Wrote {os.path.join(args.out, INDEX_FILE)}")
+
+
+if __name__ == '__main__':
+    main()
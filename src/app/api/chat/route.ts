@@ -1,6 +1,6 @@
 import Anthropic from '@anthropic-ai/sdk'
 import {
-  BASE_SYSTEM_PROMPT,
+  getSystemPrompt,
   getHeadlineContext,
   detectTowns,
   getTownContext,
@@ -22,23 +22,23 @@ export async function POST(req: Request) {
     }
 
     // Detect mentioned towns, log query, and build context
-    const townSlugs = detectTowns(message)
+    const townSlugs = await detectTowns(message)
     logQuery(message, townSlugs).catch(() => {})
     let userContent = message
 
-    if (townSlugs.length > 0) {
+    const context = townSlugs.length > 0 ? await getTownContext(townSlugs) : ''
+    if (context) {
       // Specific town question — attach only that town's data
-      const context = getTownContext(townSlugs)
       userContent = `${message}\n\n---\nRelevant data for this question:\n${context}`
     } else {
       // Broad question — attach headline stats only
-      userContent = `${message}\n\n---\n${getHeadlineContext()}`
+      userContent = `${message}\n\n---\n${await getHeadlineContext()}`
     }
 
     const stream = anthropic.messages.stream({
       model: 'claude-sonnet-4-5-20250929',
       max_tokens: 400,
-      system: BASE_SYSTEM_PROMPT,
+      system: await getSystemPrompt(),
       messages: [{ role: 'user', content: userContent }],
     })
 
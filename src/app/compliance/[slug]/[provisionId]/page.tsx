@@ -4,39 +4,31 @@ import Link from 'next/link'
 import NavBar from '@/components/NavBar'
 import Footer from '@/components/Footer'
 import {
-  allEntries,
   getEvidenceBasis,
   evidenceBasisConfig,
   isTownOpen,
   type EvidenceBasis,
-  type ComplianceProvision,
   type Citation,
-} from '../../compliance-data'
+} from '../../compliance-types'
+import { getProvisionShard, getProvisionShardParams } from '@/lib/shards'
 import ProvisionCTA from './ProvisionCTA'
 import ComplianceGate from '@/components/ComplianceGate'
 import ProvisionViewTracker from '@/components/ProvisionViewTracker'
 
 // ── STATIC PARAMS ───────────────────────────────────────────────────────
 export function generateStaticParams() {
-  const params: { slug: string; provisionId: string }[] = []
-  for (const town of allEntries) {
-    for (const p of town.provisions) {
-      params.push({ slug: town.slug, provisionId: p.id })
-    }
-  }
-  return params
+  return getProvisionShardParams()
 }
 
 // ── METADATA ────────────────────────────────────────────────────────────
-export function generateMetadata({
+export async function generateMetadata({
   params,
 }: {
   params: { slug: string; provisionId: string }
-}): Metadata {
-  const town = allEntries.find((t) => t.slug === params.slug)
-  if (!town) return { title: 'Not Found | ADU Pulse' }
-  const provision = town.provisions.find((p) => p.id === params.provisionId)
-  if (!provision) return { title: 'Not Found | ADU Pulse' }
+}): Promise<Metadata> {
+  const shard = await getProvisionShard(params.slug, params.provisionId)
+  if (!shard) return { title: 'Not Found | ADU Pulse' }
+  const { town, provision } = shard
 
   const title = `${provision.provision} — ADU Rules in ${town.name} | ADU Pulse`
   const description = `What ${town.name}'s ${provision.provision.toLowerCase()} means for your ADU project. How it compares to Massachusetts state law and what builders and homeowners should expect.`
@@ -108,18 +100,14 @@ function CitationLinks({ citations }: { citations: Citation[] }) {
 }
 
 // ── PAGE ─────────────────────────────────────────────────────────────────
-export default function ProvisionPage({
+export default async function ProvisionPage({
   params,
 }: {
   params: { slug: string; provisionId: string }
 }) {
-  const town = allEntries.find((t) => t.slug === params.slug)
-  if (!town) notFound()
-  const provisionIndex = town.provisions.findIndex(
-    (p) => p.id === params.provisionId,
-  )
-  if (provisionIndex === -1) notFound()
-  const provision = town.provisions[provisionIndex]
+  const shard = await getProvisionShard(params.slug, params.provisionId)
+  if (!shard) notFound()
+  const { town, provision, provisionCount, prev, next, related } = shard
   const basis = getEvidenceBasis(provision)
   const cfg = evidenceBasisConfig[basis]
   const isCity = town.municipalityType === 'city'
@@ -177,7 +165,7 @@ export default function ProvisionPage({
             <ComplianceGate
               townName={town.name}
               townSlug={town.slug}
-              provisionCount={town.provisions.length}
+              provisionCount={provisionCount}
               isProvisionPage
             />
             <div className="mt-6 text-sm">
@@ -195,25 +183,8 @@ export default function ProvisionPage({
     )
   }
 
-  // Prev/next within same town
-  const prev =
-    provisionIndex > 0 ? town.provisions[provisionIndex - 1] : null
-  const next =
-    provisionIndex < town.provisions.length - 1
-      ? town.provisions[provisionIndex + 1]
-      : null
-
-  // Related provisions from other towns in the same category (up to 5)
-  const related: { town: string; slug: string; provision: ComplianceProvision }[] = []
-  for (const t of allEntries) {
-    if (t.slug === town.slug) continue
-    for (const p of t.provisions) {
-      if (p.category === provision.category && related.length < 5) {
-        related.push({ town: t.name, slug: t.slug, provision: p })
-      }
-    }
-    if (related.length >= 5) break
-  }
+  // Prev/next within the same town and related provisions from other towns in
+  // the same category (up to 5) come precomputed in the shard
 
   return (
     <div className="min-h-screen bg-gray-900">
@@ -3,125 +3,14 @@
 // Per EOHLC guidance: local zoning that conflicts with the ADU statute is preempted by state law,
 // but towns are not "out of compliance" — state law simply overrides inconsistent provisions.
 
-export type ComplianceStatus = 'inconsistent' | 'review' | 'compliant';
+import {
+  getStatusCounts,
+  type NarrativeCityProfile,
+  type ProvisionCategory,
+  type TownComplianceProfile,
+} from './compliance-types';
 
-// ── EVIDENCE BASIS — derived at runtime from existing provision data ─────
-export type EvidenceBasis = 'ag_disapproved' | 'statutory_conflict' | 'ambiguous' | 'consistent';
-
-export function getEvidenceBasis(provision: ComplianceProvision): EvidenceBasis {
-  if (provision.agDecision) return 'ag_disapproved';
-  if (provision.status === 'inconsistent') return 'statutory_conflict';
-  if (provision.status === 'review') return 'ambiguous';
-  return 'consistent';
-}
-
-export const evidenceBasisConfig: Record<
-  EvidenceBasis,
-  { label: string; color: string; bg: string; border: string; dot: string }
-> = {
-  ag_disapproved: {
-    label: 'AG Disapproved',
-    color: 'text-red-400',
-    bg: 'bg-red-400/10',
-    border: 'border-red-400/30',
-    dot: 'bg-red-400',
-  },
-  statutory_conflict: {
-    label: 'Appears Inconsistent',
-    color: 'text-orange-400',
-    bg: 'bg-orange-400/10',
-    border: 'border-orange-400/30',
-    dot: 'bg-orange-400',
-  },
-  ambiguous: {
-    label: 'Needs Review',
-    color: 'text-amber-400',
-    bg: 'bg-amber-400/10',
-    border: 'border-amber-400/30',
-    dot: 'bg-amber-400',
-  },
-  consistent: {
-    label: 'Consistent',
-    color: 'text-emerald-400',
-    bg: 'bg-emerald-400/10',
-    border: 'border-emerald-400/30',
-    dot: 'bg-emerald-400',
-  },
-};
-
-export type ProvisionCategory =
-  | 'Use & Occupancy'
-  | 'Dimensional & Parking'
-  | 'Building & Safety'
-  | 'Process & Administration';
-
-export interface Citation {
-  label: string;
-  url: string;
-}
-
-export interface ComplianceProvision {
-  id: string;
-  provision: string;
-  category: ProvisionCategory;
-  status: ComplianceStatus;
-  stateLaw: string;
-  localBylaw: string;
-  impact: string;
-  agDecision?: string;
-  citations: Citation[];
-}
-
-export interface TownPermitData {
-  submitted: number;
-  approved: number;
-  denied: number;
-  pending: number;
-  approvalRate: number;
-}
-
-export interface TownComplianceProfile {
-  slug: string;
-  name: string;
-  county: string;
-  population: number;
-  municipalityType?: 'town' | 'city';
-  lastReviewed: string;
-  bylawLastUpdated: string;
-  bylawSource: string;
-  agDisapprovals: number;
-  permits: TownPermitData;
-  bottomLine?: string;
-  provisions: ComplianceProvision[];
-  resistanceTag?: 'legislative-challenge';
-  isExempt?: boolean;
-  isOpen?: boolean;
-  // ── Provenance fields ──
-  agDecisionDate?: string;
-  agDecisionUrl?: string;
-  bylawRetrievedAt?: string;
-  bylawSourceUrl?: string;
-  bylawSourceTitle?: string;
-  bylawVersionDate?: string;
-}
-
-export function isTownOpen(town: TownComplianceProfile): boolean {
-  return town.isOpen === true;
-}
-
-export interface NarrativeCityProfile {
-  slug: string;
-  name: string;
-  county: string;
-  population: number;
-  municipalityType: 'city';
-  lastReviewed: string;
-  permits: TownPermitData;
-  tag: 'administrative-friction' | 'no-ordinance' | 'stalled';
-  title: string;
-  summary: string;
-  body: string;
-}
+export * from './compliance-types';
 
 // ---------------------------------------------------------------------------
 // SOURCE URLS — centralized for consistency and maintainability
@@ -4185,14 +4074,6 @@ export const narrativeCities: NarrativeCityProfile[] = [
 // HELPERS
 // ---------------------------------------------------------------------------
 
-export function getStatusCounts(provisions: ComplianceProvision[]) {
-  return {
-    inconsistent: provisions.filter((p) => p.status === 'inconsistent').length,
-    review: provisions.filter((p) => p.status === 'review').length,
-    compliant: provisions.filter((p) => p.status === 'compliant').length,
-  };
-}
-
 export function getStatewideStats(all: TownComplianceProfile[]) {
   const totalInconsistent = all.reduce(
     (sum, t) => sum + t.provisions.filter((p) => p.status === 'inconsistent').length,
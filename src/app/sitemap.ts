@@ -1,18 +1,18 @@
 import type { MetadataRoute } from 'next'
 import townSEOData from '@/data/town_seo_data'
+import { allEntries, narrativeCities } from '@/app/compliance/compliance-data'
+
+// Town and compliance pages are listed here without dates as a fallback. The
+// gzipped shards under /sitemaps/index.xml (sitemap_shards.py, committed in
+// public/sitemaps) carry the same pages plus provisions, with lastmod dates
+// from compliance-data.ts.
 
 const BASE_URL = 'https://www.adupulse.com'
 
-// Compliance slugs — keep in sync with allEntries + narrativeCities in compliance-data.ts
-const complianceSlugs = [
-  'plymouth', 'nantucket', 'leicester', 'brookline', 'canton', 'hanson',
-  'new-bedford', 'newton', 'andover', 'milton', 'duxbury', 'barnstable',
-  'falmouth', 'sudbury', 'needham', 'boston', 'somerville', 'worcester',
-  'east-bridgewater', 'weston', 'upton', 'wilbraham', 'quincy', 'salem',
-  'revere', 'southborough',
-  // narrative cities
-  'fall-river', 'lowell', 'medford',
-]
+const complianceSlugs = Array.from(new Set([
+  ...allEntries.map(t => t.slug),
+  ...narrativeCities.map(c => c.slug),
+]))
 
 const blogSlugs = [
   'massachusetts-adu-year-one',
@@ -22,11 +22,11 @@ const blogSlugs = [
   'ag-disapprovals-sudbury-leicester-canton',
 ]
 
-export default async function sitemap(): Promise<MetadataRoute.Sitemap> {
+export default function sitemap(): MetadataRoute.Sitemap {
   const pages: MetadataRoute.Sitemap = []
 
   // Homepage
-  pages.push({ url: BASE_URL, lastModified: new Date(), changeFrequency: 'weekly', priority: 1.0 })
+  pages.push({ url: BASE_URL, changeFrequency: 'weekly', priority: 1.0 })
 
   // Static pages
   const staticPaths = [
@@ -34,22 +34,22 @@ export default async function sitemap(): Promise<MetadataRoute.Sitemap> {
     '/map', '/estimate', '/club', '/builders', '/rankings', '/blog', '/compare',
   ]
   for (const path of staticPaths) {
-    pages.push({ url: `${BASE_URL}${path}`, lastModified: new Date(), changeFrequency: 'weekly', priority: 0.8 })
+    pages.push({ url: `${BASE_URL}${path}`, changeFrequency: 'weekly', priority: 0.8 })
   }
 
   // Blog posts
   for (const slug of blogSlugs) {
-    pages.push({ url: `${BASE_URL}/blog/${slug}`, lastModified: new Date(), changeFrequency: 'monthly', priority: 0.7 })
+    pages.push({ url: `${BASE_URL}/blog/${slug}`, changeFrequency: 'monthly', priority: 0.7 })
   }
 
   // Compliance profiles
   for (const slug of complianceSlugs) {
-    pages.push({ url: `${BASE_URL}/compliance/${slug}`, lastModified: new Date(), changeFrequency: 'weekly', priority: 0.8 })
+    pages.push({ url: `${BASE_URL}/compliance/${slug}`, changeFrequency: 'weekly', priority: 0.8 })
   }
 
   // Town pages
   for (const town of townSEOData) {
-    pages.push({ url: `${BASE_URL}/towns/${town.slug}`, lastModified: new Date(), changeFrequency: 'weekly', priority: 0.6 })
+    pages.push({ url: `${BASE_URL}/towns/${town.slug}`, changeFrequency: 'weekly', priority: 0.6 })
   }
 
   return pages
@@ -14,12 +14,11 @@ import {
 } from '@/lib/townAnalytics'
 import { useSubscription } from '@/lib/subscription'
 import {
-  allEntries as complianceTowns,
   getStatusCounts,
   isTownOpen,
   type TownComplianceProfile,
   type ComplianceProvision,
-} from '@/app/compliance/compliance-data'
+} from '@/app/compliance/compliance-types'
 import {
   type Audience,
   AUDIENCE_STORAGE_KEY,
@@ -42,27 +41,6 @@ import {
   ChevronDown,
 } from 'lucide-react'
 
-// Permit data imports
-import andoverPermits from '@/data/andover_permits.json'
-import miltonPermits from '@/data/milton_permits.json'
-import plymouthPermits from '@/data/plymouth_permits.json'
-import duxburyPermits from '@/data/duxbury_permits.json'
-import falmouthPermits from '@/data/falmouth_permits.json'
-import sudburyPermits from '@/data/sudbury_permits.json'
-import newtonPermits from '@/data/newton_permits.json'
-import needhamPermits from '@/data/needham_permits.json'
-
-const permitDataMap: Record<string, PermitRecord[]> = {
-  andover: andoverPermits as unknown as PermitRecord[],
-  milton: miltonPermits as unknown as PermitRecord[],
-  plymouth: plymouthPermits as unknown as PermitRecord[],
-  duxbury: duxburyPermits as unknown as PermitRecord[],
-  falmouth: falmouthPermits as unknown as PermitRecord[],
-  sudbury: sudburyPermits as unknown as PermitRecord[],
-  newton: newtonPermits as unknown as PermitRecord[],
-  needham: needhamPermits as unknown as PermitRecord[],
-}
-
 // ── Grade colors ──────────────────────────────────────────────────────
 const gradeColors: Record<string, { text: string; bg: string; border: string }> = {
   A: { text: 'text-emerald-400', bg: 'bg-emerald-400/15', border: 'border-emerald-400/30' },
@@ -345,12 +323,16 @@ export default function TownSEOPageClient({
   statewidePerCapita,
   townPerCapita,
   buildingPermits,
+  compliance,
+  permits,
 }: {
   town: TownSEOData
   nearbyTowns: TownSEOData[]
   statewidePerCapita: number
   townPerCapita: number
   buildingPermits: BuildingPermitData | null
+  compliance: TownComplianceProfile | null
+  permits: PermitRecord[] | null
 }) {
   const { setSelectedTown } = useTown()
   const { isPro } = useSubscription()
@@ -371,16 +353,10 @@ export default function TownSEOPageClient({
   }
 
   // Analytics
-  const permits = permitDataMap[town.slug] || null
   const costStats = useMemo(() => (permits ? computeCostStats(permits) : null), [permits])
   const scorecard = useMemo(() => computeScorecard(town), [town])
   const gc = gradeColors[scorecard.overall] || gradeColors.C
 
-  // Compliance data lookup
-  const compliance: TownComplianceProfile | null = useMemo(
-    () => complianceTowns.find(t => t.slug === town.slug) || null,
-    [town.slug],
-  )
   const complianceCounts = useMemo(
     () => (compliance ? getStatusCounts(compliance.provisions) : null),
     [compliance],
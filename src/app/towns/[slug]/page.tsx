@@ -1,16 +1,15 @@
 import { Metadata } from 'next'
 import { notFound } from 'next/navigation'
-import townSEOData, { getTownBySlug, getAllTownSlugs } from '@/data/town_seo_data'
-import { approvalsPerTenThousandResidents, computeStatewidePerCapitaAverage } from '@/lib/townAnalytics'
-import { getBuildingPermitsBySlug } from '@/data/building_permits_2024'
+import { approvalsPerTenThousandResidents } from '@/lib/townAnalytics'
+import { getTownShard, getTownShardSlugs } from '@/lib/shards'
 import TownSEOPageClient from './TownSEOPageClient'
 
-export function generateStaticParams() {
-  return getAllTownSlugs().map(slug => ({ slug }))
+export async function generateStaticParams() {
+  return (await getTownShardSlugs()).map(slug => ({ slug }))
 }
 
-export function generateMetadata({ params }: { params: { slug: string } }): Metadata {
-  const town = getTownBySlug(params.slug)
+export async function generateMetadata({ params }: { params: { slug: string } }): Promise<Metadata> {
+  const town = (await getTownShard(params.slug))?.seo
   if (!town) return { title: 'Town Not Found | ADU Pulse' }
 
   const hasApplications = town.submitted > 0
@@ -51,9 +50,10 @@ export function generateMetadata({ params }: { params: { slug: string } }): Meta
   }
 }
 
-export default function TownSEOPage({ params }: { params: { slug: string } }) {
-  const town = getTownBySlug(params.slug)
-  if (!town) notFound()
+export default async function TownSEOPage({ params }: { params: { slug: string } }) {
+  const shard = await getTownShard(params.slug)
+  const town = shard?.seo
+  if (!shard || !town) notFound()
 
   const jsonLd = {
     '@context': 'https://schema.org',
@@ -71,18 +71,21 @@ export default function TownSEOPage({ params }: { params: { slug: string } }) {
     ],
   }
 
-  const nearbyTowns = townSEOData
-    .filter(t => t.slug !== town.slug && t.county === town.county)
-    .slice(0, 4)
-
-  const statewidePerCapita = computeStatewidePerCapitaAverage(townSEOData)
+  // Nearby towns, the statewide average, permits and compliance come precomputed in the shard
   const townPerCapita = approvalsPerTenThousandResidents(town)
-  const buildingPermits = getBuildingPermitsBySlug(town.slug) || null
 
   return (
     <>
       <script type="application/ld+json" dangerouslySetInnerHTML={{ __html: JSON.stringify(jsonLd) }} />
-      <TownSEOPageClient town={town} nearbyTowns={nearbyTowns} statewidePerCapita={statewidePerCapita} townPerCapita={townPerCapita} buildingPermits={buildingPermits} />
+      <TownSEOPageClient
+        town={town}
+        nearbyTowns={shard.nearby}
+        statewidePerCapita={shard.statewidePerCapita}
+        townPerCapita={townPerCapita}
+        buildingPermits={shard.buildingPermits}
+        compliance={shard.compliance}
+        permits={shard.permitLog}
+      />
     </>
   )
 }
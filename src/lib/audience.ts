@@ -1,4 +1,4 @@
-import { getEvidenceBasis, type ComplianceProvision } from '@/app/compliance/compliance-data'
+import { getEvidenceBasis, type ComplianceProvision } from '@/app/compliance/compliance-types'
 
 export type Audience = 'homeowner' | 'builder' | 'lender'
 
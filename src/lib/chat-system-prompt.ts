@@ -1,16 +1,86 @@
-import townSEOData from '@/data/town_seo_data'
-import { buildingPermitMap } from '@/data/building_permits_2024'
-import { allEntries, narrativeCities, getStatusCounts } from '@/app/compliance/compliance-data'
+import { readFile } from 'fs/promises'
+import path from 'path'
+
+// Context comes from the precomputed artifact written by chat_context.py:
+// public/data/chat/index.json (prompt facts, headline stats, alias index) and
+// one budgeted snippet per town in public/data/chat/towns/<slug>.json. Only
+// the snippets for towns a message mentions are read. The files are committed
+// and traced into this function's bundle (next.config.js); if the index still
+// can't be read, the assistant answers from a static prompt without town data.
+
+const CHAT_DIR = path.join(process.cwd(), 'public', 'data', 'chat')
+const MAX_TOWNS = 3
+
+interface ChatContextIndex {
+  version: string
+  prompt: { complianceSlugs: string[]; respondedTowns: number; profiledTowns: number }
+  headline: string
+  aliases: Record<string, string> // lowercase name or alias → slug
+  towns: Record<string, { name: string; tokens: number }>
+}
+
+interface TownSnippet {
+  slug: string
+  name: string
+  version: string
+  text: string
+}
+
+let indexPromise: Promise<ChatContextIndex | null> | null = null
+let aliasPattern: RegExp | null = null
+const snippetCache = new Map<string, TownSnippet>()
+
+// Resolves to null (and is retried on the next request) when the index is missing or unreadable
+function loadIndex(): Promise<ChatContextIndex | null> {
+  if (!indexPromise) {
+    indexPromise = readFile(path.join(CHAT_DIR, 'index.json'), 'utf8')
+      .then((raw): ChatContextIndex => JSON.parse(raw))
+      .catch((err) => {
+        console.error(`Chat context unavailable, using the static prompt: ${err instanceof Error ? err.message : err}`)
+        indexPromise = null
+        return null
+      })
+  }
+  return indexPromise
+}
+
+async function loadSnippet(slug: string, version: string): Promise<TownSnippet | null> {
+  const cached = snippetCache.get(slug)
+  if (cached && cached.version === version) return cached
+  try {
+    const snippet: TownSnippet = JSON.parse(await readFile(path.join(CHAT_DIR, 'towns', `${slug}.json`), 'utf8'))
+    snippetCache.set(slug, snippet)
+    return snippet
+  } catch {
+    return null
+  }
+}
 
 // ── Base system prompt (short, no data) ──
 
-export const BASE_SYSTEM_PROMPT = `You are ADU Pulse's assistant. You give short, conversational answers — 3-4 sentences max, then link to the relevant page. Never list more than 2-3 towns in a response. For broad questions, give the headline stat and link to /compliance. For specific town questions, give the key facts and link to /towns/[townname]. No markdown, no headers, no bold, no lists. Plain text with paragraph breaks only.
+function complianceLinks(prompt: ChatContextIndex['prompt'] | null): string {
+  if (!prompt) {
+    return 'IMPORTANT — link to /compliance for bylaw analysis and to /towns/[town] for a specific town. Never send a user to /compliance/[town].'
+  }
+  return `IMPORTANT — only these towns have compliance profile pages at /compliance/[town]: ${prompt.complianceSlugs.join(', ')}. For these towns, you may link to /compliance/[town] for bylaw analysis. For ALL other towns, link to /towns/[town] only. Never send a user to /compliance/[town] for a town not in this list.`
+}
+
+function aboutCoverage(prompt: ChatContextIndex['prompt'] | null): string {
+  if (!prompt) {
+    return 'ADU Pulse tracks ADU policy and permit data across Massachusetts towns, with a Policy Tracker that analyzes town bylaws provision-by-provision against state law.'
+  }
+  return `ADU Pulse tracks ADU policy and permit data across ${prompt.respondedTowns} Massachusetts towns, with a Policy Tracker that analyzes ${prompt.profiledTowns} towns' bylaws provision-by-provision against state law.`
+}
+
+export async function getSystemPrompt(): Promise<string> {
+  const prompt = (await loadIndex())?.prompt ?? null
+  return `You are ADU Pulse's assistant. You give short, conversational answers — 3-4 sentences max, then link to the relevant page. Never list more than 2-3 towns in a response. For broad questions, give the headline stat and link to /compliance. For specific town questions, give the key facts and link to /towns/[townname]. No markdown, no headers, no bold, no lists. Plain text with paragraph breaks only.
 
 Key law context: Chapter 150 of the Acts of 2024 legalized ADUs statewide effective Feb 2, 2025. MGL c.40A §3 grants the right to build a first ADU by right on any single-family lot. 760 CMR 71.00 has the implementing regulations. Local provisions inconsistent with state law are preempted by G.L. c. 40A §3.
 
 When you link to a page, ONLY use relative paths starting with a slash. NEVER output a full URL like https://adupulse.com/anything. NEVER write a placeholder like {slug} or [townname]. Just the relative path.
 
-IMPORTANT — only these towns have compliance profile pages at /compliance/[town]: plymouth, nantucket, leicester, brookline, canton, hanson, new-bedford, newton, andover, milton, duxbury, barnstable, falmouth, sudbury, needham, boston, somerville, worcester, east-bridgewater, weston, upton, wilbraham, quincy, salem, revere, fall-river, lowell, medford, southborough. For these towns, you may link to /compliance/[town] for bylaw analysis. For ALL other towns, link to /towns/[town] only. Never send a user to /compliance/[town] for a town not in this list.
+${complianceLinks(prompt)}
 
 Whenever you cite a specific number or data point, briefly mention where it comes from — EOHLC survey, Census ACS, Census Building Permit Survey, AG decision, etc. Keep it natural and inline, like: According to EOHLC survey data, Duxbury has approved 2 of 3 applications. Or: Census data shows Duxbury has a population of about 16,000. Don't add a sources section at the end — just weave attribution into the sentence.
 
@@ -31,175 +101,41 @@ NUMERIC ACCURACY RULES:
 - Never state specific numeric requirements (setback distances, lot sizes, square footage limits, parking counts, fees, etc.) unless the exact number appears in the compliance data for the town being asked about. If you don't have the specific number, say so and direct the user to check the town's bylaw or building department. Do not estimate, approximate, or infer numeric values. Getting a number wrong is worse than saying you don't know it.
 - Never cite specific setback distances (e.g., '5 feet', '10 feet') unless they come directly from a town's bylaw or the compliance data. The state law (760 CMR 71.03(3)(b)(2)) requires towns to apply the most permissive dimensional standard between the principal dwelling, single-family residential dwelling, or accessory structure — it does not establish specific statewide setback numbers. Always cite 760 CMR 71.03, not 71.05.
 
-About ADU Pulse: ADU Pulse tracks ADU policy and permit data across 293 Massachusetts towns, with a Policy Tracker that analyzes 28 towns' bylaws provision-by-provision against state law. It's built for homeowners, builders, and policy analysts navigating the new ADU landscape after Chapter 150. For plan details and pricing, link to /pricing.`
+About ADU Pulse: ${aboutCoverage(prompt)} It's built for homeowners, builders, and policy analysts navigating the new ADU landscape after Chapter 150. For plan details and pricing, link to /pricing.`
+}
 
 // ── Headline stats for broad questions ──
 
-const stats = (() => {
-  const allProvisions = allEntries.flatMap(t => t.provisions)
-  const inconsistent = allProvisions.filter(p => p.status === 'inconsistent').length
-  const review = allProvisions.filter(p => p.status === 'review').length
-  const townsWithIssues = allEntries.filter(t => t.provisions.some(p => p.status === 'inconsistent')).length
-  const totalTracked = allEntries.length + narrativeCities.length
-
-  // Top issue categories
-  const issueCounts: Record<string, number> = {}
-  for (const p of allProvisions.filter(p => p.status === 'inconsistent')) {
-    const name = p.provision
-    issueCounts[name] = (issueCounts[name] || 0) + 1
-  }
-  const topIssues = Object.entries(issueCounts)
-    .sort((a, b) => b[1] - a[1])
-    .slice(0, 3)
-    .map(([name, count]) => `${name} (${count} towns)`)
-
-  const totalApproved = townSEOData.filter(t => t.responded).reduce((s, t) => s + t.approved, 0)
-  const totalSubmitted = townSEOData.filter(t => t.responded).reduce((s, t) => s + t.submitted, 0)
-  const respondedCount = townSEOData.filter(t => t.responded).length
-
-  // Housing production stats (Census Building Permit Survey 2024)
-  const respondedWithPermits = townSEOData.filter(t => t.responded && t.submitted > 0)
-  const top10ByApproved = [...respondedWithPermits]
-    .sort((a, b) => b.approved - a.approved)
-    .slice(0, 10)
-    .map(t => {
-      const bp = buildingPermitMap.get(t.slug)
-      const totalBP = bp?.totalUnits || 0
-      const aduShare = totalBP >= 10
-        ? Math.round((t.approved / totalBP) * 1000) / 10
-        : null
-      return `${t.name}: ${t.approved} approved of ${t.submitted} submitted${aduShare !== null ? `, ADUs = ${aduShare}% of total building permits` : ''}`
-    })
-
-  // Statewide housing production totals (towns with 10+ building permits)
-  const sufficientRows = respondedWithPermits.filter(t => {
-    const bp = buildingPermitMap.get(t.slug)
-    return bp && bp.totalUnits >= 10
-  })
-  const totalBuildingPermits = sufficientRows.reduce((s, t) => {
-    const bp = buildingPermitMap.get(t.slug)
-    return s + (bp?.totalUnits || 0)
-  }, 0)
-  const totalAduApprovedForShare = sufficientRows.reduce((s, t) => s + t.approved, 0)
-  const overallAduShare = totalBuildingPermits > 0
-    ? Math.round((totalAduApprovedForShare / totalBuildingPermits) * 1000) / 10
-    : 0
-
-  // AG decisions — extract from compliance data
-  const agDecisions: string[] = []
-  for (const town of allEntries) {
-    if (town.agDisapprovals === 0) continue
-    const struckProvisions = town.provisions
-      .filter(p => p.agDecision)
-      .map(p => {
-        // Extract date from agDecision text
-        const dateMatch = p.agDecision!.match(/((?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}|\w+\s+\d{4})/)
-        const date = dateMatch ? dateMatch[1] : ''
-        return { provision: p.provision, date, summary: p.agDecision! }
-      })
-    if (struckProvisions.length > 0) {
-      const provisions = struckProvisions.map(p => p.provision).join('; ')
-      const date = struckProvisions[0].date
-      agDecisions.push(`${town.name} (/compliance/${town.slug}) — ${date}: ${struckProvisions.length} provision${struckProvisions.length > 1 ? 's' : ''} struck down (${provisions})`)
-    }
-  }
-
-  return {
-    inconsistentProvisions: inconsistent,
-    reviewProvisions: review,
-    townsWithInconsistencies: townsWithIssues,
-    communitiesTracked: totalTracked,
-    topIssueTypes: topIssues,
-    respondedTowns: respondedCount,
-    totalApproved,
-    totalSubmitted,
-    top10ByApproved,
-    totalBuildingPermits,
-    totalAduApprovedForShare,
-    overallAduShare,
-    townsWithBothDatasets: sufficientRows.length,
-    agDecisions,
-  }
-})()
-
-export function getHeadlineContext(): string {
-  return `Headline stats for your reference (use these for broad questions):
-${stats.respondedTowns} towns responded to the EOHLC survey. ${stats.totalApproved} ADU permits approved statewide out of ${stats.totalSubmitted} submitted. We've analyzed bylaws for ${stats.communitiesTracked} communities in detail. ${stats.inconsistentProvisions} provisions are inconsistent with state law across ${stats.townsWithInconsistencies} towns. ${stats.reviewProvisions} more are in a grey area. The most common inconsistencies are: ${stats.topIssueTypes.join(', ')}.
-
-Housing production data (Census Building Permit Survey 2024): Across ${stats.townsWithBothDatasets} towns with both ADU and building permit data, ADU approvals account for ${stats.overallAduShare}% of all ${stats.totalBuildingPermits.toLocaleString()} building permits issued. Top 10 towns by ADU approvals: ${stats.top10ByApproved.join('; ')}. For more detail, link users to /housing-production.
-
-Attorney General decisions on ADU bylaws (${stats.agDecisions.length} towns with provisions struck down as inconsistent with state law):
-${stats.agDecisions.join('\n')}
-When discussing AG decisions, always link to /compliance/[town] for the full analysis.`
+export async function getHeadlineContext(): Promise<string> {
+  const index = await loadIndex()
+  return index ? index.headline : 'Statewide figures are unavailable right now; point the user to /compliance and /housing-production.'
 }
 
 // ── Town data lookup ──
 
-const townNameMap = new Map<string, string>() // lowercase name → slug
-for (const t of townSEOData) {
-  townNameMap.set(t.name.toLowerCase(), t.slug)
+function escapeRegex(value: string): string {
+  return value.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')
 }
 
-export function detectTowns(message: string): string[] {
-  const lower = message.toLowerCase()
+export async function detectTowns(message: string): Promise<string[]> {
+  const index = await loadIndex()
+  if (!index) return []
+  if (!aliasPattern) {
+    // Longest aliases first so "east boston" wins over "boston"
+    const aliases = Object.keys(index.aliases).sort((a, b) => b.length - a.length)
+    aliasPattern = new RegExp(`\\b(?:${aliases.map(escapeRegex).join('|')})\\b`, 'g')
+  }
   const found: string[] = []
-  townNameMap.forEach((slug, name) => {
-    const regex = new RegExp(`\\b${name.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')}\\b`)
-    if (regex.test(lower)) {
-      found.push(slug)
-    }
-  })
+  for (const match of message.toLowerCase().matchAll(aliasPattern)) {
+    const slug = index.aliases[match[0]]
+    if (slug && !found.includes(slug)) found.push(slug)
+  }
   return found
 }
 
-export function getTownContext(slugs: string[]): string {
-  const parts: string[] = []
-
-  for (const slug of slugs.slice(0, 3)) { // max 3 towns
-    // Permit data
-    const seo = townSEOData.find(t => t.slug === slug)
-    if (seo) {
-      let permitLine = `Permit data for ${seo.name}: ${seo.submitted} submitted, ${seo.approved} approved, ${seo.denied} denied, ${seo.approvalRate}% approval rate. Population ${seo.population.toLocaleString()}, ${seo.county} County. By-right: ${seo.byRight ? 'yes' : 'no'}.`
-      // Add building permit context if available
-      const bp = buildingPermitMap.get(slug)
-      if (bp && bp.totalUnits > 0) {
-        const aduShare = bp.totalUnits >= 10
-          ? ` ADUs represent ${Math.round((seo.approved / bp.totalUnits) * 1000) / 10}% of total housing production.`
-          : ''
-        permitLine += ` Census Building Permit Survey 2024: ${bp.totalUnits} total building permits (${bp.singleFamilyUnits} single-family, ${bp.multifamilyUnits} multifamily).${aduShare}`
-      }
-      parts.push(permitLine)
-    }
-
-    // Compliance data
-    const compliance = allEntries.find(t => t.slug === slug)
-    if (compliance) {
-      const counts = getStatusCounts(compliance.provisions)
-      let summary = `Bylaw analysis for ${compliance.name}: ${counts.inconsistent} inconsistent with state law, ${counts.review} under review, ${counts.compliant} consistent with state law.`
-      if (compliance.bottomLine) summary += ` ${compliance.bottomLine}`
-      if (counts.inconsistent > 0) {
-        const issues = compliance.provisions
-          .filter(p => p.status === 'inconsistent')
-          .map(p => p.provision)
-          .join(', ')
-        summary += ` Provisions inconsistent with state law: ${issues}.`
-      }
-      if (compliance.agDisapprovals > 0) {
-        const agProvisions = compliance.provisions
-          .filter(p => p.agDecision)
-          .map(p => `${p.provision}: ${p.agDecision}`)
-          .join(' ')
-        summary += ` AG decisions: ${agProvisions}`
-      }
-      parts.push(summary)
-    }
-
-    // Narrative data
-    const narrative = narrativeCities.find(c => c.slug === slug)
-    if (narrative) {
-      parts.push(`${narrative.name}: ${narrative.summary} (${narrative.permits.approved} approved, ${narrative.permits.approvalRate}% rate)`)
-    }
-  }
-
-  return parts.join('\n')
+export async function getTownContext(slugs: string[]): Promise<string> {
+  const index = await loadIndex()
+  if (!index) return ''
+  const snippets = await Promise.all(slugs.slice(0, MAX_TOWNS).map((slug) => loadSnippet(slug, index.version)))
+  return snippets.filter((s): s is TownSnippet => s !== null).map((s) => s.text).join('\n')
 }
@@ -6,3 +6,16 @@ export function getRedis(): Redis | null {
   if (!url || !token) return null
   return new Redis({ url, token })
 }
+
+// Precomputed aggregates published by stats_publisher.py. `current` holds
+// the live version; every key of a version is `${STATS_PREFIX}:<version>:<name>`
+// (tiers, statewide, leaderboard, report, town:<slug>).
+const STATS_PREFIX = 'adupulse:stats'
+
+export async function getPublishedStat<T>(name: string): Promise<T | null> {
+  const redis = getRedis()
+  if (!redis) return null
+  const version = await redis.get<string>(`${STATS_PREFIX}:current`)
+  if (!version) return null
+  return redis.get<T>(`${STATS_PREFIX}:${version}:${name}`)
+}
@@ -0,0 +1,102 @@
+import { readFile } from 'fs/promises'
+import path from 'path'
+import type { TownSEOData } from '@/data/town_seo_data'
+import type { BuildingPermitData } from '@/data/building_permits_2024'
+import type { PermitRecord } from '@/lib/townAnalytics'
+import type {
+  ComplianceProvision,
+  NarrativeCityProfile,
+  TownComplianceProfile,
+} from '@/app/compliance/compliance-types'
+
+// Per-town and per-provision shards written by town_shards.py:
+// public/data/shards/towns/<slug>.json and provisions/<slug>/<id>.json, listed
+// in manifest.json. Pages read only their own shard instead of importing
+// town_seo_data.ts or compliance-data.ts whole. The files are committed and
+// traced into the page functions (next.config.js) for on-demand renders.
+
+const SHARD_DIR = path.join(process.cwd(), 'public', 'data', 'shards')
+
+interface ShardManifest {
+  version: string
+  shards: Record<string, { sha256: string; bytes: number; gz: number; br?: number }>
+}
+
+export interface TownShard {
+  slug: string
+  seo: TownSEOData | null
+  nearby: TownSEOData[]
+  statewidePerCapita: number
+  buildingPermits: BuildingPermitData | null
+  permitLog: PermitRecord[] | null
+  compliance: TownComplianceProfile | null
+  narrative: NarrativeCityProfile | null
+}
+
+export interface ProvisionLink {
+  id: string
+  provision: string
+}
+
+export interface RelatedProvision {
+  town: string
+  slug: string
+  provision: ProvisionLink & Pick<ComplianceProvision, 'status' | 'agDecision'>
+}
+
+export interface ProvisionShard {
+  town: Omit<TownComplianceProfile, 'provisions'>
+  provision: ComplianceProvision
+  provisionCount: number
+  prev: ProvisionLink | null
+  next: ProvisionLink | null
+  related: RelatedProvision[]
+}
+
+let manifestPromise: Promise<ShardManifest> | null = null
+
+// Retried on the next call if the manifest can't be read
+function loadManifest(): Promise<ShardManifest> {
+  if (!manifestPromise) {
+    manifestPromise = readFile(path.join(SHARD_DIR, 'manifest.json'), 'utf8')
+      .then((raw): ShardManifest => JSON.parse(raw))
+      .catch((err) => {
+        manifestPromise = null
+        throw err
+      })
+  }
+  return manifestPromise
+}
+
+// Only paths listed in the manifest are read, so a slug can't reach outside the shard tree
+async function readShard<T>(rel: string): Promise<T | null> {
+  const manifest = await loadManifest()
+  if (!Object.hasOwn(manifest.shards, rel)) return null
+  return JSON.parse(await readFile(path.join(SHARD_DIR, rel), 'utf8'))
+}
+
+async function shardPaths(prefix: string): Promise<string[][]> {
+  const manifest = await loadManifest()
+  return Object.keys(manifest.shards)
+    .filter((rel) => rel.startsWith(prefix))
+    .map((rel) => rel.slice(prefix.length, -'.json'.length).split('/'))
+}
+
+export function getTownShard(slug: string): Promise<TownShard | null> {
+  return readShard<TownShard>(`towns/${slug}.json`)
+}
+
+export function getProvisionShard(slug: string, provisionId: string): Promise<ProvisionShard | null> {
+  return readShard<ProvisionShard>(`provisions/${slug}/${provisionId}.json`)
+}
+
+// Slugs with a town_seo_data.ts record, as getAllTownSlugs() lists them
+export async function getTownShardSlugs(): Promise<string[]> {
+  const slugs = (await shardPaths('towns/')).map(([slug]) => slug)
+  const shards = await Promise.all(slugs.map(getTownShard))
+  return slugs.filter((_, i) => shards[i]?.seo)
+}
+
+export async function getProvisionShardParams(): Promise<{ slug: string; provisionId: string }[]> {
+  return (await shardPaths('provisions/')).map(([slug, provisionId]) => ({ slug, provisionId }))
+}
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Publish the report pipeline's precomputed aggregates to Redis.
+
+Writes tier totals, statewide averages, the scorecard leaderboard, report
+metadata and one key per town (SEO metrics, scorecard and compliance tier
+counts) under versioned keys:
+
+    adupulse:stats:current                 -> version, e.g. v1a2b3c4d5e6f
+    adupulse:stats:<version>:tiers         -> JSON
+    adupulse:stats:<version>:town:<slug>   -> JSON
+    adupulse:stats:<version>:manifest      -> JSON list of key names
+
+The version is a content hash, so republishing unchanged data is a no-op.
+Keys are written with non-transactional pipelines in batches, then a
+WATCH/MULTI transaction points `current` at the new version. Readers see
+either the old or the new set, never a mix. Versions older than the
+previous one expire an hour after they are replaced, so in-flight reads of
+them still succeed. A publisher that loses the swap to a concurrent one
+raises WatchError and lets the keys it wrote expire the same way.
+getPublishedStat() in src/lib/redis.ts reads them.
+
+Tests (tests/test_stats_publisher.py) run against fakeredis, or a real
+server with REDIS_TEST_URL=redis://localhost:6379/15 (that db is flushed).
+
+Requires redis-py (pip install redis). Any Redis-protocol server works,
+including Upstash over rediss://.
+
+Local run against a throwaway Redis:
+    docker run -d --rm -p 6379:6379 redis:7
+    python3 stats_publisher.py --url redis://localhost:6379/0
+
+Usage:
+    python3 stats_publisher.py --url $REDIS_URL
+    python3 stats_publisher.py --url $REDIS_URL --force      # rewrite even if current
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import redis
+
+from generate_report import (
+    OUTPUT_FILE, REPORT_TITLE, build_digest, file_digest, input_files, load_report_data, tier_counts,
+    town_tier,
+)
+from town_metrics import metrics_artifact
+from town_scorecard import scorecard_artifact
+
+STATS_PREFIX = 'adupulse:stats'
+BATCH_SIZE = 500
+KEEP_VERSIONS = 2           # current and previous stay readable indefinitely
+RETIRE_SECONDS = 3600       # older versions expire this long after replacement
+
+
+# ── Payloads ─────────────────────────────────────────────────────────────
+
+def stats_payloads(data):
+    """{key name: JSON-serializable value} for everything the site reads."""
+    stats = data['stats']
+    metrics = metrics_artifact(data['seo'], data['seo_metrics'])
+    scorecards = scorecard_artifact(data['seo'], data['scorecards'])
+    profiles = {t['slug']: t for t in data['towns']}
+
+    tiers = {
+        'municipalities': len(data['towns']),
+        'narrative_cities': len(data['narrative_cities']),
+        'provisions': stats['total_provisions'],
+        'ag_disapproved': stats['total_ag_disapproved'],
+        'inconsistent': stats['total_statutory_conflict'],
+        'review': stats['total_review'],
+        'consistent': stats['total_consistent'],
+        'towns_with_inconsistencies': len(stats['towns_with_inconsistencies']),
+        'towns_with_ag_decisions': len(stats['towns_with_ag_decisions']),
+        'town_tiers': {},
+    }
+    for t in data['towns']:
+        tier = town_tier(t)
+        tiers['town_tiers'][tier] = tiers['town_tiers'].get(tier, 0) + 1
+
+    grades = {}
+    for town in scorecards['towns'].values():
+        if town['rank']:
+            grades[town['grade']] = grades.get(town['grade'], 0) + 1
+
+    payloads = {
+        'tiers': tiers,
+        'statewide': dict(metrics['statewide'], ranked=scorecards['ranked'], grades=grades),
+        'leaderboard': [
+            {'slug': slug, 'name': scorecards['towns'][slug]['name'],
+             'grade': scorecards['towns'][slug]['grade'],
+             'overallScore': scorecards['towns'][slug]['overallScore'],
+             'rank': scorecards['towns'][slug]['rank']}
+            for slug in scorecards['leaderboard'][:scorecards['ranked']]
+        ],
+        'report': {
+            'title': REPORT_TITLE,
+            'inputs': build_digest(input_files()),
+            'pdf_sha256': file_digest(OUTPUT_FILE),
+        },
+    }
+    for slug, town_metrics in metrics['towns'].items():
+        t = profiles.get(slug)
+        payloads[f"town:{slug}"] = {
+            'metrics': town_metrics,
+            'scorecard': scorecards['towns'][slug],
+            'compliance': None if t is None else dict(tier_counts(t), tier=town_tier(t)),
+        }
+    return payloads
+
+
+def encode(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=_json_default)
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def payload_version(encoded):
+    digest = hashlib.sha256()
+    for name in sorted(encoded):
+        digest.update(f"{name}\n".encode())
+        digest.update(encoded[name].encode())
+        digest.update(b'\n')
+    # 'v' prefix: a bare hex string can parse as a JSON number on the client
+    return 'v' + digest.hexdigest()[:12]
+
+
+# ── Publisher ────────────────────────────────────────────────────────────
+
+class StatsPublisher:
+    def __init__(self, client, prefix=STATS_PREFIX, batch_size=BATCH_SIZE):
+        self.client = client
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.current_key = f"{prefix}:current"
+        self.versions_key = f"{prefix}:versions"     # newest first
+
+    def key(self, version, name):
+        return f"{self.prefix}:{version}:{name}"
+
+    def current(self):
+        value = self.client.get(self.current_key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    def write_version(self, version, encoded):
+        """Pipelined SETs of every key (and the manifest) for a version, batch_size per round trip."""
+        items = sorted(encoded.items())
+        items.append(('manifest', encode([name for name, _ in items])))
+        round_trips = 0
+        for start in range(0, len(items), self.batch_size):
+            pipe = self.client.pipeline(transaction=False)
+            for name, value in items[start:start + self.batch_size]:
+                pipe.set(self.key(version, name), value)
+            pipe.execute()
+            round_trips += 1
+        return len(items), round_trips
+
+    def swap(self, version):
+        """Point `current` at version atomically; returns the version it replaced.
+
+        Raises redis.WatchError if another publisher swapped in between.
+        """
+        with self.client.pipeline() as pipe:
+            pipe.watch(self.current_key)
+            previous = pipe.get(self.current_key)
+            pipe.multi()
+            pipe.set(self.current_key, version)
+            pipe.lrem(self.versions_key, 0, version)
+            pipe.lpush(self.versions_key, version)
+            pipe.execute()
+        return previous.decode() if isinstance(previous, bytes) else previous
+
+    def versions(self, start=0, stop=-1):
+        """Published versions, newest first."""
+        return [v.decode() if isinstance(v, bytes) else v
+                for v in self.client.lrange(self.versions_key, start, stop)]
+
+    def expire_version(self, version):
+        names = json.loads(self.client.get(self.key(version, 'manifest')) or '[]')
+        pipe = self.client.pipeline(transaction=False)
+        for name in names + ['manifest']:
+            pipe.expire(self.key(version, name), RETIRE_SECONDS)
+        pipe.execute()
+
+    def retire(self):
+        """Expire every version beyond the newest KEEP_VERSIONS; returns how many were retired."""
+        old = self.versions(KEEP_VERSIONS)
+        for version in old:
+            self.expire_version(version)
+        self.client.ltrim(self.versions_key, 0, KEEP_VERSIONS - 1)
+        return len(old)
+
+    def publish(self, payloads, force=False):
+        encoded = {name: encode(value) for name, value in payloads.items()}
+        version = payload_version(encoded)
+        result = {'version': version, 'keys': 0, 'round_trips': 0, 'previous': None,
+                  'retired': 0, 'skipped': False}
+        if not force and self.current() == version:
+            result['skipped'] = True
+            return result
+        started = time.perf_counter()
+        result['keys'], result['round_trips'] = self.write_version(version, encoded)
+        result['write_ms'] = (time.perf_counter() - started) * 1000
+        try:
+            result['previous'] = self.swap(version)
+        except redis.WatchError:
+            # Lost the race: nothing points at the keys just written unless they are a kept version
+            if version not in self.versions(0, KEEP_VERSIONS - 1):
+                self.expire_version(version)
+            raise
+        result['retired'] = self.retire()
+        return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Publish precomputed stats to versioned Redis keys')
+    parser.add_argument('--url', default=os.environ.get('REDIS_URL') or os.environ.get('KV_URL'),
+                        help='Redis URL (default $REDIS_URL or $KV_URL)')
+    parser.add_argument('--prefix', default=STATS_PREFIX, help='key prefix')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='SETs per pipeline round trip')
+    parser.add_argument('--force', action='store_true', help='rewrite even if this version is current')
+    args = parser.parse_args(argv)
+    if not args.url:
+        parser.error('--url, REDIS_URL or KV_URL is required')
+
+    payloads = stats_payloads(load_report_data())
+    publisher = StatsPublisher(redis.Redis.from_url(args.url), args.prefix, args.batch_size)
+    result = publisher.publish(payloads, force=args.force)
+    if result['skipped']:
+        print(f"{result['version']} is already current ({len(payloads)} keys)")
+        return
+    print(f"Published {result['version']}: {result['keys']} keys in {result['round_trips']} "
+          f"round trip{'s' if result['round_trips'] != 1 else ''} ({result['write_ms']:.0f} ms), "
+          f"replacing {result['previous'] or 'nothing'}; {result['retired']} old version"
+          f"{'s' if result['retired'] != 1 else ''} set to expire")
+
+
+if __name__ == '__main__':
+    main()
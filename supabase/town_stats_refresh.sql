@@ -0,0 +1,95 @@
+-- Batched town stats refresh
+-- Replaces the per-row trigger_update_town_stats (which rescans a town's
+-- permits on every insert/update/delete) with dirty-town tracking: writes
+-- only record which towns changed, and refresh_dirty_town_stats() recomputes
+-- the aggregates for those towns in one set-based pass.
+-- Run after schema.sql.
+
+-- Towns whose permits changed since the last refresh
+CREATE TABLE IF NOT EXISTS town_stats_dirty (
+  town_id UUID PRIMARY KEY REFERENCES towns(id) ON DELETE CASCADE,
+  touched_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+DROP TRIGGER IF EXISTS trigger_update_town_stats ON permits;
+
+-- Statement-level: one insert into town_stats_dirty per statement, however
+-- many rows it touched
+CREATE OR REPLACE FUNCTION mark_towns_dirty()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO town_stats_dirty (town_id)
+    SELECT DISTINCT town_id FROM new_rows WHERE town_id IS NOT NULL
+    ON CONFLICT (town_id) DO UPDATE SET touched_at = NOW();
+  END IF;
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    INSERT INTO town_stats_dirty (town_id)
+    SELECT DISTINCT o.town_id FROM old_rows o
+    WHERE o.town_id IS NOT NULL AND EXISTS (SELECT 1 FROM towns t WHERE t.id = o.town_id)
+    ON CONFLICT (town_id) DO UPDATE SET touched_at = NOW();
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_mark_towns_dirty_insert ON permits;
+CREATE TRIGGER trigger_mark_towns_dirty_insert
+AFTER INSERT ON permits
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION mark_towns_dirty();
+
+DROP TRIGGER IF EXISTS trigger_mark_towns_dirty_update ON permits;
+CREATE TRIGGER trigger_mark_towns_dirty_update
+AFTER UPDATE ON permits
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION mark_towns_dirty();
+
+DROP TRIGGER IF EXISTS trigger_mark_towns_dirty_delete ON permits;
+CREATE TRIGGER trigger_mark_towns_dirty_delete
+AFTER DELETE ON permits
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION mark_towns_dirty();
+
+-- Claim every dirty town and recompute update_town_stats() aggregates for
+-- all of them at once. Returns the number of towns refreshed. Towns marked
+-- dirty while this runs wait for the next refresh.
+CREATE OR REPLACE FUNCTION refresh_dirty_town_stats()
+RETURNS INTEGER AS $$
+DECLARE
+  refreshed INTEGER;
+BEGIN
+  WITH claimed AS (
+    DELETE FROM town_stats_dirty RETURNING town_id
+  ), agg AS (
+    SELECT c.town_id,
+           COUNT(p.id) AS applications,
+           COUNT(p.id) FILTER (WHERE p.status = 'approved') AS approved,
+           COUNT(p.id) FILTER (WHERE p.status = 'denied') AS denied,
+           AVG(p.days_to_decision) AS avg_days
+    FROM claimed c
+    LEFT JOIN permits p ON p.town_id = c.town_id
+    GROUP BY c.town_id
+  )
+  UPDATE towns t SET
+    total_applications = agg.applications,
+    total_approved = agg.approved,
+    total_denied = agg.denied,
+    avg_days_to_approve = agg.avg_days,
+    updated_at = NOW()
+  FROM agg
+  WHERE t.id = agg.town_id;
+  GET DIAGNOSTICS refreshed = ROW_COUNT;
+  RETURN refreshed;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Towns with pending changes are not readable by the public API
+ALTER TABLE town_stats_dirty ENABLE ROW LEVEL SECURITY;
+
+-- Optional: refresh every five minutes with pg_cron (enable the extension
+-- in Supabase first), or run town_stats_refresh.py from a scheduler.
+-- SELECT cron.schedule('refresh-town-stats', '*/5 * * * *', 'SELECT refresh_dirty_town_stats()');
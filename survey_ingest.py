@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Incremental ingestion of the EOHLC ADU survey into `state_survey_data`.
+
+Survey rows (hlc_adu_data.json, the JSON export of the semi-annual
+spreadsheet) are keyed by (muni_id, survey period) and compared with the
+snapshot of the last ingest in .report-cache/survey_ingest/<period>.json.
+Only new and changed rows are sent to Postgres, in batches through
+permit_loader.BulkLoader's COPY + upsert; rows that disappeared from the
+survey are deleted only with --prune. Rows are compared on town name and
+counts; --source-url is stored on the rows sent but never marks a row as
+changed. The snapshot is updated after each committed batch, so an
+interrupted run resumes where it stopped. A re-run of an unchanged survey
+touches nothing.
+
+The change summary lists each town whose applications, approvals or
+denials moved. It is printed and, with --summary, written as JSON for
+downstream cache invalidation.
+
+Tests: tests/test_survey_ingest.py (the apply tests need PG_TEST_DSN, as in
+permit_loader.py).
+
+Applying changes requires psycopg 3 and psycopg_pool (see permit_loader.py);
+--dry-run does not import them.
+
+Usage:
+    python3 survey_ingest.py --period H2_2025 --dry-run              # diff only
+    python3 survey_ingest.py --dsn $DATABASE_URL --period H2_2025
+    python3 survey_ingest.py --dsn $DATABASE_URL --period H2_2025 --summary /tmp/survey_changes.json
+"""
+
+import argparse
+import json
+import os
+import time
+
+from permit_linkage import parse_int
+from town_geo import HLC_DATA_FILE
+from town_match import resolve_slug
+from town_metrics import town_names_from_seo
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), '.report-cache', 'survey_ingest')
+BATCH_SIZE = 100
+COUNT_FIELDS = ('applications', 'approved', 'denied')
+ROW_FIELDS = ('name',) + COUNT_FIELDS       # compared between ingests
+
+
+# ── Snapshots and diffs ──────────────────────────────────────────────────
+
+def survey_snapshot(records, town_names):
+    """{muni_id: row} with canonical town names, as stored between ingests."""
+    snapshot = {}
+    for r in records:
+        snapshot[str(r['muni_id'])] = {
+            'name': town_names.get(resolve_slug(r['name']), r['name']),
+            'applications': parse_int(r.get('applications')) or 0,
+            'approved': parse_int(r.get('approved')) or 0,
+            'denied': parse_int(r.get('rejected')) or 0,
+        }
+    return snapshot
+
+
+def diff_snapshots(old, new):
+    """{'added': [id], 'changed': [id], 'removed': [id], 'unchanged': n}, ids in muni_id order."""
+    def order(ids):
+        return sorted(ids, key=lambda muni_id: (len(muni_id), muni_id))
+
+    def fields(row):
+        # Snapshots written before source_url was dropped from the rows still carry it
+        return [row.get(field) for field in ROW_FIELDS]
+
+    common = old.keys() & new.keys()
+    changed = [m for m in common if fields(old[m]) != fields(new[m])]
+    return {
+        'added': order(new.keys() - old.keys()),
+        'changed': order(changed),
+        'removed': order(old.keys() - new.keys()),
+        'unchanged': len(common) - len(changed),
+    }
+
+
+def change_summary(old, new, diff):
+    """Per-town count changes: [{'muni_id', 'name', 'change', <field>: [before, after]}]."""
+    summary = []
+    for kind in ('added', 'changed', 'removed'):
+        for muni_id in diff[kind]:
+            before, after = old.get(muni_id), new.get(muni_id)
+            entry = {'muni_id': int(muni_id), 'name': (after or before)['name'], 'change': kind}
+            for field in COUNT_FIELDS:
+                values = [before[field] if before else None, after[field] if after else None]
+                if values[0] != values[1]:
+                    entry[field] = values
+            summary.append(entry)
+    return summary
+
+
+class SurveySnapshot:
+    """The last ingested rows of one survey period."""
+
+    def __init__(self, period, directory=SNAPSHOT_DIR):
+        self.period = period
+        self.path = os.path.join(directory, f"{period}.json")
+        self.rows = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.rows = json.load(f)['rows']
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'period': self.period, 'rows': self.rows}, f, indent=1, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp, self.path)
+
+
+# ── Apply ────────────────────────────────────────────────────────────────
+
+def apply_diff(loader, snapshot, new, diff, batch_size=BATCH_SIZE, prune=False, source_url=None):
+    """Upsert added/changed rows (and delete removed ones with prune) a batch per transaction.
+
+    source_url is stored on the upserted rows only; it never makes a row count as changed.
+    """
+    upserts = diff['added'] + diff['changed']
+    result = {'inserted': 0, 'updated': 0, 'deleted': 0, 'batches': 0}
+    for start in range(0, len(upserts), batch_size):
+        batch = upserts[start:start + batch_size]
+        rows = [(new[m]['name'], snapshot.period, new[m]['applications'], new[m]['approved'],
+                 new[m]['denied'], source_url) for m in batch]
+        loaded = loader.load_survey(rows)
+        result['inserted'] += loaded['inserted']
+        result['updated'] += loaded['updated']
+        result['batches'] += 1
+        snapshot.rows.update((m, new[m]) for m in batch)
+        snapshot.save()
+    if prune and diff['removed']:
+        names = [snapshot.rows[m]['name'] for m in diff['removed']]
+        result['deleted'] = loader.delete_survey(names, snapshot.period)
+        result['batches'] += 1
+        for m in diff['removed']:
+            del snapshot.rows[m]
+        snapshot.save()
+    return result
+
+
+def print_summary(summary, limit=40):
+    for entry in summary[:limit]:
+        moves = ', '.join(f"{field} {_fmt(entry[field][0])} → {_fmt(entry[field][1])}"
+                          for field in COUNT_FIELDS if field in entry)
+        print(f"  {entry['change']:8s} {entry['name']:24s} {moves or 'name only'}")
+    if len(summary) > limit:
+        print(f"  … {len(summary) - limit} more")
+
+
+def _fmt(value):
+    return '—' if value is None else str(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Apply only changed EOHLC survey rows to state_survey_data')
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'), help='Postgres DSN (default $DATABASE_URL)')
+    parser.add_argument('--period', required=True, help="state_survey_data.survey_period, e.g. 'H2_2025'")
+    parser.add_argument('--data', default=HLC_DATA_FILE, help='survey JSON (hlc_adu_data.json)')
+    parser.add_argument('--source-url', help='source_url stored on added and changed rows')
+    parser.add_argument('--snapshot-dir', default=SNAPSHOT_DIR, help='last-ingested snapshots')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='rows per upsert transaction')
+    parser.add_argument('--prune', action='store_true', help='delete rows that left the survey')
+    parser.add_argument('--dry-run', action='store_true', help='print the diff without touching Postgres')
+    parser.add_argument('--summary', help='write the change summary as JSON')
+    args = parser.parse_args(argv)
+    if not args.dsn and not args.dry_run:
+        parser.error('--dsn or DATABASE_URL is required (or --dry-run)')
+
+    with open(args.data, 'r', encoding='utf-8') as f:
+        new = survey_snapshot(json.load(f), town_names_from_seo())
+    snapshot = SurveySnapshot(args.period, args.snapshot_dir)
+    old = dict(snapshot.rows)
+    diff = diff_snapshots(old, new)
+    summary = change_summary(old, new, diff)
+    print(f"survey {args.period}: {len(diff['added'])} added, {len(diff['changed'])} changed, "
+          f"{len(diff['removed'])} removed, {diff['unchanged']} unchanged")
+    print_summary(summary)
+
+    if not args.dry_run and (diff['added'] or diff['changed'] or (args.prune and diff['removed'])):
+        from permit_loader import BulkLoader
+
+        loader = BulkLoader(args.dsn, pool_size=1)
+        try:
+            started = time.perf_counter()
+            result = apply_diff(loader, snapshot, new, diff, args.batch_size, args.prune, args.source_url)
+        finally:
+            loader.close()
+        print(f"{result['inserted']} inserted, {result['updated']} updated, {result['deleted']} deleted "
+              f"in {result['batches']} batch{'es' if result['batches'] != 1 else ''} "
+              f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+
+    if args.summary:
+        os.makedirs(os.path.dirname(os.path.abspath(args.summary)), exist_ok=True)
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump({'period': args.period, 'dry_run': args.dry_run, 'changes': summary}, f,
+                      indent=1, sort_keys=True)
+            f.write('\n')
+        print(f"Wrote {args.summary}")
+
+
+if __name__ == '__main__':
+    main()
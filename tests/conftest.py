@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def redis_client():
+    """A clean Redis: the server at $REDIS_TEST_URL (flushed!) if set, else fakeredis."""
+    redis = pytest.importorskip('redis')
+    url = os.environ.get('REDIS_TEST_URL')
+    if url:
+        client = redis.Redis.from_url(url)
+    else:
+        fakeredis = pytest.importorskip('fakeredis')
+        client = fakeredis.FakeRedis()
+    client.flushdb()
+    yield client
+    client.flushdb()
+
+
+@pytest.fixture
+def pg_dsn():
+    """A clean Postgres at $PG_TEST_DSN (its public schema is dropped!); skipped when unset."""
+    dsn = os.environ.get('PG_TEST_DSN')
+    if not dsn:
+        pytest.skip('PG_TEST_DSN is not set')
+    psycopg = pytest.importorskip('psycopg')
+
+    def reset():
+        with psycopg.connect(dsn, autocommit=True) as conn:
+            conn.execute('DROP SCHEMA IF EXISTS public CASCADE')
+            conn.execute('CREATE SCHEMA public')
+
+    reset()
+    yield dsn
+    reset()
@@ -0,0 +1,102 @@
+import pytest
+
+pytest.importorskip('psycopg_pool')
+
+import psycopg  # noqa: E402
+
+from permit_linkage import deduplicate, permit_from_row  # noqa: E402
+from permit_loader import SCHEMA_FILES, BulkLoader  # noqa: E402
+
+TOWN_NAMES = {'newton': 'Newton', 'duxbury': 'Duxbury'}
+ROWS = [
+    {'town': 'newton', 'permit_number': 'B-25-001', 'address': '25 Freeman St', 'status': 'issued',
+     'applied_date': '2025-02-01', 'approved_date': '2025-03-03', 'adu_type': 'detached', 'sqft': '850'},
+    {'town': 'newton', 'permit_number': 'B-25-002', 'address': '9 Elm St', 'status': 'denied',
+     'applied_date': '2025-02-10', 'approved_date': '2025-02-20'},
+    {'town': 'newton', 'permit_number': '', 'address': '12 Oak Street', 'status': 'pending',
+     'applied_date': '2025-04-01'},
+    {'town': 'duxbury', 'permit_number': 'ADU-7', 'address': '61 Gate House Road', 'status': '',
+     'applied_date': '2025-01-05', 'approved_date': '2025-01-30', 'adu_type': 'attached'},
+]
+TRIGGER_ENABLED = """
+SELECT tgenabled FROM pg_trigger
+WHERE tgrelid = 'permits'::regclass AND tgname = 'trigger_update_town_stats'
+"""
+TOWN_STATS = """
+SELECT name, total_applications, total_approved, total_denied, avg_days_to_approve
+FROM towns t WHERE EXISTS (SELECT 1 FROM permits p WHERE p.town_id = t.id) ORDER BY name
+"""
+
+
+def canonical(rows=ROWS):
+    permits, _ = deduplicate([permit_from_row(dict(r, source='foia')) for r in rows])
+    return permits
+
+
+@pytest.fixture(params=['row_trigger', 'dirty_tracking'])
+def loader(pg_dsn, request):
+    """schema.sql alone (per-row trigger), or with town_stats_refresh.sql applied on top."""
+    loader = BulkLoader(pg_dsn, pool_size=1)
+    loader.init_schema(SCHEMA_FILES[:1] if request.param == 'row_trigger' else SCHEMA_FILES)
+    loader.mode = request.param
+    yield loader
+    loader.close()
+
+
+def stats_from_trigger(conn):
+    """Town aggregates as update_town_stats() computes them, row by row; rolled back after reading."""
+    with conn.transaction(force_rollback=True):
+        conn.execute("DROP TRIGGER IF EXISTS trigger_update_town_stats ON permits")
+        conn.execute("CREATE TRIGGER trigger_update_town_stats AFTER INSERT OR UPDATE OR DELETE ON permits "
+                     "FOR EACH ROW EXECUTE FUNCTION update_town_stats()")
+        conn.execute("UPDATE towns SET total_applications = -1, total_approved = -1, total_denied = -1, "
+                     "avg_days_to_approve = NULL")
+        conn.execute("UPDATE permits SET notes = notes")
+        return conn.execute(TOWN_STATS).fetchall()
+
+
+def test_loading_twice_is_idempotent(loader, pg_dsn):
+    first = loader.load_permits(canonical(), TOWN_NAMES)
+    assert (first['staged'], first['inserted'], first['updated'], first['towns']) == (4, 4, 0, 2)
+    second = loader.load_permits(canonical(), TOWN_NAMES)
+    assert (second['inserted'], second['updated'], second['towns']) == (0, 4, 2)
+
+    with psycopg.connect(pg_dsn) as conn:
+        assert conn.execute("SELECT count(*) FROM permits").fetchone()[0] == 4
+        # Newton is seeded by schema.sql; Duxbury is created by the first load only
+        assert conn.execute("SELECT count(*) FROM towns WHERE name IN ('Newton', 'Duxbury')").fetchone()[0] == 2
+        status = dict(conn.execute("SELECT permit_number, status FROM permits WHERE permit_number IS NOT NULL"))
+    assert status == {'B-25-001': 'approved', 'B-25-002': 'denied', 'ADU-7': 'approved'}
+
+
+def test_town_stats_match_update_town_stats(loader, pg_dsn):
+    loader.load_permits(canonical(), TOWN_NAMES)
+    # A later load that changes one permit and adds another
+    changed = [dict(ROWS[2], status='issued', approved_date='2025-04-21'),
+               {'town': 'duxbury', 'permit_number': 'ADU-8', 'address': '3 High St', 'status': 'withdrawn',
+                'applied_date': '2025-05-01'}]
+    loader.load_permits(canonical(changed), TOWN_NAMES)
+
+    with psycopg.connect(pg_dsn) as conn:
+        stats = conn.execute(TOWN_STATS).fetchall()
+        assert stats == stats_from_trigger(conn)
+        assert stats == [('Duxbury', 2, 1, 0, 25), ('Newton', 3, 2, 1, 20)]
+        if loader.mode == 'dirty_tracking':
+            assert conn.execute("SELECT count(*) FROM town_stats_dirty").fetchone()[0] == 0
+
+
+def test_row_trigger_is_enabled_again_after_commit_and_rollback(loader, pg_dsn):
+    if loader.mode != 'row_trigger':
+        pytest.skip('town_stats_refresh.sql drops the row trigger')
+    loader.load_permits(canonical(), TOWN_NAMES)
+    with psycopg.connect(pg_dsn, autocommit=True) as conn:
+        assert conn.execute(TRIGGER_ENABLED).fetchone()[0] == 'O'
+        # Fails at the upsert, after the trigger was disabled
+        conn.execute("ALTER TABLE permits ADD CONSTRAINT test_reject CHECK (permit_number <> 'REJECT')")
+
+    bad = [dict(ROWS[0], permit_number='REJECT')]
+    with pytest.raises(psycopg.errors.CheckViolation):
+        loader.load_permits(canonical(bad), TOWN_NAMES)
+    with psycopg.connect(pg_dsn) as conn:
+        assert conn.execute(TRIGGER_ENABLED).fetchone()[0] == 'O'
+        assert conn.execute("SELECT count(*) FROM permits").fetchone()[0] == 4
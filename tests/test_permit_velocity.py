@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from permit_velocity import VelocityStore, events_from_permit_log, events_from_rows, permit_key
+
+PERMITS = [
+    {'permit': 'ADU-0001', 'address': '25 Freeman St', 'applied': '1/15/25', 'issued': '3/2/25'},
+    {'permit': 'ADU-0002', 'address': '61 Gate House Road', 'applied': '2/3/25', 'issued': ''},
+    {'permit': 'ADU-0003', 'address': '9 Elm St', 'applied': '2/20/25', 'issued': '2/28/25'},
+]
+
+
+def row(applied='2025-02-10', approved='', address='12 Oak Street', number=''):
+    return {'town': 'newton', 'permit_number': number, 'address': address,
+            'applied_date': applied, 'approved_date': approved}
+
+
+def test_reingesting_the_same_batch_changes_nothing(tmp_path):
+    store = VelocityStore(str(tmp_path))
+    assert store.append(events_from_permit_log('newton', PERMITS)) == 5
+    store.save()
+    counts = json.loads(json.dumps(store.counts))
+
+    reopened = VelocityStore(str(tmp_path))
+    assert reopened.append(events_from_permit_log('newton', PERMITS)) == 0
+    assert reopened.counts == counts == {
+        'newton': {'applied': {'2025-01': 1, '2025-02': 2}, 'issued': {'2025-02': 1, '2025-03': 1}},
+    }
+    assert not reopened.dirty
+
+
+@pytest.mark.parametrize('number', ['', 'B-25-017'])
+def test_pending_permit_keeps_its_key_once_issued(tmp_path, number):
+    store = VelocityStore(str(tmp_path))
+    assert store.append(events_from_rows([row(number=number)])) == 1
+    assert store.append(events_from_rows([row(approved='2025-04-01', number=number)])) == 1
+    assert store.counts['newton'] == {'applied': {'2025-02': 1}, 'issued': {'2025-04': 1}}
+    assert permit_key(number, '12 Oak St.', '2/10/25') == permit_key(number, '12 OAK STREET', '2025-02-10')
+
+
+def test_corrected_date_moves_the_count(tmp_path):
+    store = VelocityStore(str(tmp_path))
+    store.append(events_from_permit_log('newton', PERMITS))
+    store.save()
+    corrected = [dict(PERMITS[2], issued='4/1/25')]
+
+    reopened = VelocityStore(str(tmp_path))
+    assert reopened.append(events_from_permit_log('newton', corrected)) == 1
+    assert reopened.counts['newton']['issued'] == {'2025-03': 1, '2025-04': 1}
+    assert reopened.as_of == '2025-04'
+    reopened.save()
+
+    # The log alone replays to the same counts
+    (tmp_path / 'state.json').unlink()
+    assert VelocityStore(str(tmp_path)).counts == reopened.counts
+
+
+def test_correction_out_of_the_latest_month_pulls_as_of_back(tmp_path):
+    store = VelocityStore(None)
+    store.append(events_from_permit_log('newton', PERMITS))
+    assert store.series('newton')['months'][-1] == '2025-03'
+    store.append(events_from_permit_log('newton', [dict(PERMITS[0], issued='2/14/25')]))
+    assert store.as_of == '2025-02'
+    assert store.series('newton')['months'] == ['2025-01', '2025-02']
+
+
+def test_old_keys_with_issue_dates_are_merged_on_replay(tmp_path):
+    # Logged before number-less keys dropped the issue date: the same permit twice
+    events = [['newton', '@12 OAK ST|2025-02-10|', 'applied', '2025-02'],
+              ['newton', '@12 OAK ST|2025-02-10|2025-04-01', 'applied', '2025-02'],
+              ['newton', '@12 OAK ST|2025-02-10|2025-04-01', 'issued', '2025-04']]
+    (tmp_path / 'events.jsonl').write_text(''.join(json.dumps(e) + '\n' for e in events))
+    store = VelocityStore(str(tmp_path))
+    assert store.counts['newton'] == {'applied': {'2025-02': 1}, 'issued': {'2025-04': 1}}
+
+
+def test_rolling_velocity(tmp_path):
+    permits = [{'permit': f"P{i}", 'address': '', 'applied': f"{month}/1/24", 'issued': f"{month}/20/24"}
+               for i, month in enumerate([1, 1, 2, 4, 4, 4, 12])]
+    store = VelocityStore(None)
+    store.append(events_from_permit_log('newton', permits))
+    s = store.series('newton')
+    assert s['months'] == [f"2024-{m:02d}" for m in range(1, 13)]
+    assert s['issued'] == [2, 1, 0, 3, 0, 0, 0, 0, 0, 0, 0, 1]
+    assert s['issued_3m'] == [0.67, 1.0, 1.0, 1.33, 1.0, 1.0, 0, 0, 0, 0, 0, 0.33]
+    assert s['issued_12m'] == [0.17, 0.25, 0.25, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.58]
+
+    # Extending through a later as_of only pads the tail
+    store.append(events_from_permit_log('newton', [{'permit': 'P9', 'address': '', 'applied': '2/1/25', 'issued': ''}]))
+    s = store.series('newton')
+    assert s['months'][-1] == '2025-02' and s['issued'][-2:] == [0, 0]
+    assert s['issued_3m'][-2:] == [0.33, 0.33]
+    assert s['issued_12m'][-2:] == [0.42, 0.33]
+    fresh = VelocityStore(None)
+    fresh.counts, fresh.as_of = store.counts, store.as_of
+    assert fresh.series('newton') == s
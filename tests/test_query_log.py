@@ -0,0 +1,134 @@
+import gzip
+import json
+import os
+
+import pytest
+
+pytest.importorskip('redis')
+
+from query_log import QueryLogAnalyzer  # noqa: E402
+
+KEY = 'test:query_log'
+ANSWERED = {'newton'}
+
+
+def entry(i, towns=('newton',)):
+    return json.dumps({'timestamp': f"2026-03-{1 + i % 28:02d}T12:00:00Z", 'question': f"q{i}",
+                       'towns': list(towns)})
+
+
+def push(client, start, stop, towns=('newton',)):
+    for i in range(start, stop):
+        client.rpush(KEY, entry(i, towns))
+
+
+def analyzer(client, directory, page_size=3):
+    return QueryLogAnalyzer(client, ANSWERED, key=KEY, directory=str(directory), page_size=page_size)
+
+
+def archived_lines(directory):
+    lines = []
+    archive = os.path.join(directory, 'archive')
+    for name in sorted(os.listdir(archive)):
+        with gzip.open(os.path.join(archive, name), 'rt') as f:
+            lines += [json.loads(line)['question'] for line in f]
+    return lines
+
+
+def test_consume_reads_only_new_entries_in_pages(redis_client, tmp_path):
+    push(redis_client, 0, 7)
+    redis_client.rpush(KEY, 'not json')
+    push(redis_client, 7, 8, towns=('lowell', 'newton', 'lowell'))
+    a = analyzer(redis_client, tmp_path)
+    assert a.consume() == 9
+    assert a.state['cursor'] == 9 and a.state['entries'] == 8 and a.state['malformed'] == 1
+    assert a.state['towns'] == {'newton': 8, 'lowell': 1}
+    assert a.state['unanswered'] == {'lowell': 1}
+    a.save()
+
+    push(redis_client, 8, 10)
+    b = analyzer(redis_client, tmp_path)
+    assert b.consume() == 2
+    assert b.state['entries'] == 10 and b.consume() == 0
+
+
+def test_archive_trims_consumed_entries_and_keeps_cursor_aligned(redis_client, tmp_path):
+    push(redis_client, 0, 10)
+    a = analyzer(redis_client, tmp_path)
+    a.consume()
+    assert a.archive(keep=4) == 6
+    a.save()
+    assert redis_client.llen(KEY) == 4 and a.trimmed() == 6
+    assert archived_lines(tmp_path) == [f"q{i}" for i in range(6)]
+    assert a.state['archived'] == 6 and a.state['pending_trim'] is None
+
+    push(redis_client, 10, 12)
+    b = analyzer(redis_client, tmp_path)
+    assert b.consume() == 2
+    assert b.state['cursor'] == 12 and b.state['entries'] == 12
+
+
+def test_archive_never_trims_unread_entries(redis_client, tmp_path):
+    push(redis_client, 0, 5)
+    a = analyzer(redis_client, tmp_path)
+    a.consume()
+    push(redis_client, 5, 10)
+    assert a.archive(keep=0) == 5
+    assert a.consume() == 5 and a.state['entries'] == 10
+
+
+def test_run_dying_after_the_trim_resumes_without_loss(redis_client, tmp_path):
+    push(redis_client, 0, 10)
+    a = analyzer(redis_client, tmp_path)
+    a.consume()
+    a.archive(keep=2)           # dies here: the final save() never happens
+
+    b = analyzer(redis_client, tmp_path)
+    assert b.consume() == 0
+    assert b.state['entries'] == 10 and b.state['cursor'] == 10
+    assert b.state['archived'] == 8 and b.state['pending_trim'] is None
+
+
+def test_run_dying_before_the_trim_rewrites_the_same_archive(redis_client, tmp_path, monkeypatch):
+    push(redis_client, 0, 10)
+    a = analyzer(redis_client, tmp_path)
+    a.consume()
+    pipeline = redis_client.pipeline
+
+    def failing_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+
+        def execute(*args, **kwargs):
+            raise ConnectionError('lost connection')
+
+        pipe.execute = execute
+        return pipe
+
+    monkeypatch.setattr(redis_client, 'pipeline', failing_pipeline)
+    with pytest.raises(ConnectionError):
+        a.archive(keep=2)
+    monkeypatch.undo()
+    assert redis_client.llen(KEY) == 10
+
+    b = analyzer(redis_client, tmp_path)
+    assert b.consume() == 0 and b.state['entries'] == 10
+    assert b.state['archived'] == 0
+    assert b.archive(keep=2) == 8
+    assert archived_lines(tmp_path) == [f"q{i}" for i in range(8)]
+    assert b.state['archived'] == 8 and redis_client.llen(KEY) == 2
+
+
+def test_consume_skips_entries_trimmed_by_someone_else(redis_client, tmp_path):
+    push(redis_client, 0, 10)
+    a = analyzer(redis_client, tmp_path)
+    assert a.consume() == 10
+    push(redis_client, 10, 15)
+    # Another process trims 12 entries, two of them not yet read
+    with redis_client.pipeline() as pipe:
+        pipe.multi()
+        pipe.ltrim(KEY, 12, -1)
+        pipe.incrby(f"{KEY}:trimmed", 12)
+        pipe.execute()
+    assert a.consume() == 3
+    assert a.state['cursor'] == 15 and a.state['entries'] == 13
+    assert [json.loads(raw)['question'] for raw in redis_client.lrange(KEY, 0, -1)] == ['q12', 'q13', 'q14']
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import report_server
+from report_server import ReportService
+
+
+@pytest.fixture
+def service():
+    service = ReportService(workers=2, cache_size=2)
+    service.pool.shutdown()
+    service.pool = ThreadPoolExecutor(max_workers=2)
+    yield service
+    service.pool.shutdown()
+
+
+@pytest.fixture
+def fake_render(monkeypatch):
+    """Replace the reportlab render with a gated fake that records its calls."""
+    calls = []
+    gate = threading.Event()
+    started = threading.Event()
+
+    def render(data_file, data_hash, variant):
+        calls.append(variant)
+        started.set()
+        gate.wait(5)
+        return f"%PDF {variant[0]} {variant[1]}".encode()
+
+    monkeypatch.setattr(report_server, 'render_variant', render)
+    return calls, gate, started
+
+
+async def request(port, path, headers=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    lines = [f"GET {path} HTTP/1.1", 'Host: localhost'] + [f"{k}: {v}" for k, v in (headers or {}).items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    status_line, *header_lines = head.decode('latin-1').split('\r\n')
+    return int(status_line.split()[1]), dict(h.split(': ', 1) for h in header_lines), body
+
+
+def test_concurrent_requests_share_one_render(service, fake_render):
+    calls, gate, _ = fake_render
+
+    async def run():
+        first = asyncio.ensure_future(service.get_pdf('h', ('town', 'newton')))
+        second = asyncio.ensure_future(service.get_pdf('h', ('town', 'newton')))
+        await asyncio.sleep(0.05)
+        gate.set()
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(run()) == [b'%PDF town newton'] * 2
+    assert calls == [('town', 'newton')]
+    assert service.renders == 1
+    assert service.inflight == {}
+
+
+def test_render_is_cached_when_first_requester_is_cancelled(service, fake_render):
+    calls, gate, started = fake_render
+
+    async def run():
+        first = asyncio.ensure_future(service.get_pdf('h', ('full', '')))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        first.cancel()
+        gate.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        while service.inflight:
+            await asyncio.sleep(0.01)
+        return await service.get_pdf('h', ('full', ''))
+
+    assert asyncio.run(run()) == b'%PDF full '
+    assert calls == [('full', '')]
+    assert list(service.cache) == [('h', ('full', ''))]
+
+
+def test_failed_render_is_not_cached(service, monkeypatch):
+    def render(data_file, data_hash, variant):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(report_server, 'render_variant', render)
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.get_pdf('h', ('full', '')))
+    assert service.cache == {} and service.inflight == {} and service.renders == 0
+
+
+def test_lru_evicts_least_recently_used(service, fake_render):
+    calls, gate, _ = fake_render
+    gate.set()
+
+    async def run():
+        for slug in ('a', 'b', 'a', 'c'):
+            await service.get_pdf('h', ('town', slug))
+
+    asyncio.run(run())
+    assert list(service.cache) == [('h', ('town', 'a')), ('h', ('town', 'c'))]
+    assert calls == [('town', 'a'), ('town', 'b'), ('town', 'c')]
+
+
+def test_etag_and_conditional_get(service):
+    async def run():
+        server = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            _, data = await service.current_data()
+            slug = sorted(t['slug'] for t in data['towns'])[0]
+            status, headers, body = await request(port, f"/report/town/{slug}.pdf")
+            assert status == 200
+            assert headers['Content-Type'] == 'application/pdf'
+            assert body.startswith(b'%PDF')
+            etag = headers['ETag']
+
+            status, headers, body = await request(port, f"/report/town/{slug}.pdf", {'If-None-Match': etag})
+            assert (status, headers['ETag'], body) == (304, etag, b'')
+
+            status, _, _ = await request(port, '/report/town/no-such-town.pdf')
+            assert status == 404
+
+    asyncio.run(run())
+    assert service.renders == 1
+
+
+def test_data_reload_does_not_block_the_loop(service, monkeypatch):
+    """While the data files are re-parsed, other connections are still answered."""
+    gate = threading.Event()
+    read_data = service.read_data
+
+    def slow_read(paths):
+        gate.wait(5)
+        return read_data(paths)
+
+    monkeypatch.setattr(service, 'read_data', slow_read)
+
+    async def run():
+        server = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            loading = [asyncio.ensure_future(service.current_data()) for _ in range(2)]
+            status, _, body = await asyncio.wait_for(request(port, '/healthz'), 2)
+            assert status == 200 and b'"renders": 0' in body
+            assert not any(task.done() for task in loading)
+            gate.set()
+            (first_hash, first), (second_hash, second) = await asyncio.gather(*loading)
+            assert first_hash == second_hash and first is second
+
+    asyncio.run(run())
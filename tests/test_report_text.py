@@ -0,0 +1,19 @@
+from report_text import add_markup, decode_js_string, to_markup
+
+
+def test_escaping_applies_to_every_field_but_em_dash_spacing_only_to_prose():
+    record = add_markup({
+        'name': 'Acton — Boxborough',
+        'url': 'https://example.org/a?x=1&y=2—3',
+        'bottom_line': 'Three provisions conflict—parking & lot size <b>',
+    }, ('name', 'url', 'bottom_line'), prose=('bottom_line',))
+    assert record['markup'] == {
+        'name': 'Acton — Boxborough',
+        'url': 'https://example.org/a?x=1&amp;y=2—3',
+        'bottom_line': 'Three provisions conflict — parking &amp; lot size &lt;b&gt;',
+    }
+    assert to_markup('clean text') == 'clean text'
+
+
+def test_decode_js_string():
+    assert decode_js_string(r"Town’s \'by right\' \u{1F3E0}\nok") == "Town’s 'by right' \U0001F3E0\nok"
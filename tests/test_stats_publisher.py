@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+redis = pytest.importorskip('redis')
+
+from stats_publisher import KEEP_VERSIONS, RETIRE_SECONDS, StatsPublisher, encode, payload_version  # noqa: E402
+
+PREFIX = 'test:stats'
+
+
+def payloads(n, tag='a'):
+    return {'tiers': {'tag': tag}, **{f"town:t{i}": {'i': i, 'tag': tag} for i in range(n)}}
+
+
+def stats_keys(client):
+    return sorted(k.decode() for k in client.keys(f"{PREFIX}:*"))
+
+
+def test_publish_writes_every_key_in_batches(redis_client):
+    publisher = StatsPublisher(redis_client, PREFIX, batch_size=4)
+    result = publisher.publish(payloads(9))
+    version = result['version']
+    assert result['keys'] == 11                     # 10 payloads + manifest
+    assert result['round_trips'] == 3
+    assert publisher.current() == version
+    assert json.loads(redis_client.get(f"{PREFIX}:{version}:town:t3")) == {'i': 3, 'tag': 'a'}
+    manifest = json.loads(redis_client.get(f"{PREFIX}:{version}:manifest"))
+    assert manifest == sorted(payloads(9))
+
+
+def test_republishing_unchanged_data_is_a_no_op(redis_client):
+    publisher = StatsPublisher(redis_client, PREFIX)
+    first = publisher.publish(payloads(3))
+    before = stats_keys(redis_client)
+    redis_client.delete(f"{PREFIX}:{first['version']}:town:t0")     # a rewrite would restore it
+
+    second = publisher.publish(payloads(3))
+    assert second['skipped'] and second['version'] == first['version'] and second['keys'] == 0
+    assert len(stats_keys(redis_client)) == len(before) - 1
+    assert redis_client.lrange(f"{PREFIX}:versions", 0, -1) == [first['version'].encode()]
+
+    forced = publisher.publish(payloads(3), force=True)
+    assert not forced['skipped'] and stats_keys(redis_client) == before
+
+
+def test_version_is_a_content_hash():
+    encoded = {name: encode(value) for name, value in payloads(3).items()}
+    assert payload_version(encoded) == payload_version(dict(reversed(list(encoded.items()))))
+    changed = dict(encoded, tiers=encode({'tag': 'b'}))
+    assert payload_version(changed) != payload_version(encoded)
+
+
+def test_swap_raises_watch_error_on_a_concurrent_swap(redis_client, monkeypatch):
+    publisher = StatsPublisher(redis_client, PREFIX)
+    publisher.publish(payloads(2, 'a'))
+    pipeline = redis_client.pipeline
+
+    def racing_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        multi = pipe.multi
+
+        def multi_after_rival():
+            redis_client.set(publisher.current_key, 'vrival')     # another publisher swaps first
+            multi()
+
+        pipe.multi = multi_after_rival
+        return pipe
+
+    monkeypatch.setattr(redis_client, 'pipeline', racing_pipeline)
+    with pytest.raises(redis.WatchError):
+        publisher.swap('vmine')
+    assert publisher.current() == 'vrival'
+    assert b'vmine' not in redis_client.lrange(publisher.versions_key, 0, -1)
+
+
+def test_retire_expires_versions_beyond_the_previous_one(redis_client):
+    publisher = StatsPublisher(redis_client, PREFIX)
+    versions = [publisher.publish(payloads(2, tag))['version'] for tag in 'abcd']
+    assert publisher.current() == versions[-1]
+    assert [v.decode() for v in redis_client.lrange(publisher.versions_key, 0, -1)] == versions[:1:-1]
+    assert len(versions) - KEEP_VERSIONS == 2
+
+    for version in versions[:2]:        # retired: every key, manifest included, has a TTL
+        for name in sorted(payloads(2)) + ['manifest']:
+            assert 0 < redis_client.ttl(f"{PREFIX}:{version}:{name}") <= RETIRE_SECONDS
+    for version in versions[2:]:        # current and previous stay readable indefinitely
+        for name in sorted(payloads(2)) + ['manifest']:
+            assert redis_client.ttl(f"{PREFIX}:{version}:{name}") == -1
+
+
+def test_republishing_an_older_version_moves_it_to_the_front(redis_client):
+    publisher = StatsPublisher(redis_client, PREFIX)
+    a = publisher.publish(payloads(2, 'a'))['version']
+    b = publisher.publish(payloads(2, 'b'))['version']
+    result = publisher.publish(payloads(2, 'a'))
+    assert result['previous'] == b and publisher.current() == a
+    assert [v.decode() for v in redis_client.lrange(publisher.versions_key, 0, -1)] == [a, b]
+
+
+def test_losing_publisher_lets_its_keys_expire(redis_client, monkeypatch):
+    publisher = StatsPublisher(redis_client, PREFIX)
+    winner = publisher.publish(payloads(2, 'a'))['version']
+    pipeline = redis_client.pipeline
+
+    def racing_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        multi = pipe.multi
+
+        def multi_after_rival():
+            redis_client.set(publisher.current_key, 'vrival')
+            multi()
+
+        pipe.multi = multi_after_rival
+        return pipe
+
+    monkeypatch.setattr(redis_client, 'pipeline', racing_pipeline)
+    with pytest.raises(redis.WatchError):
+        publisher.publish(payloads(2, 'b'))
+    loser = payload_version({name: encode(value) for name, value in payloads(2, 'b').items()})
+    assert 0 < redis_client.ttl(f"{PREFIX}:{loser}:manifest") <= RETIRE_SECONDS
+    assert 0 < redis_client.ttl(f"{PREFIX}:{loser}:town:t1") <= RETIRE_SECONDS
+    assert redis_client.ttl(f"{PREFIX}:{winner}:town:t1") == -1
@@ -0,0 +1,137 @@
+import json
+
+import pytest
+
+from survey_ingest import SurveySnapshot, apply_diff, change_summary, diff_snapshots, main, survey_snapshot
+from town_geo import HLC_DATA_FILE
+from town_metrics import town_names_from_seo
+
+PERIOD = 'H2_2025'
+SURVEY_COUNT = """
+SELECT count(*), sum(applications), sum(approved), sum(denied)
+FROM state_survey_data WHERE survey_period = %s
+"""
+
+
+@pytest.fixture(scope='module')
+def records():
+    with open(HLC_DATA_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope='module')
+def names():
+    return town_names_from_seo()
+
+
+def edited(records, edits):
+    """Copy of the survey with {muni_id: {field: value}} applied."""
+    return [dict(r, **edits.get(r['muni_id'], {})) for r in records]
+
+
+def test_source_url_does_not_mark_rows_changed(records, names, tmp_path):
+    snapshot = SurveySnapshot(PERIOD, str(tmp_path))
+    snapshot.rows = survey_snapshot(records, names)
+    # Rows saved before the source URL was left out of the comparison
+    old = {m: dict(row, source_url='https://example.org/h1.xlsx') for m, row in snapshot.rows.items()}
+    diff = diff_snapshots(old, survey_snapshot(records, names))
+    assert (diff['added'], diff['changed'], diff['removed'], diff['unchanged']) == ([], [], [], len(records))
+
+
+def test_dry_run_summary(records, names, tmp_path, capsys):
+    data, out = tmp_path / 'survey.json', tmp_path / 'changes.json'
+    data.write_text(json.dumps(edited(records, {1: {'approved': 4}})))
+    snapshot = SurveySnapshot(PERIOD, str(tmp_path / 'snapshots'))
+    snapshot.rows = survey_snapshot(records, names)
+    snapshot.save()
+
+    main(['--period', PERIOD, '--data', str(data), '--snapshot-dir', str(tmp_path / 'snapshots'),
+          '--source-url', 'https://example.org/h2.xlsx', '--dry-run', '--summary', str(out)])
+    assert '0 added, 1 changed, 0 removed' in capsys.readouterr().out
+    assert json.loads(out.read_text())['changes'] == [
+        {'muni_id': 1, 'name': 'Abington', 'change': 'changed', 'approved': [3, 4]},
+    ]
+
+
+# ── Against Postgres ─────────────────────────────────────────────────────
+
+class RecordingLoader:
+    """Wraps BulkLoader and records the rows each load_survey call sent."""
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.sent = []
+
+    def load_survey(self, rows):
+        rows = list(rows)
+        self.sent.extend(rows)
+        return self.loader.load_survey(rows)
+
+    def delete_survey(self, town_names, period):
+        return self.loader.delete_survey(town_names, period)
+
+
+@pytest.fixture
+def loader(pg_dsn):
+    permit_loader = pytest.importorskip('permit_loader')
+    loader = permit_loader.BulkLoader(pg_dsn, pool_size=1)
+    loader.init_schema()
+    yield loader
+    loader.close()
+
+
+def ingest(loader, records, names, directory, prune=False, source_url=None):
+    snapshot = SurveySnapshot(PERIOD, str(directory))
+    new = survey_snapshot(records, names)
+    old = dict(snapshot.rows)
+    diff = diff_snapshots(old, new)
+    recorder = RecordingLoader(loader)
+    result = apply_diff(recorder, snapshot, new, diff, batch_size=50, prune=prune, source_url=source_url)
+    return result, change_summary(old, new, diff), recorder.sent
+
+
+def survey_totals(pg_dsn):
+    import psycopg
+    with psycopg.connect(pg_dsn) as conn:
+        return conn.execute(SURVEY_COUNT, [PERIOD]).fetchone()
+
+
+def test_only_changed_rows_are_upserted(loader, pg_dsn, records, names, tmp_path):
+    result, summary, sent = ingest(loader, records, names, tmp_path, source_url='https://example.org/h2.xlsx')
+    assert (result['inserted'], result['updated'], result['batches']) == (len(records), 0, 5)
+    assert len(sent) == len(summary) == len(records)
+    before = survey_totals(pg_dsn)
+    assert before[0] == len(records)
+
+    # A re-run with a different source URL sends nothing
+    result, summary, sent = ingest(loader, records, names, tmp_path, source_url='https://example.org/v2.xlsx')
+    assert (result['inserted'], result['updated'], result['batches'], sent, summary) == (0, 0, 0, [], [])
+
+    andover = next(r for r in records if r['muni_id'] == 9)
+    changed = edited(records, {1: {'approved': 4}, 9: {'applications': 30, 'rejected': 2}})
+    result, summary, sent = ingest(loader, changed, names, tmp_path)
+    assert (result['inserted'], result['updated'], result['batches']) == (0, 2, 1)
+    assert [row[0] for row in sent] == ['Abington', 'Andover']
+    assert [(e['muni_id'], e['change']) for e in summary] == [(1, 'changed'), (9, 'changed')]
+    assert summary[0]['approved'] == [3, 4] and 'applications' not in summary[0]
+    count, applications, approved, denied = survey_totals(pg_dsn)
+    assert count == before[0] and approved == before[2] + 1
+    assert applications == before[1] + 30 - andover['applications']
+    assert denied == before[3] + 2 - andover['rejected']
+
+
+def test_prune_deletes_towns_that_left_the_survey(loader, pg_dsn, records, names, tmp_path):
+    ingest(loader, records, names, tmp_path)
+    remaining = [r for r in records if r['muni_id'] != 1]
+
+    result, summary, sent = ingest(loader, remaining, names, tmp_path)
+    assert (result['deleted'], sent) == (0, [])
+    assert [(e['muni_id'], e['change']) for e in summary] == [(1, 'removed')]
+    assert survey_totals(pg_dsn)[0] == len(records)
+    assert '1' in SurveySnapshot(PERIOD, str(tmp_path)).rows
+
+    result, summary, sent = ingest(loader, remaining, names, tmp_path, prune=True)
+    assert (result['deleted'], result['batches'], sent) == (1, 1, [])
+    assert survey_totals(pg_dsn)[0] == len(records) - 1
+    assert '1' not in SurveySnapshot(PERIOD, str(tmp_path)).rows
+    assert ingest(loader, remaining, names, tmp_path, prune=True)[0]['batches'] == 0
@@ -0,0 +1,32 @@
+import pytest
+
+from town_match import default_matcher, is_confident, resolve_slug
+
+
+@pytest.mark.parametrize('name, slug', [
+    ('Newton', 'newton'),
+    ('Town of N. Andover', 'north-andover'),
+    ('Foxboro', 'foxborough'),
+    ('Manchester', 'manchester-by-the-sea'),
+    ('Jamaica Plain', 'boston'),
+    ('Northamptonn', 'northampton'),
+    ('Southborough MA', 'southborough'),
+])
+def test_exact_alias_and_confident_fuzzy_matches_resolve(name, slug):
+    assert resolve_slug(name) == slug
+
+
+@pytest.mark.parametrize('name, nearest, fallback', [
+    # Regional districts and villages name more than one town, or none
+    ('Hamilton Wenham', 'hamilton', 'hamilton-wenham'),
+    ('Acton-Boxborough', 'boxborough', 'acton-boxborough'),
+    ('Dennis Port', 'dennis', 'dennis-port'),
+    # Close to several towns at once
+    ('Bridgewater Town of', 'bridgewater', 'bridgewater-town-of'),
+    ('Sudbery', 'sudbury', 'sudbery'),
+])
+def test_weak_or_ambiguous_fuzzy_matches_fall_back(name, nearest, fallback):
+    result = default_matcher().match(name)
+    assert (result['kind'], result['slug']) == ('fuzzy', nearest)
+    assert not is_confident(result)
+    assert resolve_slug(name) == fallback
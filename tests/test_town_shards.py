@@ -0,0 +1,82 @@
+import json
+
+from town_shards import SHARD_DIR, build_shards, load_shards, stale_shards, write_shards
+
+
+def provision(pid, category, status='compliant', ag_decision=None):
+    return {'id': pid, 'provision': pid.upper(), 'category': category, 'status': status,
+            'state_law': '', 'local_bylaw': '', 'impact': '', 'ag_decision': ag_decision, 'citations': []}
+
+
+def town(slug, *provisions):
+    permits = {'submitted': 1, 'approved': 1, 'denied': 0, 'pending': 0, 'approval_rate': 100}
+    header = dict.fromkeys(['county', 'municipality_type', 'last_reviewed', 'bylaw_last_updated', 'bylaw_source',
+                            'bottom_line', 'resistance_tag', 'is_exempt', 'is_open', 'ag_decision_date',
+                            'ag_decision_url', 'bylaw_retrieved_at', 'bylaw_source_url', 'bylaw_source_title',
+                            'bylaw_version_date'])
+    return dict(header, slug=slug, name=slug.title(), population=1000, ag_disapprovals=0, permits=permits,
+                provisions=list(provisions))
+
+
+def seo(slug, county, approved=1, population=10000):
+    return {'slug': slug, 'name': slug.title(), 'county': county, 'approved': approved, 'population': population}
+
+
+TOWNS = [
+    town('alpha', provision('a-1', 'Use'), provision('a-2', 'Parking'), provision('a-3', 'Use')),
+    town('beta', provision('b-1', 'Use', 'inconsistent', 'Disapproved'), provision('b-2', 'Parking')),
+    town('gamma', *[provision(f"g-{i}", 'Use') for i in range(1, 7)]),
+]
+SEO = [seo('alpha', 'Essex'), seo('beta', 'Essex', approved=3), seo('gamma', 'Essex', approved=0),
+       seo('delta', 'Suffolk'), *[seo(f"essex-{i}", 'Essex') for i in range(4)]]
+
+
+def shards():
+    return build_shards(TOWNS, [], {}, SEO, [], {'beta': [{'permit': 'B-1'}]})
+
+
+def test_provision_shard_carries_navigation_and_related():
+    out = shards()
+    a1, a3 = out['provisions/alpha/a-1.json'], out['provisions/alpha/a-3.json']
+    assert (a1['provisionCount'], a1['prev'], a1['next']) == (3, None, {'id': 'a-2', 'provision': 'A-2'})
+    assert (a3['prev'], a3['next']) == ({'id': 'a-2', 'provision': 'A-2'}, None)
+    # Other towns only, in town order, stopping at five
+    assert [(r['slug'], r['provision']['id']) for r in a1['related']] == [
+        ('beta', 'b-1'), ('gamma', 'g-1'), ('gamma', 'g-2'), ('gamma', 'g-3'), ('gamma', 'g-4')]
+    assert a1['related'][0]['provision'] == {'id': 'b-1', 'provision': 'B-1', 'status': 'inconsistent',
+                                             'agDecision': 'Disapproved'}
+    assert out['provisions/beta/b-2.json']['related'] == [
+        {'town': 'Alpha', 'slug': 'alpha', 'provision': {'id': 'a-2', 'provision': 'A-2', 'status': 'compliant'}}]
+
+
+def test_town_shard_carries_nearby_towns_and_statewide_average():
+    out = shards()
+    alpha, beta, delta = out['towns/alpha.json'], out['towns/beta.json'], out['towns/delta.json']
+    assert [r['slug'] for r in alpha['nearby']] == ['beta', 'gamma', 'essex-0', 'essex-1']
+    assert delta['nearby'] == []
+    # 9 approvals over the 70,000 residents of the seven towns that have any
+    assert alpha['statewidePerCapita'] == 1.3
+    assert (alpha['permitLog'], beta['permitLog']) == (None, [{'permit': 'B-1'}])
+    assert [p['id'] for p in alpha['compliance']['provisions']] == ['a-1', 'a-2', 'a-3']
+
+
+def test_check_reports_missing_changed_and_leftover_shards(tmp_path):
+    out = shards()
+    assert len(stale_shards(out, str(tmp_path))) == len(out) + 1
+    write_shards(out, str(tmp_path))
+    assert stale_shards(out, str(tmp_path)) == []
+
+    (tmp_path / 'towns' / 'alpha.json').write_text('{}')
+    (tmp_path / 'provisions' / 'alpha' / 'a-9.json').write_text('{}')
+    (tmp_path / 'provisions' / 'beta' / 'b-2.json.gz').unlink()
+    changed = dict(out, **{'towns/beta.json': dict(out['towns/beta.json'], permitLog=None)})
+    assert stale_shards(changed, str(tmp_path)) == [
+        'provisions/beta/b-2.json', 'towns/alpha.json', 'towns/beta.json', 'provisions/alpha/a-9.json',
+        'manifest.json']
+
+
+def test_committed_shards_are_up_to_date():
+    assert stale_shards(load_shards(), SHARD_DIR) == []
+    with open(f"{SHARD_DIR}/towns/newton.json", 'r', encoding='utf-8') as f:
+        newton = json.load(f)
+    assert newton['seo']['name'] == 'Newton' and newton['permitLog']
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+psycopg = pytest.importorskip('psycopg')
+
+from town_stats_refresh import refresh_once  # noqa: E402
+
+SUPABASE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'supabase')
+INSERT = """
+INSERT INTO permits (town_id, permit_number, status, applied_date, approved_date, denied_date, source)
+SELECT t.id, v.number, v.status, v.applied::date, v.approved::date, v.denied::date, 'foia'
+FROM (VALUES %s) AS v(town, number, status, applied, approved, denied)
+JOIN towns t ON t.name = v.town
+"""
+
+
+@pytest.fixture
+def conn(pg_dsn):
+    with psycopg.connect(pg_dsn, autocommit=True) as conn:
+        for name in ('schema.sql', 'town_stats_refresh.sql'):
+            with open(os.path.join(SUPABASE, name), 'r', encoding='utf-8') as f:
+                conn.execute(f.read())
+        yield conn
+
+
+def insert(conn, *rows):
+    values = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(rows))
+    conn.execute(INSERT % values, [v for row in rows for v in row])
+
+
+def dirty(conn):
+    return {name for (name,) in conn.execute(
+        "SELECT t.name FROM town_stats_dirty d JOIN towns t ON t.id = d.town_id")}
+
+
+def stats(conn, *names):
+    return {name: tuple(row) for name, *row in conn.execute(
+        "SELECT name, total_applications, total_approved, total_denied, avg_days_to_approve "
+        "FROM towns WHERE name = ANY(%s)", [list(names)])}
+
+
+def test_writes_mark_old_and_new_towns_and_one_refresh_clears_them(conn):
+    assert dirty(conn) == set()
+    insert(conn,
+           ('Newton', 'N-1', 'approved', '2025-02-01', '2025-03-03', None),
+           ('Newton', 'N-2', 'denied', '2025-02-10', None, '2025-02-20'),
+           ('Newton', 'N-3', 'applied', '2025-04-01', None, None),
+           ('Needham', 'D-1', 'approved', '2025-01-05', '2025-01-30', None))
+    assert dirty(conn) == {'Newton', 'Needham'}
+    # Statement-level triggers only record towns; the aggregates wait for the refresh
+    assert stats(conn, 'Newton')['Newton'][:3] == (0, 0, 0)
+
+    refreshed, pending, _, _ = refresh_once(conn)
+    assert (refreshed, pending) == (2, 2)
+    assert dirty(conn) == set()
+    assert stats(conn, 'Newton', 'Needham') == {'Newton': (3, 1, 1, 20), 'Needham': (1, 1, 0, 25)}
+
+    # Moving a permit marks the town it left and the one it joined
+    conn.execute("UPDATE permits SET town_id = (SELECT id FROM towns WHERE name = 'Lexington') "
+                 "WHERE permit_number = 'N-1'")
+    assert dirty(conn) == {'Newton', 'Lexington'}
+    conn.execute("UPDATE permits SET status = 'withdrawn' WHERE permit_number = 'N-3'")
+    conn.execute("DELETE FROM permits WHERE permit_number = 'D-1'")
+    assert dirty(conn) == {'Newton', 'Lexington', 'Needham'}
+
+    refreshed, pending, oldest, _ = refresh_once(conn)
+    assert (refreshed, pending) == (3, 3) and oldest is not None
+    assert dirty(conn) == set()
+    assert stats(conn, 'Newton', 'Lexington', 'Needham') == {
+        'Newton': (2, 0, 1, 10), 'Lexington': (1, 1, 0, 30), 'Needham': (0, 0, 0, None),
+    }
+    assert refresh_once(conn)[:2] == (0, 0)
+
+
+def test_deleting_a_town_does_not_mark_it(conn):
+    insert(conn, ('Belmont', 'B-1', 'applied', '2025-03-01', None, None))
+    refresh_once(conn)
+    # The cascade deletes its permits after the town row is gone
+    conn.execute("DELETE FROM towns WHERE name = 'Belmont'")
+    assert dirty(conn) == set()
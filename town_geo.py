@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Spatial index over municipality coordinates in src/data/hlc_adu_data.json.
+
+Points are bucketed into a uniform grid of square cells (in miles, on an
+equirectangular projection). Queries are answered a cell at a time: every
+town in a cell shares one candidate block of neighbouring cells, and the
+haversine distances for the whole block are computed in one numpy call.
+"Towns within N miles" and "k nearest peers" run for every municipality
+in a single batch.
+
+Usage:
+    python3 town_geo.py --town newton                 # 5 nearest peers
+    python3 town_geo.py --town newton --within 10
+    python3 town_geo.py --out public/data/town_peers.json
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+from town_match import resolve_slug
+
+HLC_DATA_FILE = os.path.join(os.path.dirname(__file__), 'src', 'data', 'hlc_adu_data.json')
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE = EARTH_RADIUS_MILES * math.pi / 180
+DEFAULT_CELL_MILES = 10.0
+
+PEER_COUNT = 5
+PEER_RADIUS_MILES = 15.0
+
+
+def haversine_miles(lat1, lng1, lat2, lng2):
+    """Great-circle distance in miles; arguments broadcast like numpy arrays."""
+    lat1, lng1, lat2, lng2 = (np.radians(a) for a in (lat1, lng1, lat2, lng2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialIndex:
+    """Uniform-grid index over (lat, lng) points."""
+
+    def __init__(self, lat, lng, cell_miles=DEFAULT_CELL_MILES):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lng = np.asarray(lng, dtype=np.float64)
+        self.cell_miles = cell_miles
+        # Scale longitude at the highest latitude so projected east-west
+        # distances never overstate the true ones; cell blocks stay conservative.
+        max_lat = float(np.abs(self.lat).max()) if len(self.lat) else 0.0
+        self._lng_miles = MILES_PER_DEGREE * math.cos(math.radians(max_lat))
+        cx, cy = self._cell_coords(self.lat, self.lng)
+        self.cell_of = list(zip(cx.tolist(), cy.tolist()))
+        cells = {}
+        for i, cell in enumerate(self.cell_of):
+            cells.setdefault(cell, []).append(i)
+        self.cells = {cell: np.array(rows) for cell, rows in cells.items()}
+
+    def __len__(self):
+        return len(self.lat)
+
+    def _cell_coords(self, lat, lng):
+        cx = np.floor(lng * self._lng_miles / self.cell_miles).astype(np.int64)
+        cy = np.floor(lat * MILES_PER_DEGREE / self.cell_miles).astype(np.int64)
+        return cx, cy
+
+    def _block(self, cell, rings):
+        """Point rows in the (2 * rings + 1)^2 cells centred on `cell`."""
+        x, y = cell
+        parts = [self.cells[(x + dx, y + dy)]
+                 for dx in range(-rings, rings + 1)
+                 for dy in range(-rings, rings + 1)
+                 if (x + dx, y + dy) in self.cells]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def _groups(self, rows):
+        """Query rows grouped by grid cell."""
+        groups = {}
+        for r in rows:
+            groups.setdefault(self.cell_of[r], []).append(r)
+        return [(cell, np.array(g)) for cell, g in groups.items()]
+
+    def _distances(self, queries, candidates):
+        d = haversine_miles(self.lat[queries][:, None], self.lng[queries][:, None],
+                            self.lat[candidates][None, :], self.lng[candidates][None, :])
+        d[queries[:, None] == candidates[None, :]] = np.inf     # never your own peer
+        return d
+
+    def within(self, radius_miles, rows=None):
+        """For each query row: (rows, miles) of other points within the radius, nearest first."""
+        rows = range(len(self)) if rows is None else rows
+        rings = max(1, math.ceil(radius_miles / self.cell_miles))
+        results = {}
+        for cell, queries in self._groups(rows):
+            candidates = self._block(cell, rings)
+            d = self._distances(queries, candidates)
+            for q, dq in zip(queries, d):
+                hit = np.flatnonzero(dq <= radius_miles)
+                order = hit[np.lexsort((candidates[hit], dq[hit]))]
+                results[int(q)] = (candidates[order], dq[order])
+        return [results[int(r)] for r in rows]
+
+    def nearest(self, k, rows=None):
+        """(rows, miles) arrays of shape (n, k) for the k nearest other points.
+
+        Rows are padded with -1 (and inf miles) when fewer than k points exist.
+        """
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        out_rows = np.full((len(rows), k), -1, dtype=np.int64)
+        out_miles = np.full((len(rows), k), np.inf)
+        position = {int(r): i for i, r in enumerate(rows)}
+        for cell, queries in self._groups(rows):
+            rings = 1
+            while True:
+                candidates = self._block(cell, rings)
+                d = self._distances(queries, candidates)
+                # Anything outside the block is at least `rings` cells away
+                # from every point in the centre cell.
+                settled = rings * self.cell_miles
+                exhausted = len(candidates) == len(self)
+                if exhausted or ((d <= settled).sum(axis=1) >= k).all():
+                    break
+                rings *= 2
+            order = np.lexsort((np.broadcast_to(candidates, d.shape), d), axis=1)[:, :k]
+            picked = np.take_along_axis(d, order, axis=1)
+            for q, cand_order, miles in zip(queries, order, picked):
+                i = position[int(q)]
+                n = int(np.isfinite(miles).sum())
+                out_rows[i, :n] = candidates[cand_order[:n]]
+                out_miles[i, :n] = miles[:n]
+        return out_rows, out_miles
+
+
+# ── Municipality points ──────────────────────────────────────────────────
+
+class TownPoints:
+    """Columns from hlc_adu_data.json plus a spatial index over them."""
+
+    def __init__(self, records, cell_miles=DEFAULT_CELL_MILES):
+        records = [r for r in records if r.get('lat') is not None and r.get('lng') is not None]
+        self.name = [r['name'] for r in records]
+        self.slug = [resolve_slug(r['name']) for r in records]
+        self.row = {slug: i for i, slug in enumerate(self.slug)}
+        self.applications = np.array([r.get('applications') or 0 for r in records], dtype=np.int64)
+        self.approved = np.array([r.get('approved') or 0 for r in records], dtype=np.int64)
+        self.approval_rate = np.full(len(records), np.nan)
+        has_apps = self.applications > 0
+        self.approval_rate[has_apps] = self.approved[has_apps] / self.applications[has_apps] * 100
+        self.index = SpatialIndex([r['lat'] for r in records], [r['lng'] for r in records], cell_miles)
+        digest = hashlib.sha1('\n'.join(self.slug).encode('utf-8'))
+        for column in (self.index.lat, self.index.lng, self.approved):
+            digest.update(column.tobytes())
+        self.digest = digest.hexdigest()
+
+    def __len__(self):
+        return len(self.slug)
+
+
+def project(lat, lng, width, height, pad=0.0):
+    """Equirectangular projection of all points into a width x height box.
+
+    Longitude is scaled by the cosine of the mid latitude and the result is
+    centred with a uniform scale, so shapes keep their aspect ratio.
+    Returns (x, y) arrays in drawing units, y pointing up.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lng = np.asarray(lng, dtype=np.float64)
+    mid = math.radians((lat.min() + lat.max()) / 2)
+    x = lng * math.cos(mid)
+    y = lat
+    span_x = max(x.max() - x.min(), 1e-9)
+    span_y = max(y.max() - y.min(), 1e-9)
+    scale = min((width - 2 * pad) / span_x, (height - 2 * pad) / span_y)
+    off_x = (width - span_x * scale) / 2
+    off_y = (height - span_y * scale) / 2
+    return (x - x.min()) * scale + off_x, (y - y.min()) * scale + off_y
+
+
+def load_town_points(filepath=HLC_DATA_FILE):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return TownPoints(json.load(f))
+
+
+def _rate(value):
+    return None if np.isnan(value) else int(round(float(value)))
+
+
+def regional_peers(points, inconsistent_counts=None, k=PEER_COUNT, radius_miles=PEER_RADIUS_MILES):
+    """Nearest peers and within-radius approval-rate context for every town.
+
+    `inconsistent_counts` maps slug -> inconsistent provision count for towns
+    with a compliance profile; other peers report None.
+    """
+    inconsistent_counts = inconsistent_counts or {}
+    near_rows, near_miles = points.index.nearest(k)
+    regional = points.index.within(radius_miles)
+
+    peers = {}
+    for i, slug in enumerate(points.slug):
+        nearby = regional[i][0]
+        rates = points.approval_rate[nearby]
+        rates = rates[~np.isnan(rates)]
+        peers[slug] = {
+            'approval_rate': _rate(points.approval_rate[i]),
+            'radius_miles': radius_miles,
+            'within_radius': len(nearby),
+            'regional_rated': int(rates.size),
+            'regional_median_rate': int(round(float(np.median(rates)))) if rates.size else None,
+            'nearest': [
+                {
+                    'slug': points.slug[r],
+                    'name': points.name[r],
+                    'miles': round(float(m), 1),
+                    'approval_rate': _rate(points.approval_rate[r]),
+                    'inconsistent': inconsistent_counts.get(points.slug[r]),
+                }
+                for r, m in zip(near_rows[i], near_miles[i]) if r >= 0
+            ],
+        }
+    return peers
+
+
+def write_peers_artifact(peers, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(peers, f, indent=1, sort_keys=True)
+        f.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Nearby-town queries over municipality coordinates')
+    parser.add_argument('--data', default=HLC_DATA_FILE, help='path to hlc_adu_data.json')
+    parser.add_argument('--town', help='town slug to query, e.g. newton')
+    parser.add_argument('--within', type=float, help='list towns within this many miles')
+    parser.add_argument('-k', type=int, default=PEER_COUNT, help='number of nearest peers')
+    parser.add_argument('--out', help='write peers for every town as JSON here')
+    args = parser.parse_args(argv)
+
+    points = load_town_points(args.data)
+    print(f"{len(points)} municipalities in {len(points.index.cells)} grid cells")
+
+    if args.town:
+        if args.town not in points.row:
+            parser.error(f"unknown town: {args.town}")
+        row = points.row[args.town]
+        if args.within is not None:
+            rows, miles = points.index.within(args.within, [row])[0]
+            print(f"{len(rows)} within {args.within:g} mi of {points.name[row]}:")
+        else:
+            rows, miles = points.index.nearest(args.k, [row])
+            rows, miles = rows[0][rows[0] >= 0], miles[0]
+            print(f"{len(rows)} nearest to {points.name[row]}:")
+        for r, m in zip(rows, miles):
+            rate = _rate(points.approval_rate[r])
+            print(f"  {points.name[r]:20s} {m:5.1f} mi  "
+                  f"{points.applications[r]:4d} apps  {'—' if rate is None else f'{rate}%':>4s}")
+
+    if args.out:
+        write_peers_artifact(regional_peers(points, k=args.k), args.out)
+        print(f"Wrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Match municipality names from any data source to canonical town slugs.
+
+The 351 municipalities in town_seo_data.ts are the canonical set. A name
+is looked up in three steps:
+1. exact: its normalized form equals a municipality's. Normalization
+   lowercases, strips accents, punctuation and "Town of" / " town" style
+   wrappers, expands N./S./E./W./Mt. and treats -boro and -borough alike.
+2. alias: a known alternate name such as "Manchester" or a Boston
+   neighborhood or Barnstable village (ALIASES).
+3. fuzzy: trigram similarity against an inverted index. Each query only
+   scores the municipalities that share a trigram with it, with a single
+   numpy bincount over the posting lists, so a batch of names costs
+   roughly its total trigram count rather than names x 351 comparisons.
+
+match_names() returns every candidate, fuzzy ones included, for review.
+resolve_slug() is what ingesters use: a cached single-name lookup that
+only trusts exact and alias matches, and fuzzy ones that score at least
+ACCEPT_SCORE and beat the runner-up by ACCEPT_MARGIN. Anything else (a
+regional district such as "Hamilton Wenham", a village such as "Dennis
+Port", or a plain typo) gets a slugified fallback rather than a neighbour's
+slug, and --check lists it so it can be added to ALIASES.
+
+Usage:
+    python3 town_match.py "Manchester" "N. Andover" "Foxboro" "Sudbery"
+    python3 town_match.py --check          # match every source's names and report misses
+"""
+
+import argparse
+import json
+import re
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+
+from town_metrics import SEO_DATA_FILE
+from ts_data import iter_module_records
+
+MIN_SCORE = 0.45        # trigram Jaccard similarity below which nothing is returned
+ACCEPT_SCORE = 0.75     # fuzzy matches resolve_slug() trusts...
+ACCEPT_MARGIN = 0.15    # ...when this far ahead of the runner-up
+ALTERNATIVES = 3
+
+ABBREVIATIONS = {'n': 'north', 's': 'south', 'e': 'east', 'w': 'west', 'mt': 'mount', 'ft': 'fort'}
+WRAPPERS = re.compile(r"^(?:town|city) of\s+|\s+(?:town|city)$")
+
+# Alternate names -> canonical slug
+ALIASES = {
+    'manchester': 'manchester-by-the-sea',
+    'gay head': 'aquinnah',
+    # Boston neighborhoods
+    'allston': 'boston', 'brighton': 'boston', 'charlestown': 'boston', 'dorchester': 'boston',
+    'east boston': 'boston', 'hyde park': 'boston', 'jamaica plain': 'boston', 'mattapan': 'boston',
+    'roslindale': 'boston', 'roxbury': 'boston', 'south boston': 'boston', 'west roxbury': 'boston',
+    # Barnstable villages
+    'centerville': 'barnstable', 'cotuit': 'barnstable', 'hyannis': 'barnstable',
+    'marstons mills': 'barnstable', 'osterville': 'barnstable',
+    'vineyard haven': 'tisbury',
+}
+
+
+def normalize_name(name):
+    """Canonical comparison form: 'Town of N. Attleboro' -> 'north attleborough'."""
+    text = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii').lower()
+    text = text.replace('&', ' and ')
+    text = re.sub(r"[^a-z0-9]+", ' ', text).strip()
+    text = WRAPPERS.sub('', text)
+    words = [ABBREVIATIONS.get(w, w) for w in text.split()]
+    return ' '.join(re.sub(r"boro$", 'borough', w) for w in words)
+
+
+def trigrams(key):
+    """pg_trgm-style trigrams: each word padded with two leading and one trailing space."""
+    grams = set()
+    for word in key.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TownMatcher:
+    """Normalized-name, alias and trigram indexes over the canonical municipalities."""
+
+    def __init__(self, towns, aliases=ALIASES):
+        """`towns` is an iterable of (slug, name)."""
+        self.slug, self.name = [], []
+        self.exact = {}
+        for slug, name in towns:
+            self.exact[normalize_name(name)] = len(self.slug)
+            self.exact.setdefault(normalize_name(slug), len(self.slug))
+            self.slug.append(slug)
+            self.name.append(name)
+        row = {slug: i for i, slug in enumerate(self.slug)}
+        self.aliases = {normalize_name(a): row[s] for a, s in aliases.items() if s in row}
+
+        postings = {}
+        sizes = []
+        for i, name in enumerate(self.name):
+            grams = trigrams(normalize_name(name))
+            sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        self.postings = {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()}
+        self.sizes = np.array(sizes, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.slug)
+
+    def _result(self, query, i, kind, score, alternatives=()):
+        return {'query': query, 'slug': self.slug[i] if i is not None else None,
+                'name': self.name[i] if i is not None else None, 'kind': kind, 'score': score,
+                'alternatives': list(alternatives)}
+
+    def fuzzy(self, key, min_score=MIN_SCORE):
+        """[(row, score)] best first, at most ALTERNATIVES + 1, scores >= min_score."""
+        grams = [g for g in trigrams(key) if g in self.postings]
+        if not grams:
+            return []
+        shared = np.bincount(np.concatenate([self.postings[g] for g in grams]), minlength=len(self))
+        candidates = np.flatnonzero(shared)
+        scores = shared[candidates] / (len(trigrams(key)) + self.sizes[candidates] - shared[candidates])
+        keep = scores >= min_score
+        candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, -scores))[:ALTERNATIVES + 1]
+        return [(int(candidates[j]), round(float(scores[j]), 3)) for j in order]
+
+    def match(self, name, min_score=MIN_SCORE):
+        """{'query', 'slug', 'name', 'kind': exact|alias|fuzzy|None, 'score', 'alternatives'}."""
+        key = normalize_name(name or '')
+        if key in self.exact:
+            return self._result(name, self.exact[key], 'exact', 1.0)
+        if key in self.aliases:
+            return self._result(name, self.aliases[key], 'alias', 1.0)
+        ranked = self.fuzzy(key, min_score) if key else []
+        if not ranked:
+            return self._result(name, None, None, 0.0)
+        (best, score), rest = ranked[0], ranked[1:]
+        return self._result(name, best, 'fuzzy', score, [(self.slug[i], s) for i, s in rest])
+
+    def match_names(self, names, min_score=MIN_SCORE):
+        """Match a batch; each distinct name is looked up once. Results follow the input order."""
+        seen = {}
+        for name in names:
+            if name not in seen:
+                seen[name] = self.match(name, min_score)
+        return [seen[name] for name in names]
+
+
+def load_matcher(seo_file=SEO_DATA_FILE):
+    return TownMatcher((r['slug'], r['name']) for r in iter_module_records(seo_file, 'townSEOData'))
+
+
+@lru_cache(maxsize=1)
+def default_matcher():
+    return load_matcher()
+
+
+def match_names(names, min_score=MIN_SCORE):
+    return default_matcher().match_names(list(names), min_score)
+
+
+def is_confident(result):
+    """Whether a match is safe to attach data to without review."""
+    if result['kind'] in ('exact', 'alias'):
+        return True
+    if result['kind'] != 'fuzzy' or result['score'] < ACCEPT_SCORE:
+        return False
+    runner_up = result['alternatives'][0][1] if result['alternatives'] else 0.0
+    return result['score'] - runner_up >= ACCEPT_MARGIN
+
+
+@lru_cache(maxsize=4096)
+def resolve_slug(name):
+    """Canonical slug for a confident match, or a slugified fallback."""
+    result = default_matcher().match(name)
+    if is_confident(result):
+        return result['slug']
+    return normalize_name(name or '').replace(' ', '-')
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────
+
+def source_names():
+    """(source, names) for every data source that names municipalities."""
+    from generate_report import DATA_FILE, parse_compliance_data
+    from town_geo import HLC_DATA_FILE
+    from town_shards import BUILDING_PERMITS_FILE
+
+    towns, narrative_cities, _ = parse_compliance_data(DATA_FILE)
+    with open(HLC_DATA_FILE, 'r', encoding='utf-8') as f:
+        hlc = json.load(f)
+    return [
+        ('compliance-data.ts', [t['name'] for t in towns + narrative_cities]),
+        ('hlc_adu_data.json', [r['name'] for r in hlc]),
+        ('building_permits_2024.ts',
+         [r['name'] for r in iter_module_records(BUILDING_PERMITS_FILE, 'buildingPermits2024')]),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Match municipality names to canonical slugs')
+    parser.add_argument('names', nargs='*', help='names to match')
+    parser.add_argument('--min-score', type=float, default=MIN_SCORE, help='fuzzy similarity floor')
+    parser.add_argument('--check', action='store_true', help="match every data source's names and report")
+    args = parser.parse_args(argv)
+
+    matcher = default_matcher()
+    for r in matcher.match_names(args.names, args.min_score):
+        alt = ', '.join(f"{s} {score:.2f}" for s, score in r['alternatives'])
+        print(f"{r['query']!r:28s} -> {r['slug'] or '—':24s} {r['kind'] or 'no match':6s} "
+              f"{r['score']:.2f}{' rejected' if r['kind'] == 'fuzzy' and not is_confident(r) else ''}{'  (also ' + alt + ')' if alt else ''}")
+    if args.check:
+        for source, names in source_names():
+            results = matcher.match_names(names, args.min_score)
+            kinds = {}
+            for r in results:
+                kinds[r['kind']] = kinds.get(r['kind'], 0) + 1
+            print(f"{source}: {len(names)} names · " + ', '.join(f"{k or 'unmatched'} {n}" for k, n in sorted(
+                kinds.items(), key=lambda kv: str(kv[0]))))
+            for r in results:
+                if r['kind'] not in ('exact',):
+                    resolved = r['slug'] if is_confident(r) else f"{resolve_slug(r['query'])}, not {r['slug']}"
+                    print(f"  {r['query']!r} -> {resolved} ({r['kind']}, {r['score']:.2f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Statewide per-capita metrics from src/data/town_seo_data.ts.
+
+Scans the SEO module once (memory-mapped, see ts_data.py) into columnar
+numpy arrays and computes the metrics from src/lib/townAnalytics.ts
+(approvalsPerThousandParcels, approvalsPerTenThousandResidents,
+computeStatewidePerCapitaAverage) for all municipalities at once, plus
+statewide percentiles. Rounding follows JavaScript's Math.round so values
+match what the site shows.
+
+Usage:
+    python3 town_metrics.py                           # print summary
+    python3 town_metrics.py --out public/data/town_metrics.json
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from ts_data import iter_module_records
+
+SEO_DATA_FILE = os.path.join(os.path.dirname(__file__), 'src', 'data', 'town_seo_data.ts')
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def js_round(values, decimals=0):
+    """Math.round(x * 10**d) / 10**d — halves round up, unlike np.round."""
+    scale = 10 ** decimals
+    return np.floor(values * scale + 0.5) / scale
+
+
+class TownTable:
+    """Column-oriented view of town_seo_data.ts: one numpy array per field."""
+
+    # attribute -> (TS field, dtype, default)
+    NUMERIC = {
+        'population': ('population', np.int64, 0),
+        'submitted': ('submitted', np.int64, 0),
+        'approved': ('approved', np.int64, 0),
+        'denied': ('denied', np.int64, 0),
+        'pending': ('pending', np.int64, 0),
+        'approval_rate': ('approvalRate', np.float64, 0),
+        'by_right': ('byRight', bool, False),
+        'responded': ('responded', bool, False),
+        'has_permit_data': ('hasPermitData', bool, False),
+        'single_family_parcels': ('singleFamilyParcels', np.float64, np.nan),
+    }
+
+    def __init__(self, records):
+        """Build the columns in one pass over `records` (any iterable of mappings)."""
+        self.slug, self.name, self.county, self.source = [], [], [], []
+        values = {attr: [] for attr in self.NUMERIC}
+        for r in records:
+            self.slug.append(r['slug'])
+            self.name.append(r['name'])
+            self.county.append(r.get('county', ''))
+            self.source.append(r.get('source', ''))
+            for attr, (key, _, default) in self.NUMERIC.items():
+                values[attr].append(r.get(key, default))
+        self.row = {slug: i for i, slug in enumerate(self.slug)}
+        for attr, (_, dtype, _) in self.NUMERIC.items():
+            setattr(self, attr, np.array(values[attr], dtype=dtype))
+
+    def __len__(self):
+        return len(self.slug)
+
+
+def parse_town_seo_data(filepath=SEO_DATA_FILE):
+    return TownTable(iter_module_records(filepath, 'townSEOData'))
+
+
+def town_names_from_seo():
+    """slug -> display name, so staged rows join `towns` by their proper name."""
+    table = parse_town_seo_data()
+    return dict(zip(table.slug, table.name))
+
+
+# ── Metrics ──────────────────────────────────────────────────────────────
+
+def per_thousand_parcels(counts, parcels):
+    """NaN where parcel counts are missing or zero (the TS helpers return null)."""
+    out = np.full(len(counts), np.nan)
+    ok = parcels > 0    # NaN compares False
+    out[ok] = js_round(counts[ok] / parcels[ok] * 1000, 2)
+    return out
+
+
+def percentile_ranks(values, mask):
+    """Share (0-100) of masked towns at or below each value; NaN outside the mask."""
+    ranks = np.full(len(values), np.nan)
+    population = np.sort(values[mask])
+    if population.size:
+        ranks[mask] = np.searchsorted(population, values[mask], side='right') / population.size * 100
+    return ranks
+
+
+def compute_metrics(table):
+    """Per-town metric columns plus statewide aggregates for a TownTable."""
+    pop = table.population
+    has_pop = pop > 0
+    per_10k = np.zeros(len(table))
+    per_10k[has_pop] = js_round(table.approved[has_pop] / pop[has_pop] * 10000, 1)
+
+    # computeStatewidePerCapitaAverage: towns with approvals and population
+    contributing = (table.approved > 0) & has_pop
+    total_pop = pop[contributing].sum()
+    statewide_per_10k = (float(js_round(table.approved[contributing].sum() / total_pop * 10000, 1))
+                         if total_pop else 0.0)
+
+    # Percentiles are taken over the same towns, so zero-approval towns
+    # don't flatten the distribution
+    quantiles = (np.percentile(per_10k[contributing], PERCENTILES) if contributing.any()
+                 else np.zeros(len(PERCENTILES)))
+
+    return {
+        'approvals_per_1k_parcels': per_thousand_parcels(table.approved, table.single_family_parcels),
+        'submitted_per_1k_parcels': per_thousand_parcels(table.submitted, table.single_family_parcels),
+        'approvals_per_10k_residents': per_10k,
+        'per_10k_percentile': percentile_ranks(per_10k, contributing),
+        'statewide': {
+            'municipalities': len(table),
+            'responded': int(table.responded.sum()),
+            'towns_with_approvals': int(contributing.sum()),
+            'submitted': int(table.submitted.sum()),
+            'approved': int(table.approved.sum()),
+            'denied': int(table.denied.sum()),
+            'approvals_per_10k_residents': statewide_per_10k,
+            'per_10k_percentiles': {f'p{p}': round(float(q), 1) for p, q in zip(PERCENTILES, quantiles)},
+        },
+    }
+
+
+def top_by(table, values, n, mask=None):
+    """Row indices of the n largest values (ties broken by name), NaNs excluded."""
+    keep = ~np.isnan(values) if mask is None else mask & ~np.isnan(values)
+    rows = np.flatnonzero(keep)
+    order = np.lexsort((np.array(table.name, dtype=object)[rows], -values[rows]))
+    return rows[order][:n]
+
+
+def _nullable(value, decimals=None):
+    if np.isnan(value):
+        return None
+    return round(float(value), decimals) if decimals is not None else float(value)
+
+
+def metrics_artifact(table, metrics):
+    """JSON-serializable artifact for the site, keyed by town slug."""
+    towns = {}
+    for i, slug in enumerate(table.slug):
+        towns[slug] = {
+            'name': table.name[i],
+            'county': table.county[i],
+            'approvalsPerThousandParcels': _nullable(metrics['approvals_per_1k_parcels'][i]),
+            'submittedPerThousandParcels': _nullable(metrics['submitted_per_1k_parcels'][i]),
+            'approvalsPerTenThousandResidents': float(metrics['approvals_per_10k_residents'][i]),
+            'perTenThousandPercentile': _nullable(metrics['per_10k_percentile'][i], 1),
+        }
+    return {'statewide': metrics['statewide'], 'towns': towns}
+
+
+def write_metrics_artifact(table, metrics, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(metrics_artifact(table, metrics), f, indent=1, sort_keys=True)
+        f.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compute statewide per-capita ADU metrics')
+    parser.add_argument('--data', default=SEO_DATA_FILE, help='path to town_seo_data.ts')
+    parser.add_argument('--out', help='write the JSON artifact here')
+    args = parser.parse_args(argv)
+
+    table = parse_town_seo_data(args.data)
+    metrics = compute_metrics(table)
+    sw = metrics['statewide']
+    print(f"Municipalities: {sw['municipalities']} ({sw['responded']} responded)")
+    print(f"Applications: {sw['submitted']}, approved: {sw['approved']}")
+    print(f"Statewide approvals per 10K residents: {sw['approvals_per_10k_residents']}")
+    print('Per-10K percentiles: ' + ', '.join(f"{k}={v}" for k, v in sw['per_10k_percentiles'].items()))
+    for i in top_by(table, metrics['approvals_per_10k_residents'], 10, table.approved > 0):
+        print(f"  {table.name[i]:20s} {metrics['approvals_per_10k_residents'][i]:6.1f}")
+    if args.out:
+        write_metrics_artifact(table, metrics, args.out)
+        print(f"Wrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Batch town scorecards and rankings.
+
+Vectorized port of computeScorecard() in src/lib/townAnalytics.ts plus the
+compliance adjustment and ordering from src/app/rankings/page.tsx, run for
+every municipality in town_seo_data.ts at once. Review timelines come from
+the per-town permit logs in src/data/<slug>_permits.json (computeTimelines).
+
+Usage:
+    python3 town_scorecard.py                          # print the leaderboard
+    python3 town_scorecard.py --out public/data/town_scorecards.json
+"""
+
+import argparse
+import datetime
+import glob
+import json
+import os
+
+import numpy as np
+
+from town_metrics import SEO_DATA_FILE, js_round, parse_town_seo_data, percentile_ranks
+
+PERMITS_GLOB = os.path.join(os.path.dirname(__file__), 'src', 'data', '*_permits.json')
+
+GRADE_FLOORS = ((80, 'A'), (65, 'B'), (50, 'C'), (35, 'D'))
+# rankings/page.tsx: points off the rules score per compliance finding
+INCONSISTENT_PENALTY = 8
+REVIEW_PENALTY = 3
+AG_PENALTY = 5
+
+
+# ── Timelines ────────────────────────────────────────────────────────────
+
+def parse_permit_date(value):
+    """M/D/YY or M/D/YYYY, like parseDate() in townAnalytics.ts; anything else is None."""
+    parts = (value or '').strip().split('/')
+    if len(parts) != 3:
+        return None
+    try:
+        month, day, year = (int(p) for p in parts)
+        return datetime.date(year + 2000 if year < 100 else year, month, day)
+    except ValueError:
+        return None
+
+
+def median_review_days(permits):
+    """computeTimelines().medianDays for one permit log, or None without usable dates."""
+    days = []
+    for p in permits:
+        if p.get('status') != 'Issued' or not p.get('applied') or not p.get('issued'):
+            continue
+        applied, issued = parse_permit_date(p['applied']), parse_permit_date(p['issued'])
+        if applied and issued and abs((issued - applied).days) > 0:
+            days.append(abs((issued - applied).days))
+    if not days:
+        return None
+    days.sort()
+    mid = len(days) // 2
+    return days[mid] if len(days) % 2 else int(js_round(np.float64(days[mid - 1] + days[mid]) / 2))
+
+
+def load_median_days(table, pattern=PERMITS_GLOB):
+    """Median review days per TownTable row; NaN where no permit log has timelines."""
+    out = np.full(len(table), np.nan)
+    for path in sorted(glob.glob(pattern)):
+        slug = os.path.basename(path)[:-len('_permits.json')]
+        if slug not in table.row:
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            median = median_review_days(json.load(f))
+        if median is not None:
+            out[table.row[slug]] = median
+    return out
+
+
+# ── Scorecards ───────────────────────────────────────────────────────────
+
+def grades(scores):
+    return np.select([scores >= floor for floor, _ in GRADE_FLOORS],
+                     [g for _, g in GRADE_FLOORS], 'F')
+
+
+def friction(scores):
+    return np.select([scores >= 65, scores >= 40], ['Low', 'Medium'], 'High')
+
+
+def compliance_columns(table, towns):
+    """(inconsistent, review, ag_disapprovals, profiled) arrays aligned to TownTable rows."""
+    inconsistent = np.zeros(len(table), dtype=np.int64)
+    review = np.zeros(len(table), dtype=np.int64)
+    ag = np.zeros(len(table), dtype=np.int64)
+    profiled = np.zeros(len(table), dtype=bool)
+    for t in towns:
+        i = table.row.get(t['slug'])
+        if i is None:
+            continue
+        statuses = [p['status'] for p in t['provisions']]
+        inconsistent[i] = statuses.count('inconsistent')
+        review[i] = statuses.count('review')
+        ag[i] = t['ag_disapprovals']
+        profiled[i] = True
+    return inconsistent, review, ag, profiled
+
+
+def compute_scorecards(table, towns=(), median_days=None):
+    """Scorecard columns for every town in a TownTable.
+
+    `towns` are parsed compliance records; their tier counts lower the rules
+    score the way the rankings page does. `median_days` (NaN = no timeline)
+    switches the operational score from the pending-ratio estimate to review
+    times, as computeScorecard(town, timelineStats) does.
+    """
+    n = len(table)
+    median_days = np.full(n, np.nan) if median_days is None else median_days
+    rate = table.approval_rate
+    denied = table.denied
+    submitted = table.submitted
+
+    rules = (np.where(table.by_right, 40, 0)
+             + np.select([rate >= 80, rate >= 60, rate >= 40], [40, 25, 15], 5)
+             + np.select([denied == 0, denied <= 2], [20, 10], 0))
+
+    pending_rate = np.zeros(n)
+    has_subs = submitted > 0
+    pending_rate[has_subs] = table.pending[has_subs] / submitted[has_subs]
+    has_timeline = ~np.isnan(median_days)
+    ops = (np.select([pending_rate <= 0.1, pending_rate <= 0.25, pending_rate <= 0.4], [30, 20, 10], 0)
+           + np.where(has_timeline,
+                      np.select([median_days <= 30, median_days <= 60, median_days <= 90], [40, 30, 20], 10),
+                      np.where(pending_rate <= 0.15, 25, 15))
+           + np.select([submitted >= 15, submitted >= 8], [30, 20], 10))
+
+    rules = np.minimum(100, rules)
+    ops = np.minimum(100, ops)
+    base_overall = js_round((rules + ops) / 2).astype(np.int64)
+
+    inconsistent, review, ag, profiled = compliance_columns(table, towns)
+    adjusted_rules = np.where(
+        profiled,
+        np.maximum(0, rules - INCONSISTENT_PENALTY * inconsistent - REVIEW_PENALTY * review - AG_PENALTY * ag),
+        rules,
+    )
+    overall = js_round((adjusted_rules + ops) / 2).astype(np.int64)
+
+    # The rankings page lists responding towns with at least one application,
+    # ordered by score with ties left in data order (stable sort).
+    ranked = table.responded & has_subs
+    rows = np.flatnonzero(ranked)
+    order = rows[np.argsort(-overall[rows], kind='stable')]
+    rank = np.zeros(n, dtype=np.int64)
+    rank[order] = np.arange(1, len(order) + 1)
+
+    return {
+        'rules_score': rules,
+        'ops_score': ops,
+        'base_score': base_overall,
+        'base_grade': grades(base_overall),
+        'adjusted_rules_score': adjusted_rules,
+        'overall_score': overall,
+        'grade': grades(overall),
+        'rules_friction': friction(adjusted_rules),
+        'ops_friction': friction(ops),
+        'pending_rate': pending_rate,
+        'median_days': median_days,
+        'inconsistent': inconsistent,
+        'review': review,
+        'profiled': profiled,
+        'ranked': ranked,
+        'rank': rank,
+        'order': order,
+        'percentile': percentile_ranks(overall.astype(np.float64), ranked),
+    }
+
+
+def scorecard_factors(table, scorecards, i):
+    """computeScorecard()'s human-readable factors for one row."""
+    factors = []
+    rate = table.approval_rate[i]
+    rate_text = f"{rate:g}"
+    factors.append('By-right ADU construction enabled' if table.by_right[i]
+                   else 'May require special permit or variance')
+    if rate >= 80:
+        factors.append(f"High approval rate ({rate_text}%)")
+    elif rate >= 50:
+        factors.append(f"Moderate approval rate ({rate_text}%)")
+    else:
+        factors.append(f"Low approval rate ({rate_text}%) — higher friction expected")
+    if table.denied[i] == 0:
+        factors.append('Zero denials on record')
+    pending_rate = scorecards['pending_rate'][i]
+    if pending_rate > 0.35:
+        factors.append(f"High pending backlog ({int(js_round(pending_rate * 100))}% of applications)")
+    if not np.isnan(scorecards['median_days'][i]):
+        factors.append(f"Median review time: {int(scorecards['median_days'][i])} days")
+    if table.submitted[i] >= 20:
+        factors.append('High permit volume — experienced building department')
+    elif table.submitted[i] <= 5:
+        factors.append('Low permit volume — limited track record')
+    return factors
+
+
+def scorecard_artifact(table, scorecards):
+    """JSON-serializable leaderboard plus per-town scorecards, keyed by slug."""
+    sc = scorecards
+    towns = {}
+    for i, slug in enumerate(table.slug):
+        towns[slug] = {
+            'name': table.name[i],
+            'county': table.county[i],
+            'grade': str(sc['grade'][i]),
+            'overallScore': int(sc['overall_score'][i]),
+            'baseGrade': str(sc['base_grade'][i]),
+            'baseScore': int(sc['base_score'][i]),
+            'rulesFriction': str(sc['rules_friction'][i]),
+            'rulesFrictionScore': int(sc['adjusted_rules_score'][i]),
+            'operationalFriction': str(sc['ops_friction'][i]),
+            'operationalFrictionScore': int(sc['ops_score'][i]),
+            'rank': int(sc['rank'][i]) or None,
+            'percentile': None if np.isnan(sc['percentile'][i]) else round(float(sc['percentile'][i]), 1),
+            'factors': scorecard_factors(table, sc, i),
+        }
+    return {
+        'ranked': int(sc['ranked'].sum()),
+        'leaderboard': [table.slug[i] for i in sc['order']],
+        'towns': towns,
+    }
+
+
+def write_scorecard_artifact(table, scorecards, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(scorecard_artifact(table, scorecards), f, indent=1, sort_keys=True)
+        f.write('\n')
+
+
+def main(argv=None):
+    from generate_report import DATA_FILE, parse_compliance_data
+
+    parser = argparse.ArgumentParser(description='Compute ADU scorecards for every municipality')
+    parser.add_argument('--data', default=SEO_DATA_FILE, help='path to town_seo_data.ts')
+    parser.add_argument('--compliance', default=DATA_FILE, help='path to compliance-data.ts')
+    parser.add_argument('--top', type=int, default=20, help='leaderboard rows to print')
+    parser.add_argument('--out', help='write the JSON artifact here')
+    args = parser.parse_args(argv)
+
+    table = parse_town_seo_data(args.data)
+    towns, _, _ = parse_compliance_data(args.compliance)
+    sc = compute_scorecards(table, towns, load_median_days(table))
+    counts = dict(zip(*np.unique(sc['grade'][sc['ranked']], return_counts=True)))
+    print(f"Ranked municipalities: {int(sc['ranked'].sum())} · "
+          + ', '.join(f"{g}: {counts.get(g, 0)}" for g in 'ABCDF'))
+    for i in sc['order'][:args.top]:
+        print(f"  {sc['rank'][i]:3d}. {table.name[i]:20s} {sc['grade'][i]} {sc['overall_score'][i]:3d}")
+    if args.out:
+        write_scorecard_artifact(table, sc, args.out)
+        print(f"Wrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
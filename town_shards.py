@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Per-town and per-provision JSON shards for the site.
+
+Writes one shard per municipality (towns/<slug>.json: its town_seo_data.ts
+record, 2024 building permits, compliance profile, permit log and the
+nearby towns and statewide average its page compares against) and one per
+compliance provision (provisions/<slug>/<id>.json: the provision, its
+town's profile header, prev/next links and related provisions from other
+towns), so /towns/[slug] and /compliance/[slug]/[provisionId] read only
+their own shard (src/lib/shards.ts) instead of bundling the whole TS
+modules. Shapes follow the TS interfaces (TownSEOData, BuildingPermitData,
+TownComplianceProfile, NarrativeCityProfile, ComplianceProvision) with
+SOURCES references resolved to URLs.
+
+Each shard is written compact, with .gz and .br siblings precompressed at
+maximum level (.br needs the brotli package; without it only gzip is
+written). manifest.json maps every shard to its sha256 and sizes; shards
+whose hash is unchanged are not rewritten, and shards that no longer exist
+are removed.
+
+public/data/shards is committed; regenerate it whenever the TS data or a
+permit log changes, and run --check before deploying.
+
+Usage:
+    python3 town_shards.py                      # write public/data/shards
+    python3 town_shards.py --check              # exit 1 if public/data/shards is stale
+    python3 town_shards.py --out /tmp/shards
+
+Tests: tests/test_town_shards.py
+"""
+
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from generate_report import DATA_FILE, EXPORT_DIR, parse_compliance_data
+from permit_linkage import permit_log_slug
+from town_metrics import SEO_DATA_FILE, js_round
+from town_scorecard import PERMITS_GLOB
+from ts_data import iter_module_records
+
+BUILDING_PERMITS_FILE = os.path.join(os.path.dirname(__file__), 'src', 'data', 'building_permits_2024.ts')
+SHARD_DIR = os.path.join(EXPORT_DIR, 'shards')
+MANIFEST_FILE = 'manifest.json'
+SHARD_KINDS = ('towns', 'provisions')
+NEARBY_TOWNS = 4
+RELATED_PROVISIONS = 5
+
+
+# ── Shard payloads ───────────────────────────────────────────────────────
+
+def resolve_url(ref, sources):
+    """URL for a {'source', 'url'} reference from parse_compliance_data, or None."""
+    if ref is None:
+        return None
+    if ref['url'] is not None:
+        return ref['url']
+    return sources.get(ref['source'], {}).get('url')
+
+
+def _compact(record):
+    """Drop optional fields that are unset, as the TS literals omit them."""
+    return {k: v for k, v in record.items() if v not in (None, '', False)}
+
+
+def _permits(p):
+    return {'submitted': p['submitted'], 'approved': p['approved'], 'denied': p['denied'],
+            'pending': p['pending'], 'approvalRate': p['approval_rate']}
+
+
+def provision_record(p, sources):
+    """ComplianceProvision."""
+    return _compact({
+        'id': p['id'],
+        'provision': p['provision'],
+        'category': p['category'],
+        'status': p['status'],
+        'stateLaw': p['state_law'],
+        'localBylaw': p['local_bylaw'],
+        'impact': p['impact'],
+        'agDecision': p['ag_decision'],
+    }) | {'citations': [{'label': c['label'], 'url': resolve_url(c, sources)} for c in p['citations']]}
+
+
+def town_header(t, sources):
+    """TownComplianceProfile without its provisions."""
+    return _compact({
+        'slug': t['slug'],
+        'name': t['name'],
+        'county': t['county'],
+        'municipalityType': t['municipality_type'],
+        'lastReviewed': t['last_reviewed'],
+        'bylawLastUpdated': t['bylaw_last_updated'],
+        'bylawSource': t['bylaw_source'],
+        'bottomLine': t['bottom_line'],
+        'resistanceTag': t['resistance_tag'],
+        'isExempt': t['is_exempt'],
+        'isOpen': t['is_open'],
+        'agDecisionDate': t['ag_decision_date'],
+        'agDecisionUrl': resolve_url(t['ag_decision_url'], sources),
+        'bylawRetrievedAt': t['bylaw_retrieved_at'],
+        'bylawSourceUrl': resolve_url(t['bylaw_source_url'], sources),
+        'bylawSourceTitle': t['bylaw_source_title'],
+        'bylawVersionDate': t['bylaw_version_date'],
+    }) | {'population': t['population'], 'agDisapprovals': t['ag_disapprovals'],
+          'permits': _permits(t['permits'])}
+
+
+def narrative_profile(nc):
+    """NarrativeCityProfile."""
+    return {
+        'slug': nc['slug'],
+        'name': nc['name'],
+        'county': nc['county'],
+        'population': nc['population'],
+        'municipalityType': nc['municipality_type'],
+        'lastReviewed': nc['last_reviewed'],
+        'permits': _permits(nc['permits']),
+        'tag': nc['tag'],
+        'title': nc['title'],
+        'summary': nc['summary'],
+        'body': nc['body'],
+    }
+
+
+def statewide_per_capita(seo_records):
+    """computeStatewidePerCapitaAverage: approvals per 10,000 residents in towns with approvals."""
+    with_approvals = [r for r in seo_records if r['approved'] > 0 and r['population'] > 0]
+    if not with_approvals:
+        return 0
+    ratio = sum(r['approved'] for r in with_approvals) / sum(r['population'] for r in with_approvals)
+    return float(js_round(ratio * 10000, 1))
+
+
+def nearby_towns(record, seo_records):
+    """The first NEARBY_TOWNS other towns in the same county, in town_seo_data.ts order."""
+    return [r for r in seo_records
+            if r['slug'] != record['slug'] and r['county'] == record['county']][:NEARBY_TOWNS]
+
+
+def load_permit_logs(pattern=PERMITS_GLOB):
+    """{slug: PermitRecord list} from src/data/<slug>_permits.json."""
+    logs = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path, 'r', encoding='utf-8') as f:
+            logs[permit_log_slug(path)] = json.load(f)
+    return logs
+
+
+def _link(p):
+    return {'id': p['id'], 'provision': p['provision']}
+
+
+def related_provisions(slug, provision, towns):
+    """Up to RELATED_PROVISIONS provisions of the same category from other towns, in town order."""
+    related = []
+    for t in towns:
+        if t['slug'] == slug:
+            continue
+        for p in t['provisions']:
+            if p['category'] == provision['category']:
+                related.append({'town': t['name'], 'slug': t['slug'],
+                                'provision': _compact(dict(_link(p), status=p['status'],
+                                                           agDecision=p['ag_decision']))})
+                if len(related) == RELATED_PROVISIONS:
+                    return related
+    return related
+
+
+def build_shards(towns, narrative_cities, sources, seo_records, building_permits, permit_logs=None):
+    """{relative path: payload} for every town and provision shard."""
+    seo_records = [dict(r) for r in seo_records]
+    seo = {r['slug']: r for r in seo_records}
+    permits = {r['slug']: dict(r) for r in building_permits}
+    profiles = {t['slug']: t for t in towns}
+    narratives = {nc['slug']: nc for nc in narrative_cities}
+    permit_logs = permit_logs or {}
+    per_capita = statewide_per_capita(seo_records)
+
+    shards = {}
+    for slug in sorted(seo.keys() | permits.keys() | profiles.keys() | narratives.keys()):
+        t = profiles.get(slug)
+        compliance = None
+        if t is not None:
+            compliance = dict(town_header(t, sources),
+                              provisions=[provision_record(p, sources) for p in t['provisions']])
+        shards[f"towns/{slug}.json"] = {
+            'slug': slug,
+            'seo': seo.get(slug),
+            'nearby': nearby_towns(seo[slug], seo_records) if slug in seo else [],
+            'statewidePerCapita': per_capita,
+            'buildingPermits': permits.get(slug),
+            'permitLog': permit_logs.get(slug),
+            'compliance': compliance,
+            'narrative': narrative_profile(narratives[slug]) if slug in narratives else None,
+        }
+        if t is not None:
+            header = town_header(t, sources)
+            provisions = t['provisions']
+            for i, p in enumerate(provisions):
+                shards[f"provisions/{slug}/{p['id']}.json"] = {
+                    'town': header,
+                    'provision': provision_record(p, sources),
+                    'provisionCount': len(provisions),
+                    'prev': _link(provisions[i - 1]) if i > 0 else None,
+                    'next': _link(provisions[i + 1]) if i + 1 < len(provisions) else None,
+                    'related': related_provisions(slug, p, towns),
+                }
+    return shards
+
+
+# ── Writing ──────────────────────────────────────────────────────────────
+
+def encode_shard(payload):
+    return json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def compressed(raw):
+    """{extension: bytes} for the precompressed siblings; deterministic (gzip mtime 0)."""
+    out = {'.gz': gzip.compress(raw, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        out['.br'] = brotli.compress(raw, quality=11)
+    return out
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'shards': {}}
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def write_shards(shards, out_dir=SHARD_DIR):
+    """Write changed shards and the manifest; returns (written, unchanged, removed) counts."""
+    previous = load_manifest(out_dir)['shards']
+    entries = {}
+    written = unchanged = 0
+    for rel, payload in sorted(shards.items()):
+        raw = encode_shard(payload)
+        digest = hashlib.sha256(raw).hexdigest()
+        path = os.path.join(out_dir, rel)
+        old = previous.get(rel)
+        if (old and old['sha256'] == digest and ('br' in old) == (brotli is not None)
+                and os.path.exists(path)):
+            entries[rel] = old
+            unchanged += 1
+            continue
+        entry = {'sha256': digest, 'bytes': len(raw)}
+        _write(path, raw)
+        for ext, content in compressed(raw).items():
+            _write(path + ext, content)
+            entry[ext[1:]] = len(content)
+        if brotli is None:
+            _remove(path + '.br')
+        entries[rel] = entry
+        written += 1
+
+    removed = 0
+    for rel in previous.keys() - entries.keys():
+        for ext in ('', '.gz', '.br'):
+            _remove(os.path.join(out_dir, rel + ext))
+        removed += 1
+
+    version = hashlib.sha256(''.join(f"{rel}:{e['sha256']}\n" for rel, e in sorted(entries.items())).encode())
+    manifest = {'version': version.hexdigest()[:16], 'shards': entries}
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+        f.write('\n')
+    return written, unchanged, removed
+
+
+def stale_shards(shards, out_dir=SHARD_DIR):
+    """Relative paths that are missing, out of date or left over in out_dir."""
+    stale = []
+    for rel, payload in sorted(shards.items()):
+        path = os.path.join(out_dir, rel)
+        try:
+            with open(path, 'rb') as f:
+                if f.read() == encode_shard(payload) and os.path.exists(path + '.gz'):
+                    continue
+        except FileNotFoundError:
+            pass
+        stale.append(rel)
+    for kind in SHARD_KINDS:
+        for path in sorted(glob.glob(os.path.join(out_dir, kind, '**', '*.json'), recursive=True)):
+            rel = os.path.relpath(path, out_dir).replace(os.sep, '/')
+            if rel not in shards:
+                stale.append(rel)
+    listed = {rel: e['sha256'] for rel, e in load_manifest(out_dir)['shards'].items()}
+    if listed != {rel: hashlib.sha256(encode_shard(p)).hexdigest() for rel, p in shards.items()}:
+        stale.append(MANIFEST_FILE)
+    return stale
+
+
+def load_shards(data_file=DATA_FILE, seo_file=SEO_DATA_FILE, permits_file=BUILDING_PERMITS_FILE,
+                permit_logs=PERMITS_GLOB):
+    towns, narrative_cities, sources = parse_compliance_data(data_file)
+    return build_shards(towns, narrative_cities, sources,
+                        iter_module_records(seo_file, 'townSEOData'),
+                        iter_module_records(permits_file, 'buildingPermits2024'),
+                        load_permit_logs(permit_logs))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write per-town and per-provision JSON shards')
+    parser.add_argument('--data', default=DATA_FILE, help='path to compliance-data.ts')
+    parser.add_argument('--seo-data', default=SEO_DATA_FILE, help='path to town_seo_data.ts')
+    parser.add_argument('--permits-data', default=BUILDING_PERMITS_FILE, help='path to building_permits_2024.ts')
+    parser.add_argument('--permit-logs', default=PERMITS_GLOB, help='glob of <slug>_permits.json files')
+    parser.add_argument('--out', default=SHARD_DIR, help='shard directory')
+    parser.add_argument('--check', action='store_true', help='report stale shards and exit 1 instead of writing')
+    args = parser.parse_args(argv)
+
+    shards = load_shards(args.data, args.seo_data, args.permits_data, args.permit_logs)
+    if args.check:
+        stale = stale_shards(shards, args.out)
+        if stale:
+            print(f"{len(stale)} stale in {args.out} (e.g. {', '.join(stale[:5])}); run python3 town_shards.py")
+            sys.exit(1)
+        print(f"{args.out} is up to date (version {load_manifest(args.out)['version']})")
+        return
+    written, unchanged, removed = write_shards(shards, args.out)
+
+    entries = load_manifest(args.out)['shards'].values()
+    town_count = sum(rel.startswith('towns/') for rel in shards)
+    print(f"Shards: {town_count} towns, {len(shards) - town_count} provisions "
+          f"({written} written, {unchanged} unchanged, {removed} removed)")
+    sizes = [f"{sum(e['bytes'] for e in entries) / 1024:.0f} KiB raw",
+             f"{sum(e['gz'] for e in entries) / 1024:.0f} KiB gzip"]
+    if brotli is not None:
+        sizes.append(f"{sum(e['br'] for e in entries) / 1024:.0f} KiB brotli")
+    else:
+        sizes.append('brotli not installed, .br skipped')
+    print(f"Total: {', '.join(sizes)}")
+    print(f"Wrote {os.path.join(args.out, MANIFEST_FILE)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Refresh town aggregate columns for towns whose permits changed.
+
+Calls refresh_dirty_town_stats() from supabase/town_stats_refresh.sql, which
+claims the towns recorded in town_stats_dirty and recomputes
+total_applications, total_approved, total_denied and avg_days_to_approve
+for all of them in one statement. Run it once, or on an interval during
+data drops so bursts of permit writes never rescan a town per row.
+
+Tests (tests/test_town_stats_refresh.py) run the triggers and the refresh
+against the scratch database at PG_TEST_DSN, and are skipped without it.
+
+Requires psycopg 3 (pip install "psycopg[binary]").
+
+Usage:
+    python3 town_stats_refresh.py --dsn $DATABASE_URL              # refresh once
+    python3 town_stats_refresh.py --dsn $DATABASE_URL --every 300  # every 5 minutes
+"""
+
+import argparse
+import os
+import time
+
+import psycopg
+
+PENDING_SQL = "SELECT COUNT(*), MIN(touched_at) FROM town_stats_dirty"
+REFRESH_SQL = "SELECT refresh_dirty_town_stats()"
+
+
+def refresh_once(conn):
+    """(towns refreshed, pending before, oldest pending change, elapsed seconds)."""
+    started = time.perf_counter()
+    with conn.transaction():
+        pending, oldest = conn.execute(PENDING_SQL).fetchone()
+        refreshed = conn.execute(REFRESH_SQL).fetchone()[0] if pending else 0
+    return refreshed, pending, oldest, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Recompute town aggregates for changed towns')
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'), help='Postgres DSN (default $DATABASE_URL)')
+    parser.add_argument('--every', type=float, help='repeat every N seconds instead of running once')
+    args = parser.parse_args(argv)
+    if not args.dsn:
+        parser.error('--dsn or DATABASE_URL is required')
+
+    with psycopg.connect(args.dsn, autocommit=True) as conn:
+        while True:
+            refreshed, pending, oldest, elapsed = refresh_once(conn)
+            lag = f", oldest change {oldest:%H:%M:%S}" if oldest else ''
+            print(f"[{time.strftime('%H:%M:%S')}] {refreshed} town{'s' if refreshed != 1 else ''} "
+                  f"refreshed in {elapsed * 1000:.0f} ms ({pending} pending{lag})", flush=True)
+            if args.every is None:
+                break
+            try:
+                time.sleep(args.every)
+            except KeyboardInterrupt:
+                break
+
+
+if __name__ == '__main__':
+    main()
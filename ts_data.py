@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped scanning of the generated TypeScript data modules.
+
+The data modules (compliance-data.ts, town_seo_data.ts,
+building_permits_2024.ts, ...) are mapped read-only and scanned with bytes
+regexes, so a parse never holds a decoded copy of the whole file. Object
+literals are yielded one at a time as TSRecord mappings that keep only the
+raw bytes of their field values and decode a value when it is read.
+
+Usage:
+    python3 ts_data.py src/data/building_permits_2024.ts
+    python3 ts_data.py src/data/town_seo_data.ts --array townSEOData --field slug --field population
+"""
+
+import argparse
+import mmap
+import re
+from collections.abc import Mapping
+from contextlib import contextmanager
+from functools import lru_cache
+
+from report_text import decode_js_string
+
+object_pattern = re.compile(rb"\{([^{}]*)\}")
+field_pattern = re.compile(rb"(\w+):\s*('(?:[^'\\]|\\.)*'|true|false|-?\d+(?:\.\d+)?)")
+array_pattern = re.compile(rb"const (\w+)(?::[^=\n]*)?\s*=\s*\[")
+
+
+@contextmanager
+def mapped(path):
+    """Read-only memory map of a file (empty bytes for an empty file)."""
+    with open(path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:     # zero-length file
+            yield b''
+            return
+        try:
+            yield buf
+        finally:
+            buf.close()
+
+
+def text(raw):
+    """Decode a captured TS string literal body."""
+    return decode_js_string(raw.decode('utf-8'))
+
+
+@lru_cache(maxsize=1024)
+def _key(raw):
+    return raw.decode('ascii')
+
+
+def parse_value(raw):
+    if raw[:1] == b"'":
+        return text(raw[1:-1])
+    if raw in (b'true', b'false'):
+        return raw == b'true'
+    return float(raw) if b'.' in raw else int(raw)
+
+
+def array_span(buf, name=None):
+    """(start, end) of the body of `const <name> ... = [ ... \\n]`; the first array when name is None."""
+    for m in array_pattern.finditer(buf):
+        if name is None or m.group(1) == name.encode('ascii'):
+            end = buf.find(b'\n]', m.end())
+            return m.end(), end if end != -1 else len(buf)
+    return None
+
+
+class TSRecord(Mapping):
+    """One flat `{ key: value, ... }` object literal; a field is decoded when it is read."""
+
+    __slots__ = ('_raw',)
+
+    def __init__(self, body):
+        self._raw = {_key(k): v for k, v in field_pattern.findall(body)}
+
+    def __getitem__(self, key):
+        return parse_value(self._raw[key])
+
+    def get(self, key, default=None):
+        raw = self._raw.get(key)
+        return default if raw is None else parse_value(raw)
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __repr__(self):
+        return f"TSRecord({dict(self)!r})"
+
+
+def iter_records(buf, start=0, end=None):
+    """Yield a TSRecord per flat object literal in buf[start:end]."""
+    for m in object_pattern.finditer(buf, start, len(buf) if end is None else end):
+        yield TSRecord(m.group(1))
+
+
+def iter_module_records(path, array=None):
+    """Lazily yield the records of one array in a data module (the whole file if it isn't found).
+
+    The file stays mapped until the iterator is exhausted or closed.
+    """
+    with mapped(path) as buf:
+        span = array_span(buf, array)
+        yield from iter_records(buf, *(span or (0, None)))
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scan a generated TS data module')
+    parser.add_argument('path', help='path to the .ts module')
+    parser.add_argument('--array', help='name of the const array (default: first array)')
+    parser.add_argument('--field', action='append', default=[], help='print this field (repeatable)')
+    args = parser.parse_args(argv)
+
+    count = 0
+    for record in iter_module_records(args.path, args.array):
+        count += 1
+        if args.field:
+            print('\t'.join(str(record.get(f, '')) for f in args.field))
+    print(f"{count} records")
+
+
+if __name__ == '__main__':
+    main()